@@ -0,0 +1,217 @@
+## @package BatchQuery
+# Модуль для пакетного поиска кратчайших путей без графического окна.
+# Граф считывается один раз, после чего из файла (или стандартного ввода) читаются запросы
+# "начальная точка, конечная точка, время начала пути", а ответы на них записываются по мере получения
+# в формате JSON (по одному объекту в строке).
+# Вместо времени начала пути можно задать окно времени отправления ("1 20 6:00-10:00") - тогда ответом будет профиль:
+# кратчайший путь для каждого времени отправления из окна с заданным шагом
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import Graph
+import GeneticAlgo
+import ShortestPath
+
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, JunctionType, RepairType, \
+    EvolutionEngine, RateControl
+
+## Разбор строки запроса
+# Запрос задается либо тремя значениями через пробел ("1 20 8:40"), либо объектом JSON
+# ({"start": 1, "finish": 20, "time": "8:40"}). Время начала пути можно не указывать - тогда берется время из графа.
+# Если задано окно времени отправления ("1 20 6:00-10:00" или {"time": "6:00", "until": "10:00"}),
+# то возвращается его начало (окно разбирает GetQueryDepartures)
+# @param line - строка запроса
+# @param graph - граф
+# @return кортеж (начальная точка, конечная точка, время начала пути)
+def ParseQuery(line, graph):
+    if line.lstrip().startswith('{'):
+        query = json.loads(line)
+        startpoint, finishpoint, strtime = int(query['start']), int(query['finish']), query.get('time')
+    else:
+        linedata = line.split()
+        if len(linedata) < 2:
+            raise ValueError('в запросе должны быть заданы начальная и конечная точки пути')
+        startpoint, finishpoint = int(linedata[0]), int(linedata[1])
+        strtime = linedata[2].split('-')[0] if len(linedata) > 2 else None
+    starttime = datetime.strptime(strtime, '%H:%M') if strtime else graph.StartTime()
+    if not (1 <= startpoint <= graph.Vertexes()) or not (1 <= finishpoint <= graph.Vertexes()):
+        raise ValueError('номер вершины вне графа')
+    if startpoint == finishpoint:
+        raise ValueError('начальная и конечная точки пути совпадают')
+    return startpoint, finishpoint, starttime
+
+## Разбор окна времени отправления запроса
+# @param line - строка запроса
+# @param graph - граф
+# @param starttime - время начала пути из запроса (начало окна, см. ParseQuery)
+# @param step - шаг времени отправления в минутах
+# @return список времен отправления или None, если окно не задано
+def GetQueryDepartures(line, graph, starttime, step):
+    if line.lstrip().startswith('{'):
+        struntil = json.loads(line).get('until')
+    else:
+        linedata = line.split()
+        struntil = linedata[2].split('-', 1)[1] if len(linedata) > 2 and '-' in linedata[2] else None
+    if not struntil:
+        return None
+    startseconds = graph.GetDaySeconds(starttime)
+    untilseconds = graph.GetDaySeconds(datetime.strptime(struntil, '%H:%M'))
+    if untilseconds < startseconds:
+        raise ValueError('окно времени отправления заканчивается раньше, чем начинается')
+    if step <= 0:
+        raise ValueError('шаг времени отправления должен быть положительным')
+    return [graph.GetDayMoment(seconds) for seconds in range(startseconds, untilseconds+1, step*60)]
+
+## Создание решателя для одного запроса
+# @param graph - граф с заданным маршрутом
+# @param args - параметры поиска из командной строки
+# @return генетический алгоритм или точный поиск (ShortestPath)
+def CreateSolver(graph, args):
+    if args.engine != 'ga': # точный поиск
+        return ShortestPath.ShortestPath(graph, astar=(args.engine == 'astar'))
+    popsize = min(args.popsize, graph.GetAllDifferentWaysCount(args.popsize))
+    solver = GeneticAlgo.GeneticAlgo(graph, args.tourchance, args.muttype, args.mutchance, args.iters, popsize,
+                                     args.startpoptype, args.newpoptype, firstpoptype=args.firstpoptype,
+                                     junctiontype=args.junctiontype, repairtype=args.repairtype,
+                                     deadline=args.deadline, stagnation=args.stagnation,
+                                     engine=args.evolutionengine, memetic=args.memetic, trienodes=args.trienodes,
+                                     ratecontrol=args.ratecontrol)
+    if args.seedways > 0:
+        solver.SetSeedHromosomes(ShortestPath.ShortestPath(graph).FindQuickestWays(args.seedways))
+    return solver
+
+## Функция, возвращающая ответ решателя
+# @param solver - решатель, уже выполнивший поиск
+# @param bestway - найденный кратчайший путь
+# @return словарь с кратчайшим путем, временем и длиной пути
+def GetSolverAnswer(solver, bestway):
+    waytime = solver.GetHromosomeWayTime(bestway)
+    return {'way': bestway, 'time': waytime,
+            'strtime': time.strftime('%H:%M', time.gmtime(waytime)) if waytime > 0 else '',
+            'length': float(solver.GetHromosomeWayLength(bestway))}
+
+## Поиск кратчайшего пути для одного запроса
+# @param graph - граф с заданным маршрутом
+# @param args - параметры поиска из командной строки
+# @return словарь с кратчайшим путем, временем и длиной пути
+def AnswerQuery(graph, args):
+    solver = CreateSolver(graph, args)
+    return GetSolverAnswer(solver, solver.FindQuickestWay())
+
+## Поиск кратчайших путей для нескольких времен отправления (профиль времени в пути)
+# Поиск для каждого времени отправления, кроме первого, начинается с популяции, полученной для предыдущего времени:
+# ее хромосомы, проезжие при новом времени отправления (от лучшей к худшей), добавляются в первую популяцию, которая
+# дополняется новыми хромосомами только до нужного размера. Соседние времена отправления обычно имеют одни и те же
+# кратчайшие пути, поэтому поиск начинается почти с решения (особенно вместе с остановкой при отсутствии улучшения)
+# @param graph - граф
+# @param startpoint - номер вершины - начальной точки пути
+# @param finishpoint - номер вершины - конечной точки пути
+# @param departures - список времен отправления (по возрастанию)
+# @param args - параметры поиска из командной строки
+# @param warmstart - начинать ли поиск с популяции предыдущего времени отправления
+# @return словарь с профилем (кратчайший путь, время и длина пути для каждого времени отправления)
+# и наилучшим временем отправления
+def AnswerProfileQuery(graph, startpoint, finishpoint, departures, args, warmstart=True):
+    profile = []
+    hromosomes = [] # популяция предыдущего времени отправления
+    for starttime in departures:
+        solver = CreateSolver(graph.GetRouteGraph(startpoint, finishpoint, starttime), args)
+        if warmstart and hromosomes:
+            solver.SetSeedHromosomes(hromosomes)
+        answer = {'departure': starttime.strftime('%H:%M')}
+        answer.update(GetSolverAnswer(solver, solver.FindQuickestWay()))
+        if isinstance(solver, GeneticAlgo.GeneticAlgo):
+            answer['generations'] = solver.GetGenerationsCount()
+            hromosomes = solver.GetBestHromosomes(len(solver.GetPopulationHromosomes()))
+        profile.append(answer)
+    found = [answer for answer in profile if answer['time'] > 0]
+    best = min(found, key=lambda answer: answer['time'])['departure'] if found else ''
+    return {'profile': profile, 'best': best}
+
+## Обработка потока запросов
+# @param graph - граф
+# @param queries - поток строк запросов
+# @param output - поток для записи ответов
+# @param args - параметры генетического алгоритма из командной строки
+def ProcessQueries(graph, queries, output, args):
+    for number, line in enumerate(queries):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        result = {'query': number}
+        try:
+            startpoint, finishpoint, starttime = ParseQuery(line, graph)
+            departures = GetQueryDepartures(line, graph, starttime, args.step)
+            result.update({'start': startpoint, 'finish': finishpoint, 'departure': starttime.strftime('%H:%M')})
+            if departures is None:
+                result.update(AnswerQuery(graph.GetRouteGraph(startpoint, finishpoint, starttime), args))
+            else:
+                result['until'] = departures[-1].strftime('%H:%M')
+                result.update(AnswerProfileQuery(graph, startpoint, finishpoint, departures, args))
+        except (ValueError, KeyError, IndexError, TypeError) as error:
+            result['error'] = str(error)
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+
+## Разбор параметров командной строки
+# @param argv - список параметров
+# @return разобранные параметры
+def ParseArguments(argv):
+    parser = argparse.ArgumentParser(description='Пакетный поиск кратчайших путей генетическим алгоритмом')
+    parser.add_argument('graph', help='путь до файла с описанием графа')
+    parser.add_argument('--queries', default='-', help='файл запросов (по умолчанию - стандартный ввод)')
+    parser.add_argument('--output', default='-', help='файл ответов (по умолчанию - стандартный вывод)')
+    parser.add_argument('--engine', choices=('ga', 'exact', 'astar'), default='ga',
+                        help='способ поиска: генетический алгоритм, алгоритм Дейкстры или A*')
+    parser.add_argument('--seedways', type=int, default=0,
+                        help='количество точных и близких к ним путей в первой популяции генетического алгоритма')
+    parser.add_argument('--tourchance', type=float, default=1.0, help='вероятность турнирной селекции')
+    parser.add_argument('--muttype', type=int, default=MutationType.ONEPOINT, help='вид мутации')
+    parser.add_argument('--mutchance', type=float, default=0.01, help='вероятность мутации')
+    parser.add_argument('--iters', type=int, default=20, help='число итераций')
+    parser.add_argument('--popsize', type=int, default=20, help='размер популяции')
+    parser.add_argument('--startpoptype', type=int, default=StartPopulation.ELITE,
+                        help='способ формирования начальной популяции')
+    parser.add_argument('--newpoptype', type=int, default=NewPopulation.CLASSIC,
+                        help='способ формирования новой популяции')
+    parser.add_argument('--firstpoptype', type=int, default=FirstPopulation.RANDOM,
+                        help='способ генерации хромосом первой популяции')
+    parser.add_argument('--junctiontype', type=int, default=JunctionType.TWOPOINT, help='вид скрещивания')
+    parser.add_argument('--repairtype', type=int, default=RepairType.NONE, help='способ исправления потомков')
+    parser.add_argument('--evolutionengine', type=int, default=EvolutionEngine.SEQUENTIAL,
+                        help='способ формирования потомков генетического алгоритма')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='ограничение времени поиска для одного запроса в секундах')
+    parser.add_argument('--stagnation', type=int, default=0,
+                        help='количество итераций без улучшения, после которого поиск останавливается')
+    parser.add_argument('--memetic', type=int, default=0,
+                        help='количество наилучших хромосом, улучшаемых локальным поиском на каждой итерации')
+    parser.add_argument('--trienodes', type=int, default=0,
+                        help='максимальное количество узлов дерева префиксов путей (0 - оценка без дерева)')
+    parser.add_argument('--ratecontrol', type=int, default=RateControl.FIXED,
+                        help='способ управления вероятностями турнирной селекции и мутации и видом мутации')
+    parser.add_argument('--step', type=int, default=5,
+                        help='шаг времени отправления в минутах для запросов с окном времени отправления')
+    parser.add_argument('--seed', type=int, default=None, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--cache', action='store_true', help='кэшировать граф в двоичном формате рядом с файлом')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = ParseArguments(sys.argv[1:])
+    if args.seed is not None:
+        np.random.seed(args.seed)
+    graph = Graph.LoadGraph(args.graph) if args.cache else Graph.Graph(args.graph)
+    queries = sys.stdin if args.queries == '-' else open(args.queries, 'r')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        ProcessQueries(graph, queries, output, args)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if output is not sys.stdout:
+            output.close()
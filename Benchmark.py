@@ -0,0 +1,256 @@
+## @package Benchmark
+# Модуль для замера производительности: время загрузки графа (из текстового и двоичного файла), количество
+# оценок приспособленности в секунду, количество итераций генетического алгоритма в секунду, время достижения
+# заданного качества пути и пиковый объем памяти. Замеры выполняются на файлах графов и на синтетических графах
+# (GraphGenerator), а результаты записываются в файл JSON, чтобы сравнивать их между коммитами
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import Graph
+import GeneticAlgo
+import ShortestPath
+
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, JunctionType, RepairType, \
+    EvolutionEngine
+from GraphGenerator import GraphGenerator
+from PrefixTrie import PrefixTrie
+
+# Константы модуля
+DEFAULT_FILES = ('data/in.txt', 'data/example15.txt', 'data/big.txt', 'data/bigga.txt')
+DEFAULT_SIZES = (100, 1000, 10000, 100000) # количества вершин синтетических графов
+GA_CONFIG = {'tourchance': 1.0, 'muttype': MutationType.SUBPATH, 'mutchance': 0.3, 'iters': 1, 'popsize': 20,
+             'startpoptype': StartPopulation.ELITE, 'newpoptype': NewPopulation.GENITOR,
+             'firstpoptype': FirstPopulation.WALK, 'junctiontype': JunctionType.COMMONNODE,
+             'repairtype': RepairType.SHORTEST} # конфигурация генетического алгоритма (по одной итерации за вызов)
+MAX_GENERATIONS = 50 # наибольшее количество итераций генетического алгоритма в замере
+MAX_EVOLUTION_TIME = 60.0 # наибольшая продолжительность работы генетического алгоритма в замере (в секундах)
+TARGET_GAP = 0.05 # допустимое относительное превышение точного времени пути для замера времени достижения качества
+MEASURE_TIME = 0.5 # наименьшая продолжительность замера скорости оценки приспособленности (в секундах)
+COMPARED_KEYS = ('loadtext', 'loadbinary', 'batchevals', 'scalarevals', 'trieevals', 'generationsrate', 'targettime',
+                 'peakmemory') # показатели, сравниваемые с результатами другого запуска
+
+## Функция, возвращающая описание окружения, в котором выполняются замеры
+# @return словарь с коммитом, версиями Python и numpy и описанием компьютера
+def GetEnvironment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+## Многократный вызов функции в течение заданного времени
+# @param function - вызываемая функция без параметров
+# @return количество вызовов и затраченное время (в секундах)
+def RepeatCall(function):
+    calls, starttime = 0, time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        walltime = time.perf_counter() - starttime
+        if walltime >= MEASURE_TIME:
+            return calls, walltime
+
+## @class Benchmark
+class Benchmark:
+
+    ## Конструктор
+    # @param graphpaths - пути до файлов графов
+    # @param sizes - количества вершин синтетических графов
+    # @param density - плотность дорог синтетических графов
+    # @param windows - количество ограничений по скорости на дорогах синтетических графов
+    # @param seed - начальное значение генератора случайных чисел (для синтетических графов и генетического алгоритма)
+    # @param engine - способ формирования потомков генетического алгоритма
+    def __init__(self, graphpaths=DEFAULT_FILES, sizes=DEFAULT_SIZES, density=0.5, windows=3, seed=0,
+                 engine=EvolutionEngine.SEQUENTIAL):
+        self.__graphpaths = list(graphpaths)
+        self.__sizes = list(sizes)
+        self.__density = density
+        self.__windows = windows
+        self.__seed = seed
+        self.__engine = engine
+
+    ## Создание генетического алгоритма для замеров
+    # @param graph - граф
+    # @return генетический алгоритм
+    def GetGeneticAlgo(self, graph):
+        config = dict(GA_CONFIG)
+        config['popsize'] = max(graph.GetAllDifferentWaysCount(config['popsize']), 1)
+        return GeneticAlgo.GeneticAlgo(graph, engine=self.__engine, rng=np.random.default_rng(self.__seed), **config)
+
+    ## Замер времени загрузки графа из текстового и из двоичного файла
+    # @param filepath - путь до текстового файла графа
+    # @param tmpdir - каталог для временного двоичного файла
+    # @return граф и словарь с результатами замера
+    def MeasureLoad(self, filepath, tmpdir):
+        starttime = time.perf_counter()
+        graph = Graph.Graph(filepath)
+        loadtext = time.perf_counter() - starttime
+        binarypath = os.path.join(tmpdir, os.path.basename(filepath) + '.npz')
+        graph.SaveBinary(binarypath)
+        starttime = time.perf_counter()
+        Graph.Graph(binarypath)
+        loadbinary = time.perf_counter() - starttime
+        return graph, {'vertexes': graph.Vertexes(), 'edges': graph.Edges(), 'loadtext': loadtext,
+                       'loadbinary': loadbinary}
+
+    ## Замер количества оценок приспособленности в секунду (пакетной, по одной хромосоме и по дереву префиксов
+    # путей, без кэша)
+    # @param graph - граф
+    # @return словарь с результатами замера
+    def MeasureEvaluation(self, graph):
+        genalgo = self.GetGeneticAlgo(graph)
+        genalgo.GenerateFirstStartPopulation()
+        hromosomes = genalgo.GetPopulationHromosomes()
+        matrix = genalgo.GetPopulationMatrix(hromosomes)
+        calls, walltime = RepeatCall(lambda: genalgo.EvaluatePopulation(matrix))
+        batchevals = calls*len(hromosomes)/walltime
+        calls, walltime = RepeatCall(lambda: [genalgo.CalculateHromosomeWayTime(hromosome)
+                                              for hromosome in hromosomes])
+        scalarevals = calls*len(hromosomes)/walltime
+        valid, counts = genalgo.GetPopulationValidMask(matrix)
+        calls, walltime = RepeatCall(lambda: PrefixTrie(graph).EvaluateMatrix(matrix[valid], counts[valid]))
+        trieevals = calls*int(valid.sum())/walltime # дерево префиксов оценивает только валидные хромосомы
+        return {'population': len(hromosomes), 'batchevals': batchevals, 'scalarevals': scalarevals,
+                'trieevals': trieevals}
+
+    ## Замер скорости работы генетического алгоритма и времени достижения заданного качества пути
+    # Качество пути - превышение времени пути над точным кратчайшим временем (ShortestPath)
+    # @param graph - граф
+    # @return словарь с результатами замера
+    def MeasureEvolution(self, graph):
+        exacttime = None
+        exact = ShortestPath.ShortestPath(graph, astar=True)
+        way = exact.FindQuickestWay()
+        if way:
+            exacttime = exact.GetHromosomeWayTime(way)
+        genalgo = self.GetGeneticAlgo(graph)
+        starttime = time.perf_counter()
+        genalgo.GenerateFirstStartPopulation()
+        firstpopulation = time.perf_counter() - starttime
+        evolution, targettime, besttime = 0.0, None, None
+        while genalgo.GetGenerationsCount() < MAX_GENERATIONS and evolution < MAX_EVOLUTION_TIME:
+            if targettime is None:
+                besttime = genalgo.GetHromosomeWayTime(genalgo.GetBestPopulationHromosome())
+                if exacttime is not None and 0 < besttime <= exacttime*(1+TARGET_GAP):
+                    targettime = time.perf_counter() - starttime
+            generations = genalgo.GetGenerationsCount()
+            evolutionstart = time.perf_counter()
+            genalgo.Evolution()
+            evolution += time.perf_counter() - evolutionstart
+            if genalgo.GetGenerationsCount() == generations:
+                break # популяция выродилась в одну особь
+        besttime = genalgo.GetHromosomeWayTime(genalgo.GetBestPopulationHromosome())
+        if targettime is None and exacttime is not None and 0 < besttime <= exacttime*(1+TARGET_GAP):
+            targettime = time.perf_counter() - starttime
+        generations = genalgo.GetGenerationsCount()
+        return {'exacttime': exacttime, 'besttime': besttime if besttime > 0 else None,
+                'firstpopulation': firstpopulation, 'generations': generations,
+                'generationsrate': generations/evolution if evolution > 0 else None, 'targettime': targettime,
+                'stages': {stage: {'time': stagetime, 'calls': calls}
+                           for stage, (stagetime, calls) in genalgo.GetStageProfile().items()}}
+
+    ## Замер пикового объема памяти, выделенной при загрузке графа и работе генетического алгоритма
+    # Выполняется отдельным проходом, так как отслеживание выделений памяти замедляет работу
+    # @param filepath - путь до текстового файла графа
+    # @return пиковый объем памяти (в байтах)
+    def MeasurePeakMemory(self, filepath):
+        tracemalloc.start()
+        try:
+            genalgo = self.GetGeneticAlgo(Graph.Graph(filepath))
+            genalgo.GenerateFirstStartPopulation()
+            genalgo.Evolution()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    ## Выполнение всех замеров для одного графа
+    # @param name - название графа в результатах
+    # @param filepath - путь до текстового файла графа
+    # @param tmpdir - каталог для временных файлов
+    # @return словарь с результатами замеров
+    def MeasureGraph(self, name, filepath, tmpdir):
+        graph, result = self.MeasureLoad(filepath, tmpdir)
+        result = dict(name=name, **result)
+        result.update(self.MeasureEvaluation(graph))
+        result.update(self.MeasureEvolution(graph))
+        result['peakmemory'] = self.MeasurePeakMemory(filepath)
+        return result
+
+    ## Выполнение замеров на всех графах
+    # @param outputpath - путь до файла результатов (.json), пустая строка - без записи в файл
+    # @return словарь с описанием окружения, параметрами и списком результатов замеров
+    def Run(self, outputpath=''):
+        report = {'environment': GetEnvironment(),
+                  'parameters': {'seed': self.__seed, 'density': self.__density, 'windows': self.__windows,
+                                 'genalgo': dict(GA_CONFIG, engine=self.__engine),
+                                 'maxgenerations': MAX_GENERATIONS,
+                                 'maxevolutiontime': MAX_EVOLUTION_TIME, 'targetgap': TARGET_GAP},
+                  'results': []}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            graphs = [(os.path.basename(filepath), filepath) for filepath in self.__graphpaths]
+            for size in self.__sizes:
+                filepath = os.path.join(tmpdir, 'synthetic%d.txt' % size)
+                GraphGenerator(size, self.__density, self.__windows, self.__seed).Write(filepath)
+                graphs.append(('synthetic%d' % size, filepath))
+            for name, filepath in graphs:
+                report['results'].append(self.MeasureGraph(name, filepath, tmpdir))
+                print(json.dumps(report['results'][-1]))
+                sys.stdout.flush()
+        if outputpath:
+            f = open(outputpath, 'w')
+            json.dump(report, f, indent=1)
+            f.close()
+        return report
+
+## Сравнение результатов замеров с результатами другого запуска (например, на другом коммите)
+# @param report - результаты замеров
+# @param baseline - результаты замеров, с которыми выполняется сравнение
+# @return список строк: название графа, показатель, значения и их отношение
+def CompareReports(report, baseline):
+    lines = []
+    baselineresults = {result['name']: result for result in baseline['results']}
+    for result in report['results']:
+        other = baselineresults.get(result['name'])
+        if other is None:
+            continue
+        for key in COMPARED_KEYS:
+            if result.get(key) and other.get(key):
+                lines.append('%s %s %.6g %.6g %.3f' % (result['name'], key, other[key], result[key],
+                                                       result[key]/other[key]))
+    return lines
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Замер производительности загрузки графа и генетического алгоритма')
+    parser.add_argument('graphs', nargs='*', default=list(DEFAULT_FILES), help='пути до файлов графов')
+    parser.add_argument('--output', default='benchmark.json', help='файл результатов (.json)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='количества вершин синтетических графов через запятую')
+    parser.add_argument('--density', type=float, default=0.5, help='плотность дорог синтетических графов (от 0 до 1)')
+    parser.add_argument('--windows', type=int, default=3,
+                        help='количество ограничений по скорости на дорогах синтетических графов')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--engine', type=int, default=EvolutionEngine.SEQUENTIAL,
+                        help='способ формирования потомков генетического алгоритма')
+    parser.add_argument('--compare', default='', help='файл результатов другого запуска для сравнения')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    report = Benchmark(args.graphs, sizes, args.density, args.windows, args.seed, args.engine).Run(args.output)
+    if args.compare:
+        f = open(args.compare)
+        baseline = json.load(f)
+        f.close()
+        for line in CompareReports(report, baseline):
+            print(line)
@@ -18,4 +18,42 @@ class NewPopulation:
 class MutationType:
     ONEPOINT = 0 # Одноточечная. Мутации подвергается только один случайно выбранный ген
     MULTIPOINT = 1 # Многоточечная. Мутации подвергается случайное количество генов
-    TOTAL = 2 # Тотальная. Мутации подвергается каждый ген
\ No newline at end of file
+    TOTAL = 2 # Тотальная. Мутации подвергается каждый ген
+    SUBPATH = 3 # Подпуть. Участок пути между двумя случайными генами заменяется другим путем по существующим дорогам
+
+## @class MigrationTopology
+# Тип данных, описывающий схему обмена особями между островами в островной модели генетического алгоритма
+class MigrationTopology:
+    RING = 0 # Кольцевая. Лучшие особи каждого острова переходят на следующий по кольцу остров
+    FULL = 1 # Полносвязная. Лучшие особи каждого острова переходят на все остальные острова
+    RANDOM = 2 # Случайная. Лучшие особи каждого острова переходят на случайно выбранный другой остров
+
+## @class FirstPopulation
+# Тип данных, описывающий способ генерации хромосом изначальной, первой популяции генетического алгоритма
+class FirstPopulation:
+    RANDOM = 0 # Случайный. Хромосома - случайный набор вершин между начальной и конечной точкой пути
+    WALK = 1 # Обход. Хромосома - путь по существующим дорогам, построенный случайным поиском в глубину
+
+## @class JunctionType
+# Тип данных, описывающий вид скрещивания хромосом
+class JunctionType:
+    TWOPOINT = 0 # Двухточечное. Хромосомы обмениваются генами между двумя случайными позициями
+    COMMONNODE = 1 # По общей вершине. Пути обмениваются частями после случайной общей для них промежуточной вершины
+
+## @class RepairType
+# Тип данных, описывающий способ исправления хромосом-потомков после скрещивания и мутации
+class RepairType:
+    NONE = 0 # Без исправления
+    SHORTEST = 1 # Кратчайшие подпути. Соседние гены, между которыми нет дороги, соединяются кратчайшим путем
+
+## @class EvolutionEngine
+# Тип данных, описывающий способ формирования потомков на каждой итерации генетического алгоритма
+class EvolutionEngine:
+    SEQUENTIAL = 0 # Последовательный. Потомки формируются по одной паре, случайные величины выбираются по одной
+    BATCH = 1 # Пакетный. Случайные величины для пакета пар выбираются одним вызовом, операторы применяются к матрице
+
+## @class RateControl
+# Тип данных, описывающий способ управления вероятностями мутации и турнирной селекции и видом мутации
+class RateControl:
+    FIXED = 0 # Постоянный. Значения, заданные при создании генетического алгоритма, не меняются во время поиска
+    ADAPTIVE = 1 # Адаптивный. Значения меняются после каждой итерации по разнообразию популяции и частоте улучшений
\ No newline at end of file
@@ -8,6 +8,7 @@ import Graph
 import GeneticAlgo
 
 from PyQt5.QtWidgets import *
+from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5 import uic
 
 from Enums import StartPopulation, NewPopulation, MutationType
@@ -15,6 +16,41 @@ from Enums import StartPopulation, NewPopulation, MutationType
 # Константы модуля
 MAX_HROMOSOMES = 9999
 
+## @class GeneticAlgoWorker
+# Поток, в котором генетический алгоритм ищет кратчайший путь, не блокируя окно приложения.
+# После каждой итерации поток сообщает наилучший найденный путь сигналом generationDone
+class GeneticAlgoWorker(QThread):
+
+    generationDone = pyqtSignal(int, list, float, float) # номер итерации, наилучший путь, время и длина пути
+    searchDone = pyqtSignal(list, float, float) # кратчайший путь, время и длина пути
+
+    ## Конструктор
+    # @param genalgo - генетический алгоритм (GeneticAlgo)
+    def __init__(self, genalgo):
+        QThread.__init__(self)
+        self.__genalgo = genalgo
+        self.__genalgo.AddGenerationCallback(self.OnGeneration)
+
+    ## Поиск кратчайшего пути (выполняется в отдельном потоке)
+    def run(self):
+        bestway = self.__genalgo.FindQuickestWay()
+        waytime, waylength = -1.0, -1.0
+        if bestway:
+            waytime = self.__genalgo.GetHromosomeWayTime(bestway)
+            waylength = self.__genalgo.GetHromosomeWayLength(bestway)
+        self.searchDone.emit(bestway, waytime, waylength)
+
+    ## Обработчик события об итерации генетического алгоритма (вызывается в потоке поиска)
+    # @param event - словарь с показателями итерации
+    def OnGeneration(self, event):
+        way, waytime, waylength = self.__genalgo.GetCurrentBest()
+        self.generationDone.emit(event['generation'], way, waytime, waylength)
+
+    ## Остановка поиска (может вызываться из потока окна приложения)
+    # Поток завершается после сигнала searchDone с наилучшим путем, найденным к этому моменту
+    def Cancel(self):
+        self.__genalgo.Stop()
+
 ## @class GUIGeneticAlgo
 class GuiGeneticAlgo(QDialog):
 
@@ -26,41 +62,99 @@ class GuiGeneticAlgo(QDialog):
         self.GraphButton.clicked.connect(self.OpenGraphFile)
         self.FindButton.clicked.connect(self.FindQuickestWay)
         self.SaveButton.clicked.connect(self.SaveResults)
+        self.CancelButton.clicked.connect(self.CancelSearch)
         self.__filepath = ''
         self.__bestway = []
+        self.__worker = None # поток, в котором выполняется поиск кратчайшего пути
 
     ## Слот, осуществляющий открытие файла с графом
     def OpenGraphFile(self):
         default_readdir = os.getcwd() # текущая директория приложения
         # запуск стандартного окна открытия файла
-        file_name = QFileDialog.getOpenFileName(self, 'Считать данные из файла', default_readdir, '*.txt', )[0]
+        file_name = QFileDialog.getOpenFileName(self, 'Считать данные из файла', default_readdir, '*.txt *.npz', )[0]
         if file_name:
             self.__filepath = file_name
             self.GraphLineEdit.setText(self.__filepath)
             self.__graph = Graph.Graph(self.__filepath)
-            self.SetHromosomeCountLimit(self.__graph.GetAllDifferentWaysCount())
+            self.SetHromosomeCountLimit(self.__graph.GetAllDifferentWaysCount(MAX_HROMOSOMES+1))
             self.ClearResults()
         else:
             self.SetHromosome('')
 
     ## Слот, осуществляющий поиск кратчайшего пути с помощью генетического алгоритма
+    # Поиск выполняется в отдельном потоке, окно приложения показывает наилучший путь после каждой итерации
     def FindQuickestWay(self):
+        if self.__worker is not None:
+            return
         if self.__filepath:
             genalgo = GeneticAlgo.GeneticAlgo(self.__graph, float(self.TournamentSpinBox.value()) / 100.0,
                                               self.GetMutationType(), float(self.MutationSpinBox.value()) / 100.0,
                                               int(self.IterationSpinBox.value()), int(self.HromosomeSpinBox.value()),
                                               self.GetStartPopulationType(), self.GetNewPopulationType())
-            self.__bestway = genalgo.FindQuickestWay()
-            if self.__bestway: # отображение результатов о кратчайшем пути
-                strtime = time.strftime("%H:%M", time.gmtime(genalgo.GetHromosomeWayTime(self.__bestway)))
-                strlen = str(genalgo.GetHromosomeWayLength(self.__bestway))
-                self.SetHromosome(str(self.__bestway))
-                self.SetHromosomeValues(strtime, strlen)
-            else:
-                self.SetHromosome('[ ]')
+            self.ClearResults()
+            self.__bestway = []
+            self.__worker = GeneticAlgoWorker(genalgo)
+            self.__worker.generationDone.connect(self.ShowProgress)
+            self.__worker.searchDone.connect(self.ShowQuickestWay)
+            self.SetSearchRunning(True)
+            self.ProgressLineEdit.setText('Формирование первой популяции')
+            self.__worker.start()
         else:
             self.SetHromosome('Пожалуйста, загрузите файл с описанием графа!')
 
+    ## Слот, отображающий наилучший путь, найденный после очередной итерации генетического алгоритма
+    # @param generation - номер итерации
+    # @param way - наилучший путь (пустой, если валидный путь не найден)
+    # @param waytime - время пути
+    # @param waylength - длина пути
+    def ShowProgress(self, generation, way, waytime, waylength):
+        self.ProgressLineEdit.setText('Итерация ' + str(generation))
+        if way:
+            self.SetHromosome(str(way))
+            self.SetHromosomeValues(time.strftime("%H:%M", time.gmtime(waytime)), str(waylength))
+
+    ## Слот, отображающий результаты поиска кратчайшего пути после завершения потока поиска
+    # @param bestway - кратчайший путь
+    # @param waytime - время пути
+    # @param waylength - длина пути
+    def ShowQuickestWay(self, bestway, waytime, waylength):
+        self.__worker.wait()
+        self.__worker = None
+        self.SetSearchRunning(False)
+        self.ProgressLineEdit.setText('Поиск завершен')
+        self.__bestway = bestway
+        if self.__bestway: # отображение результатов о кратчайшем пути
+            self.SetHromosome(str(self.__bestway))
+            self.SetHromosomeValues(time.strftime("%H:%M", time.gmtime(waytime)), str(waylength))
+        else:
+            self.SetHromosome('[ ]')
+
+    ## Слот, осуществляющий остановку поиска кратчайшего пути
+    # Результатом поиска становится наилучший путь, найденный к моменту остановки
+    def CancelSearch(self):
+        if self.__worker is not None:
+            self.__worker.Cancel()
+            self.CancelButton.setEnabled(False)
+            self.ProgressLineEdit.setText('Остановка поиска')
+
+    ## Блокировка кнопок, недоступных во время поиска кратчайшего пути
+    # @param running - выполняется ли поиск
+    def SetSearchRunning(self, running):
+        self.FindButton.setEnabled(not running)
+        self.GraphButton.setEnabled(not running)
+        self.SaveButton.setEnabled(not running)
+        self.CancelButton.setEnabled(running)
+
+    ## Обработчик закрытия окна приложения: поиск останавливается, поток поиска завершается
+    # @param event - событие закрытия окна
+    def closeEvent(self, event):
+        if self.__worker is not None:
+            self.__worker.searchDone.disconnect()
+            self.__worker.Cancel()
+            self.__worker.wait()
+            self.__worker = None
+        QDialog.closeEvent(self, event)
+
     ## Отображение кратчайшего пути
     # @param hromosome - кратчайший путь
     def SetHromosome(self, bestway):
@@ -76,6 +170,7 @@ class GuiGeneticAlgo(QDialog):
         self.ResultsLineEdit.setText('')
         self.TimeLineEdit.setText('')
         self.LengthLineEdit.setText('')
+        self.ProgressLineEdit.setText('')
 
     ## Слот, осуществляющий сохранение результатов о кратчайшем пути в графе
     def SaveResults(self):
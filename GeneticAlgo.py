@@ -1,10 +1,39 @@
 ## @package GeneticAlgo
 # Модуль, моделирующий генетический алгоритм
 
+import json
+import os
+import threading
+import time
 import numpy as np
-from datetime import timedelta
+from collections import OrderedDict
 
-from Enums import StartPopulation, NewPopulation, MutationType
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, JunctionType, RepairType, \
+    EvolutionEngine, RateControl
+from Population import Population
+from PrefixTrie import PrefixTrie
+from Telemetry import StageProfiler
+
+# Константы модуля
+DEFAULT_CACHE_SIZE = 100000 # максимальное количество хромосом, приспособленность которых хранится в кэше
+FIRST_POPULATION_ATTEMPTS = 100 # количество неудачных попыток подряд, после которых генерация первой популяции
+                                # прекращается (различных путей может быть меньше размера популяции)
+WALK_SLACK = 2.0 # разброс случайной добавки к расстоянию до конечной точки при выборе следующей вершины обхода
+HOPS_CACHE_SIZE = 64 # максимальное количество вершин, расстояния до которых хранятся в кэше
+SUBPATH_STEPS = 1000 # максимальное количество шагов поиска нового подпути при мутации
+OFFSPRING_ATTEMPTS = 100 # максимальное количество скрещиваний на одну особь при формировании новой популяции
+CHECKPOINT_VERSION = 1 # версия формата файла контрольной точки
+LOCAL_SEARCH_STEPS = 10 # максимальное количество улучшений одной хромосомы локальным поиском за итерацию
+LOCAL_SEARCH_MOVES = 20 # количество случайных ходов, проверяемых для одного улучшения хромосомы
+PREFIX_CACHE_SIZE = 1000 # максимальное количество путей, моменты прибытия в вершины которых хранятся в кэше
+ADAPTIVE_WINDOW = 5 # количество последних итераций, по которым считается частота улучшений наилучшего пути
+ADAPTIVE_SUCCESS = 0.2 # частота улучшений, выше которой вероятность мутации уменьшается, а ниже - увеличивается
+ADAPTIVE_FACTOR = 1.5 # множитель изменения вероятности мутации
+MUTATION_CHANCE_LIMITS = (0.001, 0.5) # границы адаптивной вероятности мутации
+TOURNAMENT_STEP = 0.05 # шаг изменения вероятности турнирной селекции
+TOURNAMENT_CHANCE_LIMITS = (0.5, 1.0) # границы адаптивной вероятности турнирной селекции
+DIVERSITY_LOW = 0.25 # разнообразие популяции, ниже которого давление селекции уменьшается
+DIVERSITY_HIGH = 0.6 # разнообразие популяции, выше которого давление селекции увеличивается
 
 ## @class GeneticAlgo
 class GeneticAlgo:
@@ -18,33 +47,389 @@ class GeneticAlgo:
     # @param popsize - количество особей в начальной популяции особей, с которой начнет работу генетический алгоритм
     # @param startpoptype - способ формирования начальной популяции для генетического алгоритма
     # @param newpoptype - способ формирования новой популяции для генетического алгоритма
-    def __init__(self, graph, tourchance, muttype, mutchance, iters, popsize, startpoptype, newpoptype):
+    # @param cachesize - максимальное количество хромосом в кэше приспособленности (0 - кэш не используется)
+    # @param firstpoptype - способ генерации хромосом изначальной, первой популяции
+    # @param junctiontype - вид скрещивания хромосом
+    # @param repairtype - способ исправления хромосом-потомков после скрещивания и мутации
+    # @param deadline - ограничение времени работы FindQuickestWay в секундах (None - без ограничения)
+    # @param stagnation - количество итераций подряд без улучшения наилучшего пути, после которого генетический
+    # алгоритм останавливается (0 - без ограничения)
+    # @param engine - способ формирования потомков на каждой итерации
+    # @param memetic - количество наилучших хромосом, улучшаемых локальным поиском на каждой итерации
+    # (0 - без локального поиска)
+    # @param trienodes - максимальное количество узлов дерева префиксов путей, по которому оцениваются хромосомы
+    # (0 - хромосомы оцениваются без дерева префиксов)
+    # @param rng - генератор случайных чисел numpy.random.Generator (None - генератор, начальное значение которого
+    # берется из глобального генератора numpy, поэтому запуски после np.random.seed повторяемы)
+    def __init__(self, graph, tourchance, muttype, mutchance, iters, popsize, startpoptype, newpoptype,
+                 cachesize=DEFAULT_CACHE_SIZE, firstpoptype=FirstPopulation.RANDOM, junctiontype=JunctionType.TWOPOINT,
+                 repairtype=RepairType.NONE, deadline=None, stagnation=0, engine=EvolutionEngine.SEQUENTIAL, memetic=0,
+                 trienodes=0, ratecontrol=RateControl.FIXED, rng=None):
         self.__graph = graph
+        self.__rng = rng if rng is not None else np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+        self.__engine = engine
+        self.__memetic = memetic
         self.__tournamentchance = tourchance
         self.SetMutationType(muttype)
         self.__mutationchance = mutchance
+        self.__ratecontrol = ratecontrol
+        # значения, заданные при создании (при адаптивном управлении текущие значения меняются во время поиска)
+        self.__basetournamentchance, self.__basemutationtype, self.__basemutationchance = \
+            self.__tournamentchance, self.__mutationtype, self.__mutationchance
+        self.__improvements = [] # улучшался ли наилучший путь на последних итерациях (не более ADAPTIVE_WINDOW)
         self.__iterations = iters
         self.__populationsize = popsize
+        self.__requestedpopulationsize = popsize # размер популяции, заданный при создании
         self.__startpopulationtype = startpoptype
         self.__newpopulationtype = newpoptype
-        self.__population = []
+        self.__firstpopulationtype = firstpoptype
+        self.__seedhromosomes = [] # хромосомы, с которых начинается формирование первой популяции
+        self.__junctiontype = junctiontype
+        self.__repairtype = repairtype
+        self.__targethops = OrderedDict() # вершина -> расстояния от всех вершин до нее в количестве дорог
+        self.__passableedges = None # дороги, по которым можно проехать хотя бы в какой-то момент времени
+        self.__walkneighbors = dict() # вершина -> список соседей, в которые ведут проезжие дороги
+        self.__population = Population(graph.Vertexes())
         self.__bestway = []
+        self.__generations = 0 # количество проделанных итераций генетического алгоритма
+        self.__cachesize = cachesize
+        self.__fitnesscache = OrderedDict() # кэш приспособленности: хромосома без нулей -> (валидность, время, длина)
+        self.__cachehits = 0
+        self.__cachemisses = 0
+        self.__prefixcache = OrderedDict() # путь -> моменты прибытия в вершины пути, длины дорог и участков пути
+        self.__trienodes = trienodes
+        self.__trie = PrefixTrie(graph, trienodes) if trienodes > 0 else None # дерево префиксов путей
+        self.__profiler = StageProfiler() # время и количество вызовов этапов итерации
+        self.__callbacks = [] # обработчики событий, формируемых после каждой итерации
+        self.__duplicates = 0 # количество потомков, не добавленных в новую популяцию как повторяющиеся
+        self.__walltime = 0.0 # суммарное время работы Evolution (в секундах)
+        self.__deadline = deadline
+        self.__deadlinetime = None # момент времени (time.perf_counter), после которого поиск прекращается
+        self.__stagnation = stagnation
+        self.__stopevent = threading.Event() # запрос остановки поиска из другого потока
+        self.__bestlock = threading.Lock()
+        self.__currentbest = ([], -1.0, -1.0) # наилучший найденный путь (без нулей), время и длина пути
+        self.__stopreason = '' # причина остановки последнего вызова Evolution
+        self.__stagnant = 0 # количество итераций подряд без улучшения наилучшего пути
+        self.__checkpointpath = '' # файл, в который периодически записывается контрольная точка
+        self.__checkpointinterval = 0 # количество итераций между записями контрольной точки
+        self.__graphrevision = graph.Revision() # номер изменения дорожной сети, учтенного генетическим алгоритмом
 
     ## Установка значения - вида мутации генетического алгоритма
     # @param muttype - вид мутации, применяемой к каждой особи новой популяции
     def SetMutationType(self, muttype):
         if self.__graph.Vertexes() == 3:
             self.__mutationtype = MutationType.ONEPOINT
-        self.__mutationtype = muttype
+        self.__mutationtype = self.__basemutationtype = muttype
+
+    ## Функция, возвращающая текущие вероятность турнирной селекции, вид мутации и вероятность мутации
+    # @return кортеж (вероятность турнирной селекции, вид мутации, вероятность мутации)
+    def GetOperatorRates(self):
+        return self.__tournamentchance, self.__mutationtype, self.__mutationchance
+
+    ## Возврат вероятностей турнирной селекции и мутации и вида мутации к значениям, заданным при создании
+    def ResetOperatorRates(self):
+        self.__tournamentchance, self.__mutationtype, self.__mutationchance = \
+            self.__basetournamentchance, self.__basemutationtype, self.__basemutationchance
+        self.__improvements = []
+
+    ## Функция, возвращающая разнообразие текущей популяции
+    # Разнообразие - среднее по хромосомам популяции расстояние Жаккара между множеством дорог пути хромосомы
+    # и множеством дорог наилучшего найденного пути (0 - все хромосомы совпадают с наилучшим путем), умноженное на долю
+    # размера популяции от заданного при создании (повторяющиеся хромосомы удаляются, и популяция сокращается)
+    # @return разнообразие от 0 до 1
+    def GetPopulationDiversity(self):
+        bestway = self.GetCurrentBest()[0] or self.RemoveHromosomeZeros(self.GetBestPopulationHromosome())
+        bestedges = set(zip(bestway[:-1], bestway[1:]))
+        distances = []
+        for hromosome in self.__population:
+            way = self.RemoveHromosomeZeros(hromosome)
+            edges = set(zip(way[:-1], way[1:]))
+            union = len(edges | bestedges)
+            distances.append(1.0 - len(edges & bestedges)/union if union else 0.0)
+        if not distances:
+            return 0.0
+        return float(np.mean(distances))*min(len(distances)/self.__requestedpopulationsize, 1.0)
+
+    ## Булева функция, которая проверяет, может ли адаптивное управление еще усилить мутацию
+    # Пока может, совпадение новой популяции с текущей не останавливает поиск
+    # @return True or False
+    def CanAdaptOperatorRates(self):
+        if self.__ratecontrol != RateControl.ADAPTIVE:
+            return False
+        return self.__mutationchance < MUTATION_CHANCE_LIMITS[1] or self.__mutationtype != MutationType.SUBPATH
+
+    ## Адаптивное изменение вероятностей турнирной селекции и мутации и вида мутации после итерации
+    # Вероятность мутации меняется по правилу одной пятой (по ADAPTIVE_WINDOW последним итерациям): уменьшается,
+    # если наилучший путь улучшался чаще, чем на ADAPTIVE_SUCCESS итераций, и разнообразие популяции не низкое,
+    # и увеличивается, если улучшался реже. Давление селекции (вероятность турнирной селекции) уменьшается при низком
+    # разнообразии популяции и увеличивается при высоком. Если улучшений не было и разнообразие низкое, мутация
+    # заменяется мутацией заменой подпути (она порождает пути по существующим дорогам); после возобновления улучшений
+    # вид мутации возвращается к заданному при создании
+    # @param improved - улучшился ли наилучший путь на итерации
+    def AdaptOperatorRates(self, improved):
+        self.__improvements = (self.__improvements + [improved])[-ADAPTIVE_WINDOW:]
+        diversity = self.GetPopulationDiversity()
+        if diversity < DIVERSITY_LOW:
+            self.__tournamentchance -= TOURNAMENT_STEP
+        elif diversity > DIVERSITY_HIGH:
+            self.__tournamentchance += TOURNAMENT_STEP
+        self.__tournamentchance = round(float(np.clip(self.__tournamentchance, *TOURNAMENT_CHANCE_LIMITS)), 6)
+        if len(self.__improvements) < ADAPTIVE_WINDOW:
+            return
+        successrate = sum(self.__improvements)/len(self.__improvements)
+        if successrate > ADAPTIVE_SUCCESS and diversity >= DIVERSITY_LOW:
+            self.__mutationchance /= ADAPTIVE_FACTOR
+        elif successrate < ADAPTIVE_SUCCESS:
+            self.__mutationchance *= ADAPTIVE_FACTOR
+        self.__mutationchance = float(np.clip(self.__mutationchance, *MUTATION_CHANCE_LIMITS))
+        if successrate == 0.0 and diversity < DIVERSITY_LOW:
+            self.__mutationtype = MutationType.SUBPATH
+        elif successrate >= ADAPTIVE_SUCCESS:
+            self.__mutationtype = self.__basemutationtype
+
+    ## Установка хромосом, с которых начинается формирование изначальной, первой популяции
+    # Например, точный кратчайший путь и близкие к нему пути (см. ShortestPath.FindQuickestWays).
+    # Хромосомы, пути которых непроезжие при времени начала пути графа, в популяцию не добавляются
+    # @param hromosomes - список хромосом
+    def SetSeedHromosomes(self, hromosomes):
+        self.__seedhromosomes = [list(hromosome) for hromosome in hromosomes]
+
+    ## Добавление обработчика событий, формируемых после каждой итерации генетического алгоритма
+    # Событие - словарь с номером итерации, временем и длиной пути наилучшей хромосомы, средним временем пути,
+    # размером популяции, количеством потомков (всех, валидных и повторяющихся), суммарным временем работы,
+    # разнообразием популяции, вероятностями турнирной селекции и мутации и видом мутации для следующей итерации
+    # и суммарным временем и количеством вызовов каждого этапа итерации (ключи вида selectiontime и selectioncalls)
+    # @param callback - функция, принимающая событие (например, Telemetry.TelemetryRecorder)
+    def AddGenerationCallback(self, callback):
+        self.__callbacks.append(callback)
+
+    ## Удаление обработчика событий
+    # @param callback - ранее добавленная функция
+    def RemoveGenerationCallback(self, callback):
+        self.__callbacks.remove(callback)
+
+    ## Функция, возвращающая суммарное время и количество вызовов этапов итерации генетического алгоритма
+    # @return словарь: этап -> (время в секундах, количество вызовов)
+    def GetStageProfile(self):
+        times, calls = self.__profiler.Times(), self.__profiler.Calls()
+        return {stage: (times[stage], calls[stage]) for stage in times}
+
+    ## Формирование события о проделанной итерации и передача его обработчикам
+    # @param offspring - количество потомков, полученных за итерацию
+    # @param validoffspring - количество валидных потомков
+    def EmitGenerationEvent(self, offspring, validoffspring):
+        times, lengths = self.GetPopulationFitness(self.__population)
+        good = times > 0.0
+        besttime = float(times[good].min()) if good.any() else None
+        event = {'generation': self.__generations, 'populationsize': len(self.__population),
+                 'besttime': besttime,
+                 'bestlength': float(lengths[good & (times == besttime)].min()) if good.any() else None,
+                 'meantime': float(times[good].mean()) if good.any() else None,
+                 'offspring': offspring, 'validoffspring': validoffspring,
+                 'validrate': validoffspring/offspring if offspring else 0.0, 'duplicates': self.__duplicates,
+                 'walltime': self.__walltime, 'diversity': self.GetPopulationDiversity(),
+                 'tourchance': self.__tournamentchance, 'muttype': self.__mutationtype,
+                 'mutchance': self.__mutationchance}
+        for stage, (stagetime, calls) in self.GetStageProfile().items():
+            event[stage + 'time'] = stagetime
+            event[stage + 'calls'] = calls
+        for callback in self.__callbacks:
+            callback(event)
+
+    ## Установка ограничения времени поиска, отсчитываемого от текущего момента
+    # @param seconds - время в секундах (None - без ограничения)
+    def SetDeadline(self, seconds):
+        self.__deadlinetime = None if seconds is None else time.perf_counter() + seconds
+
+    ## Остановка поиска (может вызываться из другого потока)
+    # Генетический алгоритм прекращает работу, не завершив текущую итерацию, и больше не запускается
+    def Stop(self):
+        self.__stopevent.set()
+
+    ## Булева функция, которая проверяет, нужно ли прекратить поиск (запрошена остановка или истекло время поиска)
+    # @return True or False
+    def IsTimeOver(self):
+        if self.__stopevent.is_set():
+            return True
+        return self.__deadlinetime is not None and time.perf_counter() >= self.__deadlinetime
+
+    ## Функция, возвращающая причину остановки последнего вызова Evolution
+    # @return 'iterations', 'converged', 'stagnation', 'deadline' или 'stopped'
+    def GetStopReason(self):
+        return self.__stopreason
+
+    ## Обновление наилучшего найденного пути по текущей популяции
+    # @return True, если путь улучшился, иначе False
+    def UpdateCurrentBest(self):
+        hromosome = self.GetBestPopulationHromosome()
+        valid, waytime, waylength = self.GetHromosomeFitness(hromosome) if hromosome else (False, -1.0, -1.0)
+        if not valid or waytime <= 0.0:
+            return False
+        besttime, bestlength = self.__currentbest[1], self.__currentbest[2]
+        if self.__currentbest[0] and (besttime, bestlength) <= (waytime, waylength):
+            return False
+        with self.__bestlock:
+            self.__currentbest = (self.RemoveHromosomeZeros(hromosome), float(waytime), float(waylength))
+        return True
+
+    ## Функция, возвращающая наилучший путь, найденный к текущему моменту (может вызываться из другого потока)
+    # @return кортеж (путь без нулей, время пути, длина пути); пустой путь и -1.0, если валидный путь не найден
+    def GetCurrentBest(self):
+        with self.__bestlock:
+            way, waytime, waylength = self.__currentbest
+        return list(way), waytime, waylength
 
     ## Формирование изначальной, первой популяции, для особей которой начнет работу генетический алгоритм
     def GenerateFirstStartPopulation(self):
         popsize = self.__populationsize
-        while len(self.__population) < popsize: # пока не будет сформирована популяция нужного размера
-            self.__population.append(self.GetGeneratedValidRandomHromosome())
-            self.DeleteDublicatePopulationHromosomes()
-        for idx in range(len(self.__population)): # дополнение нулями до нужного размера каждой хромосомы популяции
-            self.AppendHromosomeZeros(self.__population[idx], self.__graph.Vertexes())
+        for hromosome in self.__seedhromosomes[:popsize]:
+            # хромосома-путь должна быть не только валидной, но и проезжей при времени начала пути графа
+            valid, waytime, waylength = self.GetHromosomeFitness(hromosome)
+            if valid and waytime > 0.0:
+                self.__population.Append(hromosome)
+        attempts = 0 # количество попыток подряд, не добавивших в популяцию новую хромосому
+        # пока не будет сформирована популяция нужного размера (повторяющиеся хромосомы в популяцию не добавляются,
+        # а добавляемые хромосомы дополняются нулями до нужного размера). По истечении времени поиска генерация
+        # прекращается, если в популяции уже есть хотя бы одна хромосома
+        while len(self.__population) < popsize and attempts < FIRST_POPULATION_ATTEMPTS and \
+                not (self.__population and self.IsTimeOver()):
+            if self.__population.Append(self.GetGeneratedFirstHromosome()):
+                attempts = 0
+            else:
+                attempts += 1
+        self.DeleteDublicatePopulationHromosomes()
+
+    ## Генерация хромосомы для изначальной, первой популяции выбранным способом
+    # @return сгенерированная хромосома
+    def GetGeneratedFirstHromosome(self):
+        if self.__firstpopulationtype == FirstPopulation.WALK:
+            hromosome = self.GetGeneratedWalkHromosome()
+            if hromosome:
+                return hromosome
+        # путей по дорогам от начальной до конечной точки нет - хромосома генерируется случайным образом
+        return self.GetGeneratedValidRandomHromosome()
+
+    ## Функция, возвращающая расстояния от всех вершин до заданной вершины в количестве дорог
+    # Расстояния до каждой вершины рассчитываются при первом обращении и хранятся в ограниченном кэше
+    # @param target - номер вершины (начиная с 0)
+    # @return список расстояний (-1 для вершин, из которых нельзя добраться до заданной вершины)
+    def GetTargetHops(self, target):
+        if target in self.__targethops:
+            self.__targethops.move_to_end(target)
+        else:
+            self.__targethops[target] = self.__graph.GetHopDistances(target).tolist()
+            if len(self.__targethops) > HOPS_CACHE_SIZE:
+                self.__targethops.popitem(last=False)
+        return self.__targethops[target]
+
+    ## Функция, возвращающая соседей вершины, в которые ведут проезжие дороги
+    # Соседи вершины определяются при первом обращении к ней и запоминаются
+    # @param point - номер вершины (начиная с 0)
+    # @return список номеров соседей (начиная с 0)
+    def GetPassableNeighbors(self, point):
+        if point not in self.__walkneighbors:
+            if self.__passableedges is None:
+                self.__passableedges = self.__graph.GetPassableEdges()
+            neighbors, edges = self.__graph.GetNeighbors(point)
+            self.__walkneighbors[point] = neighbors[self.__passableedges[edges] & (neighbors != point)].tolist()
+        return self.__walkneighbors[point]
+
+    ## Булева функция, которая проверяет, есть ли между двумя вершинами проезжая дорога
+    # @param point1 - номер первой вершины (начиная с 1, как в хромосоме)
+    # @param point2 - номер второй вершины (начиная с 1, как в хромосоме)
+    # @return True or False
+    def IsPassableRoad(self, point1, point2):
+        if not (1 <= point1 <= self.__graph.Vertexes()) or not (1 <= point2 <= self.__graph.Vertexes()):
+            return False
+        return point2-1 in self.GetPassableNeighbors(point1-1)
+
+    ## Генерация хромосомы-пути по существующим дорогам случайным поиском в глубину
+    # @return хромосома-путь без нулей или пустой список, если конечная точка недостижима из начальной
+    def GetGeneratedWalkHromosome(self):
+        way = self.GetRandomSubpath(self.__graph.StartPoint()-1, self.__graph.FinishPoint()-1)
+        return [point+1 for point in way]
+
+    ## Поиск случайного пути между двумя вершинами по существующим дорогам (случайный поиск в глубину)
+    # Из каждой вершины рассматриваются только соседи, в которые ведет проезжая дорога и из которых можно добраться
+    # до конечной вершины. Соседи перебираются в порядке возрастания расстояния до конечной вершины со случайной
+    # добавкой, поэтому пути получаются разнообразными, но не слишком длинными. При попадании в тупик (все соседи
+    # уже в пути или запрещены) поиск возвращается назад
+    # @param source - номер начальной вершины (начиная с 0)
+    # @param target - номер конечной вершины (начиная с 0)
+    # @param excluded - вершины, через которые путь проходить не должен
+    # @param limit - максимальное количество шагов поиска (None - без ограничения)
+    # @return список вершин пути (начиная с 0) или пустой список, если путь не найден
+    def GetRandomSubpath(self, source, target, excluded=(), limit=None):
+        hops = self.GetTargetHops(target)
+        if hops[source] < 0:
+            return []
+        way = [source]
+        visited = set(excluded)
+        visited.add(source)
+        candidates = [self.GetWalkCandidates(source, hops)] # стек списков еще не рассмотренных соседей
+        steps = 0
+        while way:
+            if way[-1] == target:
+                return way
+            if not candidates[-1]: # тупик - возврат к предыдущей вершине пути
+                way.pop()
+                candidates.pop()
+                continue
+            point = candidates[-1].pop()
+            if point in visited:
+                continue
+            steps += 1
+            if limit is not None and steps > limit:
+                return []
+            visited.add(point)
+            way.append(point)
+            candidates.append(self.GetWalkCandidates(point, hops))
+        return []
+
+    ## Функция, возвращающая соседей вершины для продолжения случайного обхода
+    # @param point - номер вершины (начиная с 0)
+    # @param hops - расстояния от вершин до конечной вершины обхода
+    # @return список соседей; следующим рассматривается последний элемент списка
+    def GetWalkCandidates(self, point, hops):
+        neighbors = [neighbor for neighbor in self.GetPassableNeighbors(point) if hops[neighbor] >= 0]
+        if len(neighbors) < 2:
+            return neighbors
+        noise = (WALK_SLACK*self.__rng.random(len(neighbors))).tolist()
+        keys = [hops[neighbor] + value for neighbor, value in zip(neighbors, noise)]
+        return [neighbors[idx] for idx in sorted(range(len(neighbors)), key=keys.__getitem__, reverse=True)]
+
+    ## Поиск кратчайшего по количеству дорог пути между двумя вершинами
+    # @param source - номер начальной вершины (начиная с 0)
+    # @param target - номер конечной вершины (начиная с 0)
+    # @return список вершин пути (начиная с 0) или пустой список, если путь не найден
+    def GetShortestSubpath(self, source, target):
+        hops = self.GetTargetHops(target)
+        if hops[source] < 0:
+            return []
+        way = [source]
+        while way[-1] != target:
+            # переход к первому соседу, который на одну дорогу ближе к конечной вершине
+            way.append(next(neighbor for neighbor in self.GetPassableNeighbors(way[-1])
+                            if hops[neighbor] == hops[way[-1]]-1))
+        return way
+
+    ## Удаление циклов из пути
+    # При повторном посещении вершины участок пути между двумя посещениями удаляется
+    # @param way - путь (список вершин без нулей)
+    # @return путь без повторяющихся вершин
+    def RemoveWayLoops(self, way):
+        result = []
+        positions = dict() # вершина -> ее позиция в результирующем пути
+        for point in way:
+            if point in positions:
+                for removed in result[positions[point]+1:]:
+                    del positions[removed]
+                del result[positions[point]+1:]
+            else:
+                positions[point] = len(result)
+                result.append(point)
+        return result
 
     ## Генерация валидной случайной хроосомы
     # Валидная хромосома - хромосома, начинающаяся со стартовой точки пути и заканчивающаяся финишной точки пути
@@ -56,11 +441,11 @@ class GeneticAlgo:
         listvertixes.remove(self.__graph.FinishPoint())
         # формирование валидной хромосомы
         hromosome = [self.__graph.StartPoint()] # добавление номера вершины - начальной точки пути
-        gens = np.random.randint(0, len(listvertixes) + 1) # количество генов, которые будут включены в валидную
-                                                           # хромосому помимо начальной и конечной точки пути
+        gens = self.__rng.integers(0, len(listvertixes) + 1) # количество генов, которые будут включены в валидную
+                                                             # хромосому помимо начальной и конечной точки пути
         for i in range(gens):
             if len(listvertixes) != 0:
-                vertex = listvertixes[np.random.randint(0, len(listvertixes))] # выбор вершины, добавляемой в хромосому
+                vertex = listvertixes[self.__rng.integers(0, len(listvertixes))] # выбор вершины, добавляемой в хромосому
                 hromosome.append(vertex) # добавление выбранной вершины в хромосому
                 listvertixes.remove(vertex) # удаление только что добавленного в хромосому гена из списка вершин,
                                             # которые годщятся для формирования хромосомы
@@ -68,16 +453,8 @@ class GeneticAlgo:
         return hromosome
 
     ## Удаление повторяющихся хромосом из текущей популяции
+    # Популяция не хранит повторяющиеся хромосомы, поэтому достаточно зафиксировать ее текущий размер
     def DeleteDublicatePopulationHromosomes(self):
-        i = 0
-        while i < len(self.__population)-1:
-            j = i+1
-            while (j < len(self.__population)):
-                if self.__population[i] == self.__population[j]:
-                    self.__population.pop(j)
-                else:
-                    j += 1
-            i += 1
         self.__populationsize = len(self.__population) # фиксирование изменения размера текущей популяции
 
     ## Дополнение нулями хромосомы до нужного размера
@@ -143,14 +520,126 @@ class GeneticAlgo:
             return False
         return True
 
+    ## Функция, возвращающая ключ хромосомы в кэше приспособленности
+    # @param hromosome - хромосома
+    # @return кортеж генов хромосомы без нулей
+    def GetHromosomeKey(self, hromosome):
+        return tuple(int(gen) for gen in hromosome if gen != 0)
+
+    ## Получение приспособленности хромосомы с использованием кэша
+    # Кэш вытесняет давно не использовавшиеся хромосомы при превышении заданного размера
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return кортеж (валидность хромосомы, время в пути, длина пути)
+    def GetHromosomeFitness(self, hromosome):
+        key = self.GetHromosomeKey(hromosome)
+        fitness = self.__fitnesscache.get(key)
+        if fitness is not None:
+            self.__cachehits += 1
+            self.__fitnesscache.move_to_end(key)
+            return fitness
+        self.__cachemisses += 1
+        self.__profiler.Start('evaluation')
+        if hromosome and self.IsValidHromosome(hromosome):
+            if self.__trie is not None:
+                waytime, waylength = self.__trie.Evaluate(self.RemoveHromosomeZeros(hromosome))
+                fitness = (True, waytime, float(waylength))
+            else:
+                fitness = (True, self.CalculateHromosomeWayTime(hromosome),
+                           self.CalculateHromosomeWayLength(hromosome))
+        else:
+            fitness = (False, -1.0, -1.0)
+        self.__profiler.Stop()
+        self.StoreHromosomeFitness(key, fitness)
+        return fitness
+
+    ## Сохранение приспособленности хромосомы в кэше
+    # @param key - ключ хромосомы в кэше
+    # @param fitness - кортеж (валидность хромосомы, время в пути, длина пути)
+    def StoreHromosomeFitness(self, key, fitness):
+        if self.__cachesize <= 0:
+            return
+        self.__fitnesscache[key] = fitness
+        self.__fitnesscache.move_to_end(key)
+        while len(self.__fitnesscache) > self.__cachesize: # вытеснение давно не использовавшихся хромосом
+            self.__fitnesscache.popitem(last=False)
+
+    ## Очистка кэша приспособленности хромосом
+    def ClearFitnessCache(self):
+        self.__fitnesscache.clear()
+        self.__prefixcache.clear()
+        if self.__trie is not None:
+            self.__trie.Clear()
+        self.__cachehits = 0
+        self.__cachemisses = 0
+
+    ## Удаление из кэша приспособленности валидных хромосом, путь которых проходит хотя бы по одной из заданных дорог
+    # Приспособленность остальных хромосом от этих дорог не зависит и остается в кэше
+    # @param edges - массив номеров дорог
+    # @return количество удаленных хромосом
+    def InvalidateFitnessCache(self, edges):
+        keys = [key for key, fitness in self.__fitnesscache.items() if fitness[0] and len(key) > 1]
+        if not keys or not len(edges):
+            return 0
+        genes = np.array([gen for key in keys for gen in key], dtype=np.int64)
+        counts = np.array([len(key) for key in keys])
+        # пары соседних генов всех хромосом подряд; пары на стыке соседних хромосом не учитываются
+        inner = np.ones(len(genes)-1, dtype=bool)
+        inner[np.cumsum(counts)[:-1]-1] = False
+        touched = inner & np.isin(self.__graph.GetEdgeIndex(genes[:-1]-1, genes[1:]-1), edges)
+        rows = np.unique(np.repeat(np.arange(len(keys)), counts)[:-1][touched])
+        for row in rows.tolist():
+            del self.__fitnesscache[keys[row]]
+        return len(rows)
+
+    ## Учет изменений дорожной сети графа, сделанных после создания генетического алгоритма или после предыдущего
+    # учета изменений: из кэша удаляются хромосомы, проходящие по изменившимся дорогам, а также сбрасываются
+    # запомненные проезжие дороги и расстояния до вершин
+    # @return количество хромосом, удаленных из кэша приспособленности
+    def ApplyGraphChanges(self):
+        edges = self.__graph.GetChangedEdges(self.__graphrevision)
+        self.__graphrevision = self.__graph.Revision()
+        if not len(edges):
+            return 0
+        self.__passableedges = None
+        self.__walkneighbors = dict()
+        self.__targethops.clear()
+        self.__prefixcache.clear()
+        if self.__trie is not None:
+            self.__trie.Clear()
+        return self.InvalidateFitnessCache(edges)
+
+    ## Функция, возвращающая количество попаданий в кэш приспособленности
+    # @return количество попаданий в кэш
+    def CacheHits(self):
+        return self.__cachehits
+
+    ## Функция, возвращающая количество промахов кэша приспособленности
+    # @return количество промахов кэша
+    def CacheMisses(self):
+        return self.__cachemisses
+
+    ## Булева функция, которая проверяет вляется ли хромосома валидной, с использованием кэша приспособленности
+    # @param hromosome - хромосома, для которой требуется провести проверку
+    # @return True or False
+    def IsValidCachedHromosome(self, hromosome):
+        return self.GetHromosomeFitness(hromosome)[0]
+
     # Подсчет длины пути
     # @param hromosome - хромосома-путь, по которой происходит движение
     # @return длина пути
     def GetHromosomeWayLength(self, hromosome):
-        if not hromosome:
-            return -1.0
-        if not self.IsValidHromosome(hromosome):
-            return -1.0
+        return self.GetHromosomeFitness(hromosome)[2]
+
+    # Подсчет затраченного в пути времени
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return время в пути
+    def GetHromosomeWayTime(self, hromosome):
+        return self.GetHromosomeFitness(hromosome)[1]
+
+    # Подсчет длины пути без использования кэша
+    # @param hromosome - валидная хромосома-путь, по которой происходит движение
+    # @return длина пути
+    def CalculateHromosomeWayLength(self, hromosome):
         result = 0.0
         i = 0
         # подсчет суммарной длины пути при последовательном передвижении от одной точки пути до другой
@@ -163,45 +652,140 @@ class GeneticAlgo:
             i += 1
         return result
 
-    # Подсчет затраченного в пути времени
-    # @param hromosome - хромосома-путь, по которой происходит движение
+    # Подсчет затраченного в пути времени без использования кэша
+    # @param hromosome - валидная хромосома-путь, по которой происходит движение
     # @return время в пути
-    def GetHromosomeWayTime(self, hromosome):
-        if not hromosome:
-            return -1.0
-        if not self.IsValidHromosome(hromosome):
-            return -1.0
-        current_time = self.__graph.StartTime() # переменная, контролирующая текущий момент времени,
-                                                # в котором сейчас находится движущийся объект
-        result = 0.0
+    def CalculateHromosomeWayTime(self, hromosome):
+        current_time = self.__graph.StartSeconds() # переменная, контролирующая текущий момент времени (в секундах),
+                                                   # в котором сейчас находится движущийся объект
+        result = 0
         i = 0
         # подсчет суммарного времени, потраченного при последовательном передвижении от одной точки пути до другой
         while (i < len(hromosome)-1) and (hromosome[i] != self.__graph.FinishPoint()):
-            dist = self.__graph.DistanceMatrix()[hromosome[i]-1][hromosome[i+1]-1]
-            speeds = self.__graph.SpeedMatrix()[hromosome[i]-1][hromosome[i+1]-1]
-            listspeeds = list(speeds.keys()) # список возможных скоростей движения по данной дороге
-            if not listspeeds:
+            edge = self.__graph.GetEdgeIndex(hromosome[i]-1, hromosome[i+1]-1)
+            value = self.__graph.GetEdgeTravelTime(edge, current_time) # время проезда по дороге с учетом
+                                                                       # ограничения по скорости в текущий момент
+            if value < 0:
                 return -1.0
-            else:
-                listkeys = listspeeds
-                flag = False # булева переменная, контролирующая процесс выбора нужной скорости движения по данной дороге
-                for j in range(len(listkeys)-1): # перебор всех возможных значений скоростей на данной дороге
-                    if not flag:
-                        speed = float(listkeys[j])
-                        if speed <= 0.0:
-                            return -1.0
-                        if (current_time >= speeds[listkeys[j]][0]) and (current_time <= speeds[listkeys[j]][1]):
-                            value = int(3600*dist/speed)
-                            result += value
-                            current_time = current_time + timedelta(seconds=value)
-                            flag = True
-                if not flag:
-                    speed = float(list(speeds.keys())[-1])
-                    value = int(3600*dist/speed)
-                    result += value
-                    current_time = current_time + timedelta(seconds=value)
+            result += value
+            current_time += value
             i += 1
-        return result
+        return float(result)
+
+    ## Формирование целочисленной матрицы из хромосом популяции
+    # Хромосомы дополняются нулями до количества вершин графа
+    # @param population - популяция (Population, список хромосом или двумерный массив)
+    # @return матрица размера (количество хромосом, количество вершин)
+    def GetPopulationMatrix(self, population):
+        if isinstance(population, Population):
+            return population.Matrix().astype(np.int64)
+        if isinstance(population, np.ndarray):
+            return population.astype(np.int64, copy=False).reshape((len(population), -1))
+        matrix = np.zeros((len(population), self.__graph.Vertexes()), dtype=np.int64)
+        for idx, hromosome in enumerate(population):
+            matrix[idx, :len(hromosome)] = hromosome
+        return matrix
+
+    ## Пакетная проверка валидности хромосом популяции
+    # Хромосомы популяции должны иметь сдвинутые в конец нули (как после ZeroShiftInHromosome)
+    # @param matrix - матрица хромосом популяции
+    # @return булев массив валидности хромосом и массив количества ненулевых генов в каждой хромосоме
+    def GetPopulationValidMask(self, matrix):
+        rows = np.arange(len(matrix))
+        genes = matrix != 0
+        counts = genes.sum(axis=1)
+        valid = counts > 0
+        valid &= np.all(genes[:, 1:] <= genes[:, :-1], axis=1) # нули только в конце хромосомы
+        valid &= matrix[:, 0] == self.__graph.StartPoint()
+        valid &= matrix[rows, np.maximum(counts-1, 0)] == self.__graph.FinishPoint()
+        # поиск циклов: после сортировки повторяющиеся ненулевые гены оказываются рядом
+        sortedmatrix = np.sort(matrix, axis=1)
+        valid &= ~np.any((sortedmatrix[:, 1:] == sortedmatrix[:, :-1]) & (sortedmatrix[:, 1:] != 0), axis=1)
+        return valid, counts
+
+    ## Пакетный подсчет длины и времени пути для всех хромосом популяции
+    # Результаты совпадают с GetHromosomeWayTime и GetHromosomeWayLength для каждой хромосомы
+    # @param population - популяция (список хромосом или двумерный целочисленный массив)
+    # @return массив времен в пути и массив длин путей (-1.0 для невалидных хромосом)
+    def GetPopulationWayValues(self, population):
+        valid, times, lengths = self.EvaluatePopulation(population)
+        return times, lengths
+
+    ## Пакетный подсчет валидности, времени и длины пути для всех хромосом популяции без использования кэша
+    # @param population - популяция (список хромосом или двумерный целочисленный массив)
+    # @return массив валидности хромосом, массив времен в пути и массив длин путей
+    def EvaluatePopulation(self, population):
+        matrix = self.GetPopulationMatrix(population)
+        if not matrix.size:
+            return np.zeros(len(matrix), dtype=bool), np.full(len(matrix), -1.0), np.full(len(matrix), -1.0)
+        valid, counts = self.GetPopulationValidMask(matrix)
+        positions = np.arange(matrix.shape[1]-1)
+        edgemask = valid[:, np.newaxis] & (positions[np.newaxis, :] < (counts-1)[:, np.newaxis])
+        points1, points2 = np.maximum(matrix[:, :-1]-1, 0), np.maximum(matrix[:, 1:]-1, 0)
+        edges = self.__graph.GetEdgeIndex(points1, points2)
+        # подсчет длины пути
+        dists = np.where(edgemask & (edges >= 0), self.__graph.EdgeLengths()[np.maximum(edges, 0)], 0.0)
+        lengths = np.cumsum(dists, axis=1)[:, -1] if dists.shape[1] else np.zeros(len(matrix)) # последовательное
+                                                                                              # суммирование
+        lengths[~valid | np.any(edgemask & (dists <= 0), axis=1)] = -1.0
+        # подсчет времени в пути: перебор позиций генов с одновременной обработкой всех хромосом
+        times = np.zeros(len(matrix), dtype=np.int64)
+        current_times = np.full(len(matrix), self.__graph.StartSeconds(), dtype=np.int64)
+        timevalid = valid.copy()
+        for pos in positions:
+            rows = np.nonzero(edgemask[:, pos] & timevalid)[0]
+            if not len(rows):
+                continue
+            values = self.__graph.GetEdgesTravelTimes(edges[rows, pos], current_times[rows])
+            timevalid[rows[values < 0]] = False
+            times[rows] += values
+            current_times[rows] += values
+        return valid, np.where(timevalid, times.astype(np.float64), -1.0), lengths
+
+    ## Подсчет валидности, времени и длины пути для всех хромосом популяции по дереву префиксов путей
+    # Результаты совпадают с EvaluatePopulation, но время проезда по дорогам рассчитывается только для начальных
+    # участков путей, которых еще нет в дереве
+    # @param population - популяция (список хромосом или двумерный целочисленный массив)
+    # @return массив валидности хромосом, массив времен в пути и массив длин путей
+    def EvaluatePopulationPrefixes(self, population):
+        matrix = self.GetPopulationMatrix(population)
+        times, lengths = np.full(len(matrix), -1.0), np.full(len(matrix), -1.0)
+        if not matrix.size:
+            return np.zeros(len(matrix), dtype=bool), times, lengths
+        valid, counts = self.GetPopulationValidMask(matrix)
+        times[valid], lengths[valid] = self.__trie.EvaluateMatrix(matrix[valid], counts[valid])
+        return valid, times, lengths
+
+    ## Подсчет времени и длины пути для всех хромосом популяции с использованием кэша приспособленности
+    # Хромосомы, отсутствующие в кэше, оцениваются одним пакетным вызовом и добавляются в кэш
+    # @param population - популяция (Population или список хромосом)
+    # @return массив времен в пути и массив длин путей (-1.0 для невалидных хромосом)
+    def GetPopulationFitness(self, population):
+        matrix = self.GetPopulationMatrix(population)
+        times, lengths = np.full(len(matrix), -1.0), np.full(len(matrix), -1.0)
+        missed, missedkeys = [], []
+        for idx, hromosome in enumerate(matrix.tolist()):
+            key = self.GetHromosomeKey(hromosome)
+            fitness = self.__fitnesscache.get(key)
+            if fitness is None:
+                missed.append(idx)
+                missedkeys.append(key)
+            else:
+                self.__cachehits += 1
+                self.__fitnesscache.move_to_end(key)
+                times[idx], lengths[idx] = fitness[1], fitness[2]
+        if missed:
+            self.__cachemisses += len(missed)
+            self.__profiler.Start('evaluation')
+            if self.__trie is not None:
+                valid, missedtimes, missedlengths = self.EvaluatePopulationPrefixes(matrix[missed])
+            else:
+                valid, missedtimes, missedlengths = self.EvaluatePopulation(matrix[missed])
+            self.__profiler.Stop()
+            times[missed], lengths[missed] = missedtimes, missedlengths
+            for key, v, t, l in zip(missedkeys, valid, missedtimes, missedlengths):
+                self.StoreHromosomeFitness(key, (bool(v), float(t), float(l)) if v else (False, -1.0, -1.0))
+        return times, lengths
 
     ## Выбор наиболее приспособленной хромосомы из 2
     # При выборе наиболее приспособленной хромосомы в первую очередь учитывается время пути, а потом его длина
@@ -209,35 +793,55 @@ class GeneticAlgo:
     # @param hromosome2 - вторая хромосома
     # @return наиболее приспособленная хромосома из 2
     def GetBetterHromosome(self, hromosome1, hromosome2):
-        if self.GetHromosomeWayTime(hromosome1) <= 0.0:
-            if self.GetHromosomeWayTime(hromosome2) <= 0.0:
+        valid1, time1, length1 = self.GetHromosomeFitness(hromosome1)
+        valid2, time2, length2 = self.GetHromosomeFitness(hromosome2)
+        if time1 <= 0.0:
+            if time2 <= 0.0:
                 return []
             else:
                 return hromosome2
-        elif self.GetHromosomeWayTime(hromosome2) <= 0.0:
-            if self.GetHromosomeWayTime(hromosome1) <= 0.0:
-                return []
-            else:
-                return hromosome1
-        elif self.GetHromosomeWayTime(hromosome1) < self.GetHromosomeWayTime(hromosome2):
+        elif time2 <= 0.0:
+            return hromosome1
+        elif time1 < time2:
             return hromosome1
-        elif self.GetHromosomeWayTime(hromosome1) > self.GetHromosomeWayTime(hromosome2):
+        elif time1 > time2:
             return hromosome2
-        elif self.GetHromosomeWayLength(hromosome1) >= self.GetHromosomeWayLength(hromosome2):
+        elif length1 >= length2:
             return hromosome2
         else:
             return hromosome1
         return []
 
+    ## Функция, возвращающая ключ упорядочивания хромосомы по неприспособленности
+    # Порядок ключей согласован с GetBetterHromosome: хромосомы с неположительным временем пути хуже всех,
+    # остальные сравниваются сначала по времени пути, а потом по его длине
+    # @param hromosome - хромосома
+    # @return кортеж (невалидность, время пути, длина пути): чем он больше, тем хуже хромосома
+    def GetHromosomeWorstKey(self, hromosome):
+        valid, waytime, waylength = self.GetHromosomeFitness(hromosome)
+        if waytime <= 0.0:
+            return (1, 0.0, 0.0)
+        return (0, waytime, waylength)
+
     ## Выбор наиболее приспособленной хромосомы из всех среди текущей популяции
     # @return наилучшая хромосома текущей популяции
     def GetBestPopulationHromosome(self):
         if not self.__population:
             return []
-        best_hromosome = self.__population[-1] # в начале наилучшей особью считается последняя хросома в списке популяции
-        for i in range(len(self.__population)-1): # перебор хромосом популяции
-            best_hromosome = self.GetBetterHromosome(self.__population[i], best_hromosome)
-        return best_hromosome
+        if len(self.__population) == 1:
+            return self.__population[-1]
+        times, lengths = self.GetPopulationFitness(self.__population)
+        good = times > 0.0
+        if not good.any():
+            return []
+        # наилучшая хромосома - с наименьшим временем пути, а при равном времени - с наименьшей длиной пути
+        besttime = times[good].min()
+        bestlength = lengths[good & (times == besttime)].min()
+        candidates = np.nonzero(good & (times == besttime) & (lengths == bestlength))[0]
+        # при равенстве предпочтение отдается последней хромосоме популяции, затем - первой из равных
+        if candidates[-1] == len(self.__population)-1:
+            return self.__population[-1]
+        return self.__population[candidates[0]]
 
     ## Выбор наименее приспособленной хромосомы из всех среди данной популяции
     # @param population - популяция для выбора наихудшей хроморсомы
@@ -245,17 +849,21 @@ class GeneticAlgo:
     def GetWorstPopulationHromosome(self, population):
         if not population:
             return []
-        worst_hromosome = population[-1] # в начале наихудшей особью считается последняя хросома в данном списке популяции
-        for i in range(len(population)-1): # перебор хромосом популяции
-            # составление списка хромосом для выбора наихудшей.
-            # Список состоит из 2 хромосом - наихудшей на данной момент особи и  текущей рассматриваемой особи из популяции
-            two_hromosomes = [population[i], worst_hromosome]
-            # далее выбирается наиболее приспособленная хромосома из 2. А значит оставшаяся - наименее приспособленная
-            best_hromosome = self.GetBetterHromosome(two_hromosomes[0], two_hromosomes[1])
-            if best_hromosome:
-                two_hromosomes.remove(best_hromosome)
-                worst_hromosome = two_hromosomes[0]
-        return worst_hromosome
+        times, lengths = self.GetPopulationFitness(population)
+        bad = times <= 0.0
+        if bad.any():
+            # невалидные хромосомы считаются наихудшими
+            if bad[-1]:
+                return population[-1]
+            return population[np.nonzero(bad)[0][0]]
+        # наихудшая хромосома - с наибольшим временем пути, а при равном времени - с наибольшей длиной пути
+        worsttime = times.max()
+        worstlength = lengths[times == worsttime].max()
+        candidates = np.nonzero((times == worsttime) & (lengths == worstlength))[0]
+        # при равенстве предпочтение отдается последней из равных хромосом, не считая последней хромосомы популяции
+        if len(candidates) > 1 or candidates[0] != len(population)-1:
+            return population[candidates[candidates < len(population)-1][-1]]
+        return population[-1]
 
     ## Сдвиг нулей в хромосоме в конец
     # @param hromosome - хромосома, которая подвергнется изменениям
@@ -272,54 +880,66 @@ class GeneticAlgo:
     ## Генерация новой начальной популяции для генетического алгоритма
     # @return новая сгенерированная популяция
     def GetGeneratedStartNewPopulation(self):
-        newpopulation = []
+        newpopulation = Population(self.__graph.Vertexes())
         # формирование начальной популяции для генетического алгоритма в зависимости от способа
         if self.__startpopulationtype == StartPopulation.ELITE:
-            newpopulation = [self.GetBestPopulationHromosome()]
+            newpopulation.Append(self.GetBestPopulationHromosome())
         if self.__startpopulationtype == StartPopulation.FULL:
-            newpopulation = self.__population
+            newpopulation = self.__population.Copy()
         return newpopulation
 
+    ## Функция, возвращающая номер наихудшей хромосомы данной популяции по куче наихудших хромосом
+    # При первом обращении к популяции для нее строится куча, далее поиск наихудшей хромосомы стоит O(log n)
+    # @param population - популяция (Population)
+    # @return номер наихудшей хромосомы или -1, если популяция пуста
+    def GetWorstPopulationIndex(self, population):
+        if not population.HasWorstHeap():
+            population.EnableWorstHeap(self.GetHromosomeWorstKey)
+        return population.GetWorstIndex()
+
     ## Чистка текущей популяции
+    # Невалидные хромосомы удаляются, а при превышении размера популяции удаляются наихудшие хромосомы
     def CleanPopulation(self):
+        valid, counts = self.GetPopulationValidMask(self.GetPopulationMatrix(self.__population))
+        self.__population.Filter(valid) # удаление невалидных хромосом
+        if len(self.__population) > self.__populationsize: # удаление наихудших хромосом за один проход
+            if not self.__population.HasWorstHeap():
+                self.__population.EnableWorstHeap(self.GetHromosomeWorstKey)
+            self.__population.RemoveWorst(len(self.__population) - self.__populationsize)
         self.DeleteDublicatePopulationHromosomes()
-        i = 0
-        while i < len(self.__population):
-            if not self.IsValidHromosome(self.__population[i]):
-                self.__population.remove(self.__population[i])
-            else:
-                i += 1
-        if self.__newpopulationtype == NewPopulation.GENITOR:
-            while (len(self.__population) > self.__populationsize):
-                self.__population.remove(self.GetWorstPopulationHromosome(self.__population))
-        self.__populationsize = len(self.__population)
 
     ## Добавление хромосомы в данную популяцию
     # @param hromosome - хромосома для добавления
-    # @param population - популяция, в которую будет добавлена хромосома
+    # @param population - популяция (Population), в которую будет добавлена хромосома
     def AddHromosomeToPopulation(self, hromosome, population):
         # добавление хромосомы в данную популяцию в зависимости от способа формирования новой популяции
         if self.__newpopulationtype == NewPopulation.CLASSIC:
-            population.append(hromosome)
+            if not population.Append(hromosome):
+                self.__duplicates += 1
         if self.__newpopulationtype == NewPopulation.GENITOR:
-            if (self.IsValidHromosome(hromosome)):
-                worst_hromosome =  self.GetWorstPopulationHromosome(population)
-                population[population.index(worst_hromosome)] = hromosome
+            # повторяющаяся хромосома не вытесняет наихудшую, чтобы размер популяции не уменьшался
+            if hromosome in population:
+                self.__duplicates += 1
+            elif self.IsValidCachedHromosome(hromosome):
+                if len(population) < self.__populationsize: # популяция еще не заполнена
+                    population.Append(hromosome)
+                else:
+                    population.Replace(self.GetWorstPopulationIndex(population), hromosome)
 
     ## Метод турнирной селекции для текущей популяции
     # @return хромосома, выбранная в результате турнирной селекции
     def TournamentSelectionFromPopulation(self):
         hromosome = []
         if (self.__population):
-            hromosome1 = self.__population[np.random.randint(0, len(self.__population))]
-            hromosome2 = self.__population[np.random.randint(0, len(self.__population))]
-            p = np.random.random() # значение вероятности, которое будет сравниваться с вероятностью выбора
-                                   # лучшей хромосомы в турнирной селекции
+            hromosome1 = self.__population[self.__rng.integers(0, len(self.__population))]
+            hromosome2 = self.__population[self.__rng.integers(0, len(self.__population))]
+            p = self.__rng.random() # значение вероятности, которое будет сравниваться с вероятностью выбора
+                                    # лучшей хромосомы в турнирной селекции
             if p <= self.__tournamentchance:
                 hromosome = self.GetBetterHromosome(hromosome1, hromosome2)
             else:
                 # выбор случайной хромосомы в случае, если наилучшая не была выбрана
-                hromosome = np.random.choice([hromosome1, hromosome2])
+                hromosome = (hromosome1, hromosome2)[self.__rng.integers(0, 2)]
             if not hromosome:
                 hromosome = hromosome1
                 if not hromosome1:
@@ -333,10 +953,12 @@ class GeneticAlgo:
     def Junction(self, hromosome1, hromosome2):
         if not hromosome1 or not hromosome2 or (self.__graph.Vertexes() <= 2):
             return hromosome1, hromosome2
+        if self.__junctiontype == JunctionType.COMMONNODE:
+            return self.CommonNodeJunction(hromosome1, hromosome2)
         # выбор 2 точек скрещивания
-        numb1 = numb2 = np.random.randint(1, self.__graph.Vertexes())
+        numb1 = numb2 = self.__rng.integers(1, self.__graph.Vertexes())
         while (numb2 == numb1):
-            numb2 = np.random.randint(1, self.__graph.Vertexes())
+            numb2 = self.__rng.integers(1, self.__graph.Vertexes())
         # упорядочивание по возрастанию позиций скрещивания
         pos1, pos2 = min(numb1, numb2), max(numb1, numb2)
         # применение оператора скрещивания
@@ -352,69 +974,666 @@ class GeneticAlgo:
         son_hromosome2 = self.ZeroShiftInHromosome(son_hromosome2)
         return son_hromosome1, son_hromosome2
 
+    ## Скрещивание 2 хромосом-путей по общей вершине
+    # Пути обмениваются частями после случайно выбранной общей промежуточной вершины. Соседние гены потомков
+    # соединены теми же дорогами, что и у родителей, а возникшие циклы удаляются
+    # @param hromosome1 - первая хромосома
+    # @param hromosome2 - вторая хромосома
+    # @return 2 скрещенные хромосомы (родительские хромосомы, если общих промежуточных вершин нет)
+    def CommonNodeJunction(self, hromosome1, hromosome2):
+        way1, way2 = self.RemoveHromosomeZeros(hromosome1), self.RemoveHromosomeZeros(hromosome2)
+        common = sorted(set(way1[1:-1]) & set(way2[1:-1]))
+        if not common:
+            return hromosome1, hromosome2
+        point = common[self.__rng.integers(0, len(common))]
+        pos1, pos2 = way1.index(point), way2.index(point)
+        son_hromosome1 = self.RemoveWayLoops(way1[:pos1] + way2[pos2:])
+        son_hromosome2 = self.RemoveWayLoops(way2[:pos2] + way1[pos1:])
+        self.AppendHromosomeZeros(son_hromosome1, self.__graph.Vertexes())
+        self.AppendHromosomeZeros(son_hromosome2, self.__graph.Vertexes())
+        return son_hromosome1, son_hromosome2
+
     ## Мутация данной хромосомы
     # @param hromosome - хромосома, которая будет мутировать
     # @return мутировавшая хромосома
     def Mutation(self, hromosome):
         if not hromosome or (self.__graph.Vertexes() <= 2):
             return hromosome
+        if self.__mutationtype == MutationType.SUBPATH:
+            return self.SubpathMutation(hromosome)
         # формирование списка точек мутации в зависимости от вида мутации
         listnumbers = []
         if self.__mutationtype == MutationType.ONEPOINT:
             listsize = 1
         elif self.__mutationtype == MutationType.MULTIPOINT:
-            listsize = np.random.randint(2, self.__graph.Vertexes()-1)
+            listsize = self.__rng.integers(2, self.__graph.Vertexes()-1)
         else:
             listnumbers = list(range(1, self.__graph.Vertexes()-1))
         if self.__mutationtype != MutationType.TOTAL:
             i = 0
             while i<listsize:
-                numb = np.random.randint(0, self.__graph.Vertexes())
+                numb = self.__rng.integers(0, self.__graph.Vertexes())
                 if numb not in listnumbers:
                     listnumbers.append(numb)
                     i += 1
         # применение оператора мутации
         for i in range(len(listnumbers)):
-            p = np.random.random()
+            p = self.__rng.random()
             if p <= self.__mutationchance:
-                hromosome[listnumbers[i]] = np.random.randint(1, self.__graph.Vertexes()+1)
+                hromosome[listnumbers[i]] = self.__rng.integers(1, self.__graph.Vertexes()+1)
             hromosome = self.ZeroShiftInHromosome(hromosome)
         return hromosome
 
+    ## Мутация хромосомы-пути заменой подпути
+    # Участок пути между двумя случайными генами заменяется случайным путем по существующим дорогам,
+    # не проходящим через остальные вершины пути
+    # @param hromosome - хромосома, которая будет мутировать
+    # @return мутировавшая хромосома (исходная хромосома, если мутация не произошла)
+    def SubpathMutation(self, hromosome):
+        if self.__rng.random() > self.__mutationchance:
+            return hromosome
+        way = self.RemoveHromosomeZeros(hromosome)
+        if len(way) < 2:
+            return hromosome
+        pos1 = self.__rng.integers(0, len(way)-1)
+        pos2 = self.__rng.integers(pos1+1, len(way))
+        subpath = self.GetRandomSubpath(way[pos1]-1, way[pos2]-1, [point-1 for point in way[:pos1] + way[pos2+1:]],
+                                        SUBPATH_STEPS)
+        if not subpath:
+            return hromosome
+        result = way[:pos1] + [point+1 for point in subpath] + way[pos2+1:]
+        self.AppendHromosomeZeros(result, self.__graph.Vertexes())
+        return result
+
+    ## Исправление хромосомы-потомка выбранным способом
+    # @param hromosome - хромосома для исправления
+    # @return исправленная хромосома
+    def Repair(self, hromosome):
+        if not hromosome or self.__repairtype == RepairType.NONE:
+            return hromosome
+        return self.ShortestSubpathRepair(hromosome)
+
+    ## Исправление хромосомы соединением разорванных участков пути кратчайшими подпутями
+    # Путь начинается с начальной точки и обрезается после конечной точки, соседние гены без проезжей дороги между
+    # ними соединяются кратчайшим по количеству дорог путем, а возникшие циклы удаляются
+    # @param hromosome - хромосома для исправления
+    # @return исправленная хромосома (исходная хромосома, если ее не удалось исправить)
+    def ShortestSubpathRepair(self, hromosome):
+        startpoint, finishpoint = self.__graph.StartPoint(), self.__graph.FinishPoint()
+        genes = [gen for gen in self.RemoveHromosomeZeros(hromosome) if 1 <= gen <= self.__graph.Vertexes()]
+        genes = genes[:genes.index(finishpoint)+1] if finishpoint in genes else genes + [finishpoint]
+        if genes[0] != startpoint:
+            genes.insert(0, startpoint)
+        way = [startpoint]
+        for gen in genes[1:]:
+            if self.IsPassableRoad(way[-1], gen):
+                way.append(gen)
+                continue
+            subpath = self.GetShortestSubpath(way[-1]-1, gen-1)
+            if subpath:
+                way.extend(point+1 for point in subpath[1:])
+            elif gen == finishpoint: # до конечной точки добраться невозможно
+                return hromosome
+        result = self.RemoveWayLoops(way)
+        self.AppendHromosomeZeros(result, self.__graph.Vertexes())
+        return result
+
+    ## Улучшение наилучших хромосом текущей популяции локальным поиском (меметический этап)
+    # Улучшенная хромосома заменяет в популяции исходную
+    def LocalSearchPopulation(self):
+        for hromosome in self.GetBestHromosomes(self.__memetic):
+            improved = self.LocalSearch(hromosome)
+            if improved != hromosome:
+                idx = self.__population.Index(hromosome)
+                if idx >= 0 and improved not in self.__population:
+                    self.__population.Replace(idx, improved)
+
+    ## Улучшение хромосомы локальным поиском
+    # На каждом шаге проверяется несколько случайных ходов: удаление промежуточной вершины пути, вставка новой
+    # вершины между соседними вершинами пути и разворот участка пути (2-opt). Первый ход, уменьшающий время пути
+    # (при равном времени - длину пути), принимается
+    # @param hromosome - валидная хромосома
+    # @return улучшенная хромосома (исходная хромосома, если улучшить ее не удалось)
+    def LocalSearch(self, hromosome):
+        genes = self.RemoveHromosomeZeros(hromosome)
+        prefixes = self.GetWayPrefixes(genes)
+        if prefixes is None or len(genes) < 3:
+            return hromosome
+        improved = False
+        for step in range(LOCAL_SEARCH_STEPS):
+            if len(genes) < 3: # после удаления вершин путь мог сократиться до одной дороги
+                break
+            for attempt in range(LOCAL_SEARCH_MOVES):
+                move = self.GetLocalMove(genes)
+                if move is None:
+                    continue
+                newgenes, first, last = move
+                newprefixes = self.EvaluateLocalMove(genes, prefixes, newgenes, first, last)
+                if newprefixes is not None and newprefixes[0][-1] > newprefixes[0][0] and \
+                        (newprefixes[0][-1], newprefixes[2][-1]) < (prefixes[0][-1], prefixes[2][-1]):
+                    break
+            else:
+                break # за шаг не найдено ни одного улучшающего хода
+            genes, prefixes = newgenes, newprefixes
+            self.StoreWayPrefixes(genes, prefixes)
+            improved = True
+        if not improved:
+            return hromosome
+        self.StoreHromosomeFitness(tuple(genes), (True, float(prefixes[0][-1] - prefixes[0][0]), prefixes[2][-1]))
+        self.AppendHromosomeZeros(genes, self.__graph.Vertexes())
+        return genes
+
+    ## Выбор случайного хода локального поиска
+    # @param genes - путь (хромосома без нулей)
+    # @return кортеж (новый путь, номер первой вершины, после которой путь изменился, номер первой вершины,
+    # начиная с которой путь совпадает с окончанием исходного пути) или None, если выбранный ход невозможен
+    def GetLocalMove(self, genes):
+        count = len(genes)
+        movetype = self.__rng.integers(0, 3)
+        if movetype == 0: # удаление вершины
+            if count < 3:
+                return None
+            idx = int(self.__rng.integers(1, count-1))
+            if not self.IsPassableRoad(genes[idx-1], genes[idx+1]):
+                return None
+            return genes[:idx] + genes[idx+1:], idx-1, idx
+        if movetype == 1: # вставка вершины после вершины idx
+            idx = int(self.__rng.integers(0, count-1))
+            candidates = sorted(set(self.GetPassableNeighbors(genes[idx]-1)) &
+                                set(self.GetPassableNeighbors(genes[idx+1]-1)) - set(gen-1 for gen in genes))
+            if not candidates:
+                return None
+            point = candidates[self.__rng.integers(0, len(candidates))] + 1
+            return genes[:idx+1] + [point] + genes[idx+1:], idx, idx+2
+        if count < 4:
+            return None
+        # разворот участка пути между вершинами idx1 и idx2
+        idx1, idx2 = sorted(self.__rng.choice(np.arange(1, count-1), 2, replace=False).tolist())
+        if not (self.IsPassableRoad(genes[idx1-1], genes[idx2]) and self.IsPassableRoad(genes[idx1], genes[idx2+1])):
+            return None
+        return genes[:idx1] + genes[idx1:idx2+1][::-1] + genes[idx2+1:], idx1-1, idx2+1
+
+    ## Функция, возвращающая моменты прибытия в вершины пути, длины дорог и длины участков пути от начальной точки
+    # Значения рассчитываются при первом обращении к пути и хранятся в ограниченном кэше
+    # @param genes - валидный путь (хромосома без нулей)
+    # @return кортеж списков (моменты прибытия в секундах от начала суток, длины дорог, длины участков пути)
+    # или None, если по пути проехать невозможно
+    def GetWayPrefixes(self, genes):
+        key = tuple(genes)
+        prefixes = self.__prefixcache.get(key)
+        if prefixes is not None:
+            self.__prefixcache.move_to_end(key)
+            return prefixes
+        prefixes = self.EvaluateLocalMove([], ([self.__graph.StartSeconds()], [], [0.0]), genes, 0, len(genes))
+        if prefixes is not None:
+            self.StoreWayPrefixes(genes, prefixes)
+        return prefixes
+
+    ## Сохранение моментов прибытия в вершины пути в кэше
+    # @param genes - путь (хромосома без нулей)
+    # @param prefixes - кортеж списков (см. GetWayPrefixes)
+    def StoreWayPrefixes(self, genes, prefixes):
+        key = tuple(genes)
+        self.__prefixcache[key] = prefixes
+        self.__prefixcache.move_to_end(key)
+        while len(self.__prefixcache) > PREFIX_CACHE_SIZE:
+            self.__prefixcache.popitem(last=False)
+
+    ## Инкрементальная оценка пути, полученного ходом локального поиска
+    # Моменты прибытия до первой изменившейся дороги берутся из исходного пути. Далее они пересчитываются, пока путь
+    # не совпадет с окончанием исходного пути и момент прибытия не совпадет с исходным - тогда окончание пути
+    # проходится так же, как в исходном пути, и его моменты прибытия тоже берутся из исходного пути
+    # @param genes - исходный путь (хромосома без нулей)
+    # @param prefixes - кортеж списков исходного пути (см. GetWayPrefixes)
+    # @param newgenes - новый путь
+    # @param first - номер вершины, после которой путь изменился
+    # @param last - номер вершины нового пути, начиная с которой он совпадает с окончанием исходного пути
+    # @return кортеж списков нового пути (см. GetWayPrefixes) или None, если по пути проехать невозможно
+    def EvaluateLocalMove(self, genes, prefixes, newgenes, first, last):
+        arrivals, dists, lengths = prefixes
+        shift = len(newgenes) - len(genes) # сдвиг номеров вершин окончания исходного пути в новом пути
+        newarrivals, newdists, newlengths = arrivals[:first+1], dists[:first], lengths[:first+1]
+        edgelengths = self.__graph.EdgeLengths()
+        for pos in range(first, len(newgenes)-1):
+            if pos >= last and newarrivals[pos] == arrivals[pos-shift]:
+                newarrivals.extend(arrivals[pos-shift+1:])
+                newdists.extend(dists[pos-shift:])
+                break
+            edge = self.__graph.GetEdgeIndex(newgenes[pos]-1, newgenes[pos+1]-1)
+            value = self.__graph.GetEdgeTravelTime(edge, newarrivals[pos])
+            if value < 0 or edgelengths[edge] <= 0:
+                return None
+            newarrivals.append(newarrivals[pos] + value)
+            newdists.append(float(edgelengths[edge]))
+        # длины участков пути суммируются последовательно, как в CalculateHromosomeWayLength
+        for dist in newdists[len(newlengths)-1:]:
+            newlengths.append(newlengths[-1] + dist)
+        return newarrivals, newdists, newlengths
+
+    ## Последовательное формирование потомков для новой популяции
+    # Пары родителей выбираются по одной, пока не получено нужное количество пар с валидными потомками
+    # @param newpopulation - новая популяция (Population), в которую добавляются потомки
+    # @return количество скрещиваний и количество валидных потомков
+    def SequentialOffspringGeneration(self, newpopulation):
+        profiler = self.__profiler
+        validchange_count = 0 # количество формирований новых валидных хромосом.
+                              # Переменная позволяет улучшить качество новой формируемой популяции
+        attempts = 0 # количество скрещиваний (ограничено, если валидные потомки почти не появляются)
+        validoffspring = 0 # количество валидных потомков
+        while validchange_count < self.__populationsize and attempts < self.__populationsize*OFFSPRING_ATTEMPTS:
+            if self.IsTimeOver():
+                break
+            attempts += 1
+            profiler.Start('selection')
+            hromosome1, hromosome2 = self.TournamentSelectionFromPopulation(), \
+                                     self.TournamentSelectionFromPopulation()
+            profiler.Stop()
+            profiler.Start('junction')
+            hromosome1, hromosome2 = self.Junction(hromosome1, hromosome2)
+            profiler.Stop()
+            profiler.Start('mutation')
+            hromosome1, hromosome2 = self.Mutation(hromosome1), self.Mutation(hromosome2)
+            profiler.Stop()
+            profiler.Start('repair')
+            hromosome1, hromosome2 = self.Repair(hromosome1), self.Repair(hromosome2)
+            profiler.Stop()
+            valid1, valid2 = self.IsValidCachedHromosome(hromosome1), self.IsValidCachedHromosome(hromosome2)
+            if valid1 or valid2:
+                # увеличение значения в случае, если при формировании новых хромосом хоть одна из них валидна
+                validchange_count += 1
+            validoffspring += valid1 + valid2
+            profiler.Start('insertion')
+            if valid1:
+                self.AddHromosomeToPopulation(hromosome1, newpopulation)
+            if valid2:
+                self.AddHromosomeToPopulation(hromosome2, newpopulation)
+            profiler.Stop()
+        return attempts, validoffspring
+
+    ## Пакетное формирование потомков для новой популяции
+    # Потомки формируются пакетами по размеру популяции пар. Турнирная селекция, двухточечное скрещивание и мутация
+    # (кроме мутации заменой подпути) применяются ко всей матрице пакета, случайные величины для всего пакета
+    # выбираются одним вызовом генератора, а приспособленность потомков считается одной пакетной оценкой.
+    # Остальные операторы применяются к каждой хромосоме пакета. Потомки добавляются в новую популяцию по порядку,
+    # пока не получено нужное количество пар с валидными потомками (остаток последнего пакета отбрасывается)
+    # @param newpopulation - новая популяция (Population), в которую добавляются потомки
+    # @return количество скрещиваний и количество валидных потомков
+    def BatchOffspringGeneration(self, newpopulation):
+        profiler = self.__profiler
+        vertexes = self.__graph.Vertexes()
+        matrix = self.GetPopulationMatrix(self.__population)
+        times, lengths = self.GetPopulationFitness(self.__population)
+        validchange_count, attempts, validoffspring = 0, 0, 0
+        while validchange_count < self.__populationsize and attempts < self.__populationsize*OFFSPRING_ATTEMPTS:
+            if self.IsTimeOver():
+                break
+            count = min(self.__populationsize, self.__populationsize*OFFSPRING_ATTEMPTS - attempts) # пар в пакете
+            profiler.Start('selection')
+            selected = self.BatchTournamentSelection(2*count, times, lengths)
+            profiler.Stop()
+            children1, children2 = matrix[selected[:count]], matrix[selected[count:]]
+            profiler.Start('junction')
+            if vertexes <= 2:
+                pass
+            elif self.__junctiontype == JunctionType.TWOPOINT:
+                children1, children2 = self.BatchJunction(children1, children2)
+            else:
+                pairs = [self.Junction(hromosome1, hromosome2)
+                         for hromosome1, hromosome2 in zip(children1.tolist(), children2.tolist())]
+                children1 = self.GetOffspringMatrix([pair[0] for pair in pairs])
+                children2 = self.GetOffspringMatrix([pair[1] for pair in pairs])
+            profiler.Stop()
+            children = np.empty((2*count, matrix.shape[1]), dtype=np.int64) # потомки каждой пары идут подряд
+            children[0::2], children[1::2] = children1, children2
+            profiler.Start('mutation')
+            if vertexes <= 2:
+                pass
+            elif self.__mutationtype != MutationType.SUBPATH:
+                children = self.BatchMutation(children)
+            else:
+                children = self.GetOffspringMatrix([self.Mutation(hromosome) for hromosome in children.tolist()])
+            profiler.Stop()
+            profiler.Start('repair')
+            if self.__repairtype != RepairType.NONE:
+                children = self.GetOffspringMatrix([self.Repair(hromosome) for hromosome in children.tolist()])
+            profiler.Stop()
+            valid, counts = self.GetPopulationValidMask(children)
+            if valid.any():
+                self.GetPopulationFitness(children[valid]) # пакетная оценка приспособленности с сохранением в кэше
+            profiler.Start('insertion')
+            hromosomes = children.tolist()
+            for pair in range(count):
+                if validchange_count >= self.__populationsize:
+                    break
+                attempts += 1
+                valid1, valid2 = bool(valid[2*pair]), bool(valid[2*pair+1])
+                if valid1 or valid2:
+                    validchange_count += 1
+                validoffspring += valid1 + valid2
+                if valid1:
+                    self.AddHromosomeToPopulation(hromosomes[2*pair], newpopulation)
+                if valid2:
+                    self.AddHromosomeToPopulation(hromosomes[2*pair+1], newpopulation)
+            profiler.Stop()
+        return attempts, validoffspring
+
+    ## Формирование матрицы потомков из списка хромосом
+    # Хромосомы длиннее количества вершин графа содержат повторяющиеся гены, поэтому заведомо невалидны
+    # и заменяются строками из нулей
+    # @param hromosomes - список хромосом
+    # @return матрица размера (количество хромосом, количество вершин)
+    def GetOffspringMatrix(self, hromosomes):
+        return self.GetPopulationMatrix([hromosome if len(hromosome) <= self.__graph.Vertexes() else []
+                                         for hromosome in hromosomes])
+
+    ## Пакетная турнирная селекция для текущей популяции
+    # Выбор лучшей хромосомы из двух согласован с GetBetterHromosome (если обе невалидны, выбирается первая)
+    # @param count - количество турниров
+    # @param times - массив времен пути хромосом текущей популяции
+    # @param lengths - массив длин путей хромосом текущей популяции
+    # @return массив номеров хромосом текущей популяции, выбранных в турнирах
+    def BatchTournamentSelection(self, count, times, lengths):
+        indexes1 = self.__rng.integers(0, len(self.__population), count)
+        indexes2 = self.__rng.integers(0, len(self.__population), count)
+        chances = self.__rng.random(count) # значения, которые сравниваются с вероятностью выбора лучшей хромосомы
+        coins = self.__rng.integers(0, 2, count) # выбор случайной хромосомы, если лучшая не была выбрана
+        time1, time2 = times[indexes1], times[indexes2]
+        good1, good2 = time1 > 0.0, time2 > 0.0
+        second = (good2 & ~good1) | (good1 & good2 & ((time1 > time2) |
+                                                      ((time1 == time2) & (lengths[indexes1] >= lengths[indexes2]))))
+        better = np.where(second, indexes2, indexes1)
+        return np.where(chances <= self.__tournamentchance, better, np.where(coins == 0, indexes1, indexes2))
+
+    ## Сдвиг нулей в конец каждой хромосомы матрицы (как ZeroShiftInHromosome для каждой строки)
+    # @param matrix - матрица хромосом
+    # @return матрица хромосом со сдвинутыми в конец нулями
+    def ZeroShiftMatrix(self, matrix):
+        return np.take_along_axis(matrix, np.argsort(matrix == 0, axis=1, kind='stable'), axis=1)
+
+    ## Пакетное двухточечное скрещивание пар хромосом (как Junction для каждой пары)
+    # @param matrix1 - матрица первых хромосом пар
+    # @param matrix2 - матрица вторых хромосом пар
+    # @return 2 матрицы скрещенных хромосом
+    def BatchJunction(self, matrix1, matrix2):
+        count, size = matrix1.shape
+        # 2 различные точки скрещивания от 1 до size-1 для каждой пары
+        numb1 = self.__rng.integers(1, size, count)
+        numb2 = 1 + (numb1 - 1 + self.__rng.integers(1, size-1, count)) % (size-1)
+        pos1, pos2 = np.minimum(numb1, numb2), np.maximum(numb1, numb2)
+        columns = np.arange(size)
+        mask = (columns >= pos1[:, np.newaxis]) & (columns < pos2[:, np.newaxis])
+        return self.ZeroShiftMatrix(np.where(mask, matrix2, matrix1)), \
+               self.ZeroShiftMatrix(np.where(mask, matrix1, matrix2))
+
+    ## Пакетная мутация хромосом (одноточечная, многоточечная или тотальная, как Mutation для каждой хромосомы)
+    # Все выбранные гены хромосомы мутируют одновременно, после чего нули сдвигаются в конец хромосомы
+    # @param matrix - матрица хромосом
+    # @return матрица мутировавших хромосом
+    def BatchMutation(self, matrix):
+        count, size = matrix.shape
+        result = matrix.copy()
+        if self.__mutationtype == MutationType.ONEPOINT:
+            rows = np.nonzero(self.__rng.random(count) <= self.__mutationchance)[0]
+            result[rows, self.__rng.integers(0, size, len(rows))] = self.__rng.integers(1, size+1, len(rows))
+            return self.ZeroShiftMatrix(result)
+        if self.__mutationtype == MutationType.MULTIPOINT:
+            # случайное количество различных позиций - позиции с наименьшими случайными ключами
+            listsizes = self.__rng.integers(2, max(size-1, 3), count)
+            ranks = np.argsort(np.argsort(self.__rng.random((count, size)), axis=1), axis=1)
+            selected = ranks < listsizes[:, np.newaxis]
+        else:
+            selected = np.zeros((count, size), dtype=bool)
+            selected[:, 1:size-1] = True
+        mutated = selected & (self.__rng.random((count, size)) <= self.__mutationchance)
+        result[mutated] = self.__rng.integers(1, size+1, int(mutated.sum()))
+        return self.ZeroShiftMatrix(result)
+
     ## Эволюция текущей популяции (генетический алгоритм)
     def Evolution(self):
+        starttime = time.perf_counter()
         newpopulation = self.GetGeneratedStartNewPopulation()
         iter = 0 # номер текущей проделанной итерации
-        validchange_count = 0 # количество формирований новых валидных хромосом.
-                              # Переменная позволяет улучшить качество новой формируемой популяции
         runningalgo = True # переменая, необходимая для контроля процесса формирования новой популяции
+        self.__stopreason = 'iterations'
+        self.UpdateCurrentBest()
+        if self.__trie is not None:
+            self.__trie.SetLiveHromosomes(self.__population.Matrix())
         # пока не проделано нужное число итераций генетического алгоритма или популяция не стала состоять из одной особи
-        while (iter < self.__iterations) and (len(self.__population) > 1) and runningalgo:
-            while validchange_count < self.__populationsize:
-                hromosome1, hromosome2 = self.TournamentSelectionFromPopulation(), \
-                                         self.TournamentSelectionFromPopulation()
-                hromosome1, hromosome2 = self.Junction(hromosome1, hromosome2)
-                hromosome1, hromosome2 = self.Mutation(hromosome1), self.Mutation(hromosome2)
-                if self.IsValidHromosome(hromosome1) or self.IsValidHromosome(hromosome2):
-                    # увеличение значения в случае, если при формировании новых хромосом хоть одна из них валидна
-                    validchange_count += 1
-                if self.IsValidHromosome(hromosome1):
-                    self.AddHromosomeToPopulation(hromosome1, newpopulation)
-                if self.IsValidHromosome(hromosome2):
-                    self.AddHromosomeToPopulation(hromosome2, newpopulation)
+        while (iter < self.__iterations) and (len(self.__population) > 1) and runningalgo and not self.IsTimeOver():
+            self.__duplicates = 0
+            if self.__engine == EvolutionEngine.BATCH:
+                attempts, validoffspring = self.BatchOffspringGeneration(newpopulation)
+            else:
+                attempts, validoffspring = self.SequentialOffspringGeneration(newpopulation)
+            if self.IsTimeOver():
+                # поиск прекращен во время формирования новой популяции - незавершенная популяция отбрасывается
+                break
             prevpopulation = self.__population
             self.__population = newpopulation
+            self.__profiler.Start('clean')
             self.CleanPopulation()
-            if self.__population == prevpopulation:
+            self.__profiler.Stop()
+            if self.__memetic > 0:
+                self.__profiler.Start('localsearch')
+                self.LocalSearchPopulation()
+                self.__profiler.Stop()
+            if self.__trie is not None:
+                self.__trie.SetLiveHromosomes(self.__population.Matrix())
+            if self.__population == prevpopulation and not self.CanAdaptOperatorRates():
                 # остановка алгоритма в случае если новая сформированная популяция не отличается от текущей популяции
                 runningalgo = False
+                self.__stopreason = 'converged'
+            improved = self.UpdateCurrentBest()
+            self.__stagnant = 0 if improved else self.__stagnant + 1
+            if runningalgo and self.__stagnation > 0 and self.__stagnant >= self.__stagnation:
+                runningalgo = False
+                self.__stopreason = 'stagnation'
+            if self.__ratecontrol == RateControl.ADAPTIVE:
+                self.AdaptOperatorRates(improved)
             newpopulation = self.GetGeneratedStartNewPopulation()
             iter += 1
+            self.__generations += 1
+            if self.__checkpointpath and self.__generations % self.__checkpointinterval == 0:
+                self.SaveCheckpoint(self.__checkpointpath)
+            if self.__callbacks:
+                self.__walltime += time.perf_counter() - starttime
+                self.EmitGenerationEvent(2*attempts, validoffspring)
+                starttime = time.perf_counter()
+        if self.__stopevent.is_set():
+            self.__stopreason = 'stopped'
+        elif self.IsTimeOver():
+            self.__stopreason = 'deadline'
+        elif runningalgo and iter < self.__iterations:
+            self.__stopreason = 'converged' # популяция состоит из одной особи
+        self.__walltime += time.perf_counter() - starttime
+
+    ## Установка числа итераций, выполняемых следующим вызовом Evolution
+    # @param iters - число итераций генетического алгоритма
+    def SetIterations(self, iters):
+        self.__iterations = iters
+
+    ## Функция, возвращающая количество проделанных итераций генетического алгоритма
+    # @return количество итераций
+    def GetGenerationsCount(self):
+        return self.__generations
+
+    ## Функция, возвращающая хромосомы текущей популяции
+    # @return список хромосом текущей популяции
+    def GetPopulationHromosomes(self):
+        return list(self.__population)
+
+    ## Установка текущей популяции
+    # @param hromosomes - список хромосом новой текущей популяции
+    def SetPopulation(self, hromosomes):
+        self.__population = Population(self.__graph.Vertexes(), hromosomes)
+        self.DeleteDublicatePopulationHromosomes()
+
+    ## Выбор нескольких наиболее приспособленных хромосом текущей популяции
+    # @param count - количество выбираемых хромосом
+    # @return список наиболее приспособленных валидных хромосом, упорядоченный от лучшей к худшей
+    def GetBestHromosomes(self, count):
+        hromosomes = list(self.__population)
+        times, lengths = self.GetPopulationFitness(hromosomes)
+        order = [idx for idx in np.lexsort((lengths, times)) if times[idx] > 0.0]
+        return [hromosomes[idx] for idx in order[:count]]
+
+    ## Добавление в текущую популяцию хромосом-мигрантов (из других популяций)
+    # Мигранты вытесняют наихудшие хромосомы популяции, если популяция уже имеет нужный размер
+    # @param hromosomes - список хромосом-мигрантов
+    def AddMigrants(self, hromosomes):
+        for hromosome in hromosomes:
+            if not self.IsValidCachedHromosome(hromosome) or (hromosome in self.__population):
+                continue
+            if len(self.__population) < self.__populationsize:
+                self.__population.Append(hromosome)
+            else:
+                self.__population.Replace(self.GetWorstPopulationIndex(self.__population), hromosome)
+        self.DeleteDublicatePopulationHromosomes()
 
     ## Поиск кратчайшего пути с учетом времени и длины пути
+    # Если задано ограничение времени поиска, то по его истечении возвращается наилучший путь, найденный к этому моменту
     # @return кратчайший путь
     def FindQuickestWay(self):
+        if self.__deadline is not None:
+            self.SetDeadline(self.__deadline)
+        self.__stagnant = 0
+        self.ResetOperatorRates()
+        self.GenerateFirstStartPopulation()
+        if self.__checkpointpath:
+            self.SaveCheckpoint(self.__checkpointpath)
+        self.Evolution()
+        self.__bestway = self.GetCurrentBest()[0] or self.RemoveHromosomeZeros(self.GetBestPopulationHromosome())
+        return self.__bestway
+
+    ## Продолжение поиска кратчайшего пути, восстановленного из контрольной точки (см. LoadCheckpoint)
+    # Выполняются итерации, оставшиеся до заданного числа итераций генетического алгоритма
+    # @return кратчайший путь
+    def ResumeQuickestWay(self):
+        if self.__deadline is not None:
+            self.SetDeadline(self.__deadline)
+        iterations = self.__iterations
+        self.__iterations = max(iterations - self.__generations, 0)
+        try:
+            self.Evolution()
+        finally:
+            self.__iterations = iterations
+        self.__bestway = self.GetCurrentBest()[0] or self.RemoveHromosomeZeros(self.GetBestPopulationHromosome())
+        return self.__bestway
+
+    ## Повторный поиск кратчайшего пути после изменения дорожной сети графа (см. Graph.SetEdgeLength и др.)
+    # Поиск начинается не со случайных хромосом, а с текущей популяции: хромосомы, путь которых стал невалидным,
+    # исправляются кратчайшими подпутями (независимо от способа исправления потомков) или удаляются, после чего
+    # популяция дополняется новыми хромосомами до размера, заданного при создании. Из кэша приспособленности удаляются только
+    # хромосомы, проходящие по изменившимся дорогам
+    # @return кратчайший путь
+    def WarmStartQuickestWay(self):
+        if self.__deadline is not None:
+            self.SetDeadline(self.__deadline)
+        self.ApplyGraphChanges()
+        self.__stagnant = 0
+        self.ResetOperatorRates()
+        with self.__bestlock:
+            self.__currentbest = ([], -1.0, -1.0) # наилучший путь мог стать невалидным или медленнее
+        hromosomes = list(self.__population)
+        times, lengths = self.GetPopulationFitness(hromosomes)
+        hromosomes = [hromosome if waytime > 0.0 else self.ShortestSubpathRepair(hromosome)
+                      for hromosome, waytime in zip(hromosomes, times.tolist())]
+        times, lengths = self.GetPopulationFitness(hromosomes)
+        self.__population = Population(self.__graph.Vertexes(),
+                                       [hromosome for hromosome, waytime in zip(hromosomes, times) if waytime > 0.0])
+        self.__populationsize = self.__requestedpopulationsize
         self.GenerateFirstStartPopulation()
+        if self.__checkpointpath:
+            self.SaveCheckpoint(self.__checkpointpath)
         self.Evolution()
-        self.__bestway = self.RemoveHromosomeZeros(self.GetBestPopulationHromosome())
-        return self.__bestway
\ No newline at end of file
+        self.__bestway = self.GetCurrentBest()[0] or self.RemoveHromosomeZeros(self.GetBestPopulationHromosome())
+        return self.__bestway
+
+    ## Включение периодической записи контрольной точки
+    # Контрольная точка записывается после формирования первой популяции и после каждых interval итераций
+    # @param filepath - путь до файла контрольной точки (пустая строка - запись отключена)
+    # @param interval - количество итераций между записями
+    def SetCheckpoint(self, filepath, interval=1):
+        self.__checkpointpath = filepath
+        self.__checkpointinterval = max(1, interval)
+
+    ## Функция, возвращающая параметры генетического алгоритма
+    # @return словарь с параметрами конструктора (кроме графа и генератора случайных чисел)
+    def GetConfiguration(self):
+        return {'tourchance': self.__basetournamentchance, 'muttype': self.__basemutationtype,
+                'mutchance': self.__basemutationchance, 'iters': self.__iterations,
+                'popsize': self.__requestedpopulationsize,
+                'startpoptype': self.__startpopulationtype, 'newpoptype': self.__newpopulationtype,
+                'cachesize': self.__cachesize, 'firstpoptype': self.__firstpopulationtype,
+                'junctiontype': self.__junctiontype, 'repairtype': self.__repairtype, 'deadline': self.__deadline,
+                'stagnation': self.__stagnation, 'engine': self.__engine, 'memetic': self.__memetic,
+                'trienodes': self.__trienodes, 'ratecontrol': self.__ratecontrol}
+
+    ## Запись контрольной точки: текущей популяции, наилучшего пути, счетчиков итераций, параметров генетического
+    # алгоритма и состояния генератора случайных чисел
+    # Файл (.npz со сжатием) записывается во временный файл и затем атомарно заменяет существующий
+    # @param filepath - путь до файла
+    def SaveCheckpoint(self, filepath):
+        bestway, besttime, bestlength = self.GetCurrentBest()
+        state = {'version': CHECKPOINT_VERSION, 'configuration': self.GetConfiguration(),
+                 'graph': [self.__graph.Vertexes(), self.__graph.StartPoint(), self.__graph.FinishPoint(),
+                           self.__graph.StartSeconds()],
+                 'generations': self.__generations, 'stagnant': self.__stagnant,
+                 'populationsize': self.__populationsize,
+                 'best': [besttime, bestlength], 'rng': self.__rng.bit_generator.state,
+                 'rates': list(self.GetOperatorRates()), 'improvements': self.__improvements}
+        tmppath = filepath + '.tmp'
+        f = open(tmppath, 'wb')
+        try:
+            np.savez_compressed(f, state=np.array(json.dumps(state)), population=self.__population.Matrix(),
+                                bestway=np.array(bestway, dtype=np.int64))
+        finally:
+            f.close()
+        os.replace(tmppath, filepath)
+
+    ## Восстановление состояния генетического алгоритма из контрольной точки
+    # Популяция, наилучший путь, счетчики итераций и состояние генератора случайных чисел заменяются сохраненными,
+    # поэтому продолжение поиска (ResumeQuickestWay) с теми же параметрами повторяет прерванный поиск
+    # @param filepath - путь до файла
+    # @return словарь с параметрами генетического алгоритма, сохраненными в контрольной точке
+    def LoadCheckpoint(self, filepath):
+        with np.load(filepath) as archive:
+            state = json.loads(str(archive['state']))
+            population = archive['population']
+            bestway = archive['bestway'].tolist()
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError('неподдерживаемая версия файла контрольной точки')
+        if state['graph'] != [self.__graph.Vertexes(), self.__graph.StartPoint(), self.__graph.FinishPoint(),
+                              self.__graph.StartSeconds()]:
+            raise ValueError('контрольная точка записана для другого графа или маршрута')
+        self.__population = Population(self.__graph.Vertexes())
+        self.__population.Extend(population)
+        self.__requestedpopulationsize = state['configuration']['popsize']
+        # текущий размер популяции (он сокращается при удалении повторяющихся хромосом)
+        self.__populationsize = state.get('populationsize', self.__requestedpopulationsize)
+        self.__generations = state['generations']
+        self.__stagnant = state['stagnant']
+        if 'rates' in state: # текущие значения при адаптивном управлении
+            self.__tournamentchance, self.__mutationtype, self.__mutationchance = state['rates']
+            self.__improvements = state['improvements']
+        with self.__bestlock:
+            self.__currentbest = (bestway, state['best'][0], state['best'][1])
+        if type(self.__rng.bit_generator).__name__ == state['rng']['bit_generator']:
+            self.__rng.bit_generator.state = state['rng']
+        else:
+            bitgenerator = getattr(np.random, state['rng']['bit_generator'])()
+            bitgenerator.state = state['rng']
+            self.__rng = np.random.Generator(bitgenerator)
+        return state['configuration']
+
+## Создание генетического алгоритма по контрольной точке
+# Генетический алгоритм создается с сохраненными параметрами и состоянием, поиск продолжается ResumeQuickestWay
+# @param graph - граф, для которого записана контрольная точка
+# @param filepath - путь до файла контрольной точки
+# @return генетический алгоритм
+def LoadGeneticAlgo(graph, filepath):
+    with np.load(filepath) as archive:
+        configuration = json.loads(str(archive['state']))['configuration']
+    genalgo = GeneticAlgo(graph, rng=np.random.default_rng(), **configuration)
+    genalgo.LoadCheckpoint(filepath)
+    return genalgo
\ No newline at end of file
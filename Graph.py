@@ -1,42 +1,342 @@
 ## @package Graph
 # Модуль для хранения графа и его считывания из файла
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
-import math
+import copy
+import hashlib
+import os
+import struct
+import zipfile
+
+from SparseMatrix import SparseMatrix
+
+# Константы модуля
+GRAPH_ARRAYS = ('header', 'adjoffsets', 'adjpoints', 'adjedges', 'edgepoints', 'edgelengths', 'edgeschedules',
+                'windowoffsets', 'windowspeeds', 'windowstarts', 'windowfinishes', 'windowtimes', 'scheduleslots') # массивы графа
+BINARY_VERSION = 2 # версия двоичного формата графа
+DAY_SECONDS = 24*3600 # количество секунд в сутках
+TIME_SLOTS = 2*24*60 + 1 # количество временных интервалов в таблицах времени проезда по дорогам:
+                         # для каждой минуты суток - ее начало и остаток минуты, а также время после окончания суток
 
 ## @class Graph
 class Graph:
 
     ## Конструктор
     # @param filepath - путь до файла с описанием графа
-    def __init__(self, filepath):
+    # @param arrays - словарь массивов графа (см. GetArrays), по которым граф строится вместо считывания файла
+    def __init__(self, filepath='', arrays=None):
+        if arrays is not None:
+            self.SetArrays(arrays)
+            return
+        if filepath.endswith('.npz'):
+            self.SetArrays(self.LoadBinary(filepath))
+            return
+        self.SetArrays(self.ParseFile(filepath))
+        self.CompileTravelTimes()
+        self.__ownsarrays = True
+
+    ## Считывание графа из текстового файла
+    # Файл считывается целиком и разбивается на лексемы, из которых сразу строятся массивы NumPy
+    # @param filepath - путь до файла с описанием графа
+    # @return словарь исходных массивов графа (без таблиц времени проезда)
+    def ParseFile(self, filepath):
         f = open(filepath, 'r')
-        self.__vertexes = int(f.readline().split()[0])
-        fpointsline = f.readline().split()
-        self.__startpoint, self.__finishpoint = int(fpointsline[0]), int(fpointsline[1])
-        self.__starttime = datetime.strptime(f.readline().split()[0], '%H:%M')
-        self.__distmatrix = list(np.zeros((self.__vertexes, self.__vertexes)))
-        f.readline()
-        while True: # считывание длин дорог в графе
-            fline = f.readline()
-            if fline == '\n':
-                break
-            else:
-                linedata = fline.split()
-                i, j, dist = int(linedata[0])-1, int(linedata[1])-1, float(linedata[2])
-                self.__distmatrix[i][j] = self.__distmatrix[j][i] = dist
-        self.__speedmatrix = [[dict() for j in range(self.__vertexes)] for i in range(self.__vertexes)]
-        while True: # считывание ограничений по скорости в определенные промежутки времени на каждой дороге
-            fline = f.readline()
-            if not fline:
-                break
-            linedata = fline.split()
-            point1, point2, key, start_time, finish_time = int(linedata[0])-1, int(linedata[1])-1, int(linedata[2]), \
-                                                           datetime.strptime(linedata[3], '%H:%M'),\
-                                                           datetime.strptime(linedata[4], '%H:%M')
-            self.__speedmatrix[point1][point2][key] = self.__speedmatrix[point2][point1][key] = [start_time, finish_time]
+        lines = f.read().splitlines()
         f.close()
+        vertexes = int(lines[0].split()[0])
+        fpointsline = lines[1].split()
+        startseconds = self.GetDaySeconds(datetime.strptime(lines[2].split()[0], '%H:%M'))
+        # длины дорог записаны до первой пустой строки, после нее - ограничения по скорости
+        separator = 4
+        while separator < len(lines) and lines[separator].strip():
+            separator += 1
+        disttokens = ' '.join(lines[4:separator]).split()
+        speedtokens = ' '.join(lines[separator+1:]).split()
+        if len(disttokens) % 3 or len(speedtokens) % 5:
+            raise ValueError('Неверный формат файла с описанием графа: ' + filepath)
+        distdata = np.array(disttokens, dtype=object).reshape((-1, 3))
+        speeddata = np.array(speedtokens, dtype=object).reshape((-1, 5))
+        # считывание длин дорог в графе (при повторном указании дороги берется последнее значение)
+        distpoints = self.GetOrderedPoints(distdata[:, 0].astype(np.int64)-1, distdata[:, 1].astype(np.int64)-1)
+        dists = distdata[:, 2].astype(np.float64)
+        distpairs = distpoints[:, 0]*vertexes + distpoints[:, 1] # пары вершин дорог в виде одного числа
+        last = self.GetLastOccurrences(distpairs)
+        distpairs, dists = distpairs[last], dists[last]
+        # считывание ограничений по скорости в определенные промежутки времени на каждой дороге.
+        # Скорости дороги упорядочены по первому их упоминанию, а промежуток времени берется из последнего
+        speedpoints = self.GetOrderedPoints(speeddata[:, 0].astype(np.int64)-1, speeddata[:, 1].astype(np.int64)-1)
+        speeds = speeddata[:, 2].astype(np.int64)
+        starts, finishes = self.ParseDaySeconds(speeddata[:, 3]), self.ParseDaySeconds(speeddata[:, 4])
+        for points in (distpoints, speedpoints):
+            if points.size and (points.min() < 0 or points.max() >= vertexes):
+                raise ValueError('Номер вершины вне графа в файле с описанием графа: ' + filepath)
+        speedpairs = speedpoints[:, 0]*vertexes + speedpoints[:, 1]
+        windowkeys = np.stack((speedpairs, speeds), axis=1)
+        uniquekeys, first = np.unique(windowkeys, axis=0, return_index=True)
+        last = self.GetLastOccurrences(windowkeys)
+        # дороги - пары вершин, для которых задана длина или ограничения по скорости
+        pairs = np.union1d(distpairs[dists != 0], speedpairs)
+        edgepoints = np.stack((pairs // vertexes, pairs % vertexes), axis=1).astype(np.int32)
+        edgelengths = np.zeros(len(pairs))
+        known = np.isin(distpairs, pairs)
+        edgelengths[np.searchsorted(pairs, distpairs[known])] = dists[known]
+        order = np.lexsort((first, np.searchsorted(pairs, uniquekeys[:, 0]))) # по дорогам, затем по первому упоминанию
+        windowedges = np.searchsorted(pairs, uniquekeys[order, 0])
+        windowoffsets = np.zeros(len(pairs)+1, dtype=np.int64)
+        windowoffsets[1:] = np.cumsum(np.bincount(windowedges, minlength=len(pairs)))
+        header = np.array([vertexes, int(fpointsline[0]), int(fpointsline[1]), startseconds], dtype=np.int64)
+        return {'header': header, 'edgepoints': edgepoints, 'edgelengths': edgelengths, 'windowoffsets': windowoffsets,
+                'windowspeeds': uniquekeys[order, 1], 'windowstarts': starts[last[order]].astype(np.int32),
+                'windowfinishes': finishes[last[order]].astype(np.int32)}
+
+    ## Упорядочивание номеров вершин каждой дороги по возрастанию
+    # @param points1 - массив номеров первых вершин дорог
+    # @param points2 - массив номеров вторых вершин дорог
+    # @return массив размера (количество дорог, 2)
+    def GetOrderedPoints(self, points1, points2):
+        return np.stack((np.minimum(points1, points2), np.maximum(points1, points2)), axis=1)
+
+    ## Функция, возвращающая номера последних вхождений каждого уникального ключа
+    # @param keys - массив ключей (одномерный или двумерный - тогда ключом является строка)
+    # @return номера последних вхождений ключей, упорядоченные по возрастанию ключей
+    def GetLastOccurrences(self, keys):
+        uniquekeys, reversedlast = np.unique(keys[::-1], axis=0, return_index=True)
+        return len(keys) - 1 - reversedlast
+
+    ## Перевод массива строк времени вида "ЧЧ:ММ" в секунды от начала суток
+    # @param strtimes - массив строк времени
+    # @return массив чисел секунд от начала суток
+    def ParseDaySeconds(self, strtimes):
+        parts = np.char.partition(strtimes.astype(str), ':')
+        hours, minutes = parts[:, 0].astype(np.int64), parts[:, 2].astype(np.int64)
+        if np.any((parts[:, 1] != ':') | (hours < 0) | (hours > 23) | (minutes < 0) | (minutes > 59)):
+            raise ValueError('Неверный формат времени в файле с описанием графа')
+        return hours*3600 + minutes*60
+
+    ## Предварительный расчет таблиц времени проезда по каждой дороге графа
+    # Для каждой дороги по номеру ее расписания и временному интервалу можно определить выбранное ограничение
+    # по скорости, а по нему - время проезда в секундах. Дороги с одинаковыми промежутками времени ограничений
+    # по скорости разделяют одну таблицу расписания, что сохраняет память
+    def CompileTravelTimes(self):
+        self.CompileAdjacency()
+        # время проезда по дороге при каждом ограничении по скорости
+        counts = np.diff(self.__windowoffsets)
+        dists = np.repeat(self.__edgelengths, counts)
+        speeds = self.__windowspeeds.astype(np.float64)
+        positive = speeds > 0.0
+        windowtimes = np.full(len(speeds), -1, dtype=np.int64)
+        windowtimes[positive] = (3600*dists[positive]/speeds[positive]).astype(np.int64)
+        self.__windowtimes = np.append(windowtimes, -1) # ограничитель, благодаря которому массив не бывает пустым
+        # расписания дорог
+        self.__edgeschedules = np.zeros(len(self.__edgepoints), dtype=np.int32)
+        schedules = dict() # промежутки времени ограничений по скорости дороги -> номер расписания
+        scheduleslots = []
+        slottimes = self.GetTimeSlotSeconds()
+        windows = list(zip(self.__windowstarts.tolist(), self.__windowfinishes.tolist(), (~positive).tolist()))
+        offsets = self.__windowoffsets.tolist()
+        for edge in range(len(self.__edgepoints)):
+            edgewindows = windows[offsets[edge]:offsets[edge+1]]
+            # промежуток времени последней скорости не проверяется - она выбирается, если не подошла ни одна другая
+            schedulekey = tuple(edgewindows[:-1]) + tuple(window[2] for window in edgewindows[-1:])
+            if schedulekey not in schedules:
+                schedules[schedulekey] = len(scheduleslots)
+                scheduleslots.append(self.GetScheduleSlots(edgewindows, slottimes))
+            self.__edgeschedules[edge] = schedules[schedulekey]
+        self.__scheduleslots = np.array(scheduleslots, dtype=np.int16).reshape((len(scheduleslots), TIME_SLOTS))
+        self.__schedulerows = None
+
+    ## Построение списков смежности графа в разреженном формате (CSR)
+    # Соседи вершины i - adjpoints[adjoffsets[i]:adjoffsets[i+1]] (по возрастанию номеров), adjedges - номера
+    # соответствующих дорог. Поиск дороги между вершинами выполняется двоичным поиском в упорядоченном массиве
+    # ключей (номер первой вершины * количество вершин + номер второй вершины), поэтому память линейна
+    # по количеству дорог, а не квадратична по количеству вершин
+    def CompileAdjacency(self):
+        vertexes = self.__vertexes
+        points1, points2 = self.__edgepoints[:, 0].astype(np.int64), self.__edgepoints[:, 1].astype(np.int64)
+        edges = np.arange(len(self.__edgepoints), dtype=np.int32)
+        loops = points1 == points2 # петля входит в списки смежности один раз
+        sources = np.concatenate((points1, points2[~loops]))
+        targets = np.concatenate((points2, points1[~loops]))
+        keys = sources*vertexes + targets
+        order = np.argsort(keys, kind='stable')
+        self.__adjkeys = keys[order]
+        self.__adjpoints = targets[order].astype(np.int32)
+        self.__adjedges = np.concatenate((edges, edges[~loops]))[order]
+        self.__adjoffsets = np.searchsorted(self.__adjkeys, np.arange(vertexes+1, dtype=np.int64)*vertexes)
+
+    ## Функция, возвращающая все данные графа в виде словаря массивов NumPy
+    # По этим массивам граф может быть восстановлен без считывания файла: Graph(arrays=...)
+    # @return словарь: имя массива -> массив
+    def GetArrays(self):
+        header = np.array([self.__vertexes, self.__startpoint, self.__finishpoint, self.StartSeconds()], dtype=np.int64)
+        return {'header': header, 'adjoffsets': self.__adjoffsets, 'adjpoints': self.__adjpoints,
+                'adjedges': self.__adjedges, 'edgepoints': self.__edgepoints, 'edgelengths': self.__edgelengths,
+                'edgeschedules': self.__edgeschedules, 'windowoffsets': self.__windowoffsets,
+                'windowspeeds': self.__windowspeeds, 'windowstarts': self.__windowstarts,
+                'windowfinishes': self.__windowfinishes, 'windowtimes': self.__windowtimes,
+                'scheduleslots': self.__scheduleslots}
+
+    ## Функция, возвращающая хэш дорожной сети графа
+    # Хэш зависит только от дорожной сети (не от маршрута и времени начала пути) и меняется при ее изменении
+    # @return строка - шестнадцатеричный хэш SHA-256
+    def GetContentHash(self):
+        digest = hashlib.sha256(str(self.__vertexes).encode())
+        for name, array in sorted(self.GetArrays().items()):
+            if name != 'header':
+                digest.update(('%s%s%s' % (name, array.dtype.str, array.shape)).encode())
+                digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    ## Установка данных графа из словаря массивов NumPy
+    # Массивы не копируются, поэтому они могут находиться, например, в разделяемой памяти
+    # @param arrays - словарь массивов графа (см. GetArrays)
+    def SetArrays(self, arrays):
+        header = arrays['header']
+        self.__vertexes, self.__startpoint, self.__finishpoint = int(header[0]), int(header[1]), int(header[2])
+        self.__starttime = self.GetDayMoment(int(header[3]))
+        self.__edgepoints = arrays['edgepoints']
+        self.__edgelengths = arrays['edgelengths']
+        self.__windowoffsets = arrays['windowoffsets']
+        self.__windowspeeds = arrays['windowspeeds']
+        self.__windowstarts = arrays['windowstarts']
+        self.__windowfinishes = arrays['windowfinishes']
+        # таблицы времени проезда могут отсутствовать - тогда их нужно рассчитать (CompileTravelTimes)
+        self.__adjoffsets = arrays.get('adjoffsets')
+        self.__adjpoints = arrays.get('adjpoints')
+        self.__adjedges = arrays.get('adjedges')
+        self.__adjkeys = None
+        if self.__adjoffsets is not None:
+            rows = np.repeat(np.arange(self.__vertexes, dtype=np.int64), np.diff(self.__adjoffsets))
+            self.__adjkeys = rows*self.__vertexes + self.__adjpoints
+        self.__edgeschedules = arrays.get('edgeschedules')
+        self.__windowtimes = arrays.get('windowtimes')
+        self.__scheduleslots = arrays.get('scheduleslots')
+        # массивы могут быть отображены в память или разделяться с другими графами - они копируются перед изменением
+        self.__ownsarrays = False
+        self.__schedulerows = None # байтовое представление таблицы расписания -> номер расписания
+        self.__revision = 0 # номер последнего изменения дорожной сети
+        self.__edgerevisions = None # номер последнего изменения каждой дороги
+
+    ## Сохранение графа в двоичном формате (.npz без сжатия)
+    # Файл записывается во временный файл и затем атомарно заменяет существующий
+    # @param filepath - путь до файла
+    def SaveBinary(self, filepath):
+        tmppath = filepath + '.tmp'
+        f = open(tmppath, 'wb')
+        try:
+            np.savez(f, version=np.array([BINARY_VERSION], dtype=np.int64), **self.GetArrays())
+        finally:
+            f.close()
+        os.replace(tmppath, filepath)
+
+    ## Считывание массивов графа из файла в двоичном формате
+    # Массивы, хранящиеся в архиве без сжатия, не считываются, а отображаются в память
+    # @param filepath - путь до файла
+    # @return словарь массивов графа (см. GetArrays)
+    def LoadBinary(self, filepath):
+        arrays = dict()
+        with zipfile.ZipFile(filepath) as archive:
+            for info in archive.infolist():
+                name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+                arrays[name] = self.MapBinaryArray(filepath, archive, info)
+        if 'version' not in arrays or int(arrays.pop('version')[0]) != BINARY_VERSION:
+            raise ValueError('Неподдерживаемая версия двоичного формата графа: ' + filepath)
+        return arrays
+
+    ## Отображение в память одного массива архива .npz
+    # @param filepath - путь до файла архива
+    # @param archive - открытый архив
+    # @param info - описание элемента архива
+    # @return массив (отображенный в память или считанный, если отображение невозможно)
+    def MapBinaryArray(self, filepath, archive, info):
+        with archive.open(info) as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            headersize = f.tell()
+            if info.compress_type != zipfile.ZIP_STORED or dtype.hasobject or 0 in shape:
+                return np.lib.format.read_array(f)
+        # данные элемента начинаются после его локального заголовка в архиве
+        with open(filepath, 'rb') as f:
+            f.seek(info.header_offset)
+            localheader = f.read(30)
+        namelength, extralength = struct.unpack('<HH', localheader[26:30])
+        offset = info.header_offset + 30 + namelength + extralength + headersize
+        return np.memmap(filepath, dtype=dtype, mode='r', offset=offset, shape=shape,
+                         order='F' if fortran else 'C')
+
+    ## Функция, возвращающая ограничения по скорости на дороге в виде словаря
+    # @param edge - номер дороги
+    # @return словарь: скорость -> [начало промежутка времени, окончание промежутка времени]
+    def GetEdgeSpeeds(self, edge):
+        speeds = dict()
+        for window in range(self.__windowoffsets[edge], self.__windowoffsets[edge+1]):
+            speeds[int(self.__windowspeeds[window])] = [self.GetDayMoment(int(self.__windowstarts[window])),
+                                                        self.GetDayMoment(int(self.__windowfinishes[window]))]
+        return speeds
+
+    ## Расчет номеров выбираемых ограничений по скорости дороги для каждого временного интервала
+    # Скорость выбирается так же, как при движении по хромосоме: первая из всех скоростей, кроме последней,
+    # в промежуток времени которой попадает текущий момент, иначе - последняя. Неположительная скорость,
+    # встреченная при переборе, также выбирается (время проезда по ней считается невалидным)
+    # @param windows - список промежутков времени (начало, окончание, неположительность скорости) дороги
+    # @param slottimes - моменты времени, соответствующие каждому временному интервалу
+    # @return массив номеров ограничений по скорости (-1, если у дороги нет ограничений по скорости)
+    def GetScheduleSlots(self, windows, slottimes):
+        slots = np.full(TIME_SLOTS, len(windows)-1, dtype=np.int16)
+        chosen = np.zeros(TIME_SLOTS, dtype=bool)
+        for idx, (start_time, finish_time, nonpositive) in enumerate(windows[:-1]):
+            hit = ~chosen & (nonpositive | ((start_time <= slottimes) & (slottimes <= finish_time)))
+            slots[hit] = idx
+            chosen |= hit
+        return slots
+
+    ## Функция, возвращающая моменты времени (в секундах от начала суток), соответствующие временным интервалам
+    # @return массив моментов времени
+    def GetTimeSlotSeconds(self):
+        minutes = np.arange(TIME_SLOTS-1) // 2
+        return np.append(minutes*60 + np.arange(TIME_SLOTS-1) % 2, DAY_SECONDS)
+
+    ## Функция, возвращающая номер временного интервала для момента времени
+    # @param seconds - момент времени в секундах от начала суток
+    # @return номер временного интервала
+    def GetTimeSlot(self, seconds):
+        if seconds >= DAY_SECONDS:
+            return TIME_SLOTS-1
+        return 2*(seconds//60) + (seconds % 60 != 0)
+
+    ## Функция, возвращающая номера временных интервалов для массива моментов времени
+    # @param seconds - массив моментов времени в секундах от начала суток
+    # @return массив номеров временных интервалов
+    def GetTimeSlots(self, seconds):
+        return np.where(seconds >= DAY_SECONDS, TIME_SLOTS-1, 2*(seconds//60) + (seconds % 60 != 0))
+
+    ## Перевод момента времени в целое число секунд от начала суток
+    # @param moment - момент времени (datetime)
+    # @return число секунд от начала суток
+    def GetDaySeconds(self, moment):
+        return moment.hour*3600 + moment.minute*60 + moment.second
+
+    ## Перевод целого числа секунд от начала суток в момент времени
+    # @param seconds - число секунд от начала суток
+    # @return момент времени (datetime) в тех же сутках, что и при считывании времени из файла
+    def GetDayMoment(self, seconds):
+        return datetime.strptime('0:00', '%H:%M') + timedelta(seconds=seconds)
+
+    ## Функция, возвращающая граф с той же дорожной сетью, но с другим маршрутом
+    # Данные дорожной сети не копируются, а разделяются с исходным графом
+    # @param startpoint - номер вершины - начальной точки пути
+    # @param finishpoint - номер вершины - конечной точки пути
+    # @param starttime - время начала пути (datetime)
+    # @return граф с заданным маршрутом
+    def GetRouteGraph(self, startpoint, finishpoint, starttime):
+        graph = copy.copy(self)
+        self.__ownsarrays = graph.__ownsarrays = False # изменение одного из графов не затронет другой
+        graph.__startpoint, graph.__finishpoint, graph.__starttime = startpoint, finishpoint, starttime
+        return graph
 
     ## Функция, возвращающая количество вершин в графе
     # @return количетсво вершин в графе
@@ -58,20 +358,281 @@ class Graph:
     def StartTime(self):
         return self.__starttime
 
+    ## Функция, возвращающая время начала пути в секундах от начала суток
+    # @return время начала пути в секундах
+    def StartSeconds(self):
+        return self.GetDaySeconds(self.__starttime)
+
     ## Функция, возвращающая матрицу смежности со всеми длинами дорог в графе
+    # Матрица не хранится целиком: ее элементы вычисляются по спискам смежности при обращении к ним
     # @return vатрица смежности со всеми длинами дорог в графе
     def DistanceMatrix(self):
-        return self.__distmatrix
+        return SparseMatrix(self, lambda edge: self.__edgelengths[edge], lambda: 0.0)
 
     ## Функция, возвращающая матрицу смежности с ограничениями по скорости движения в промежутки времени на каждой дороге
-    # Матрица смежности имеет структуру словаря
+    # Элементы матрицы смежности - словари, которые строятся по массивам ограничений по скорости при обращении к ним
     # @return vатрица смежности со всеми ограничениями по скорости движения в промежутки времени на каждой из дорог
     def SpeedMatrix(self):
-        return self.__speedmatrix
+        return SparseMatrix(self, self.GetEdgeSpeeds, dict)
+
+    ## Функция, возвращающая количество дорог в графе
+    # @return количество дорог в графе
+    def Edges(self):
+        return len(self.__edgelengths)
+
+    ## Функция, возвращающая номер дороги между двумя вершинами
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @return номер дороги или -1, если дороги нет (допускаются массивы номеров вершин)
+    def GetEdgeIndex(self, point1, point2):
+        if np.ndim(point1) == 0 and np.ndim(point2) == 0:
+            point1, point2 = int(point1), int(point2)
+            point1 += self.__vertexes if point1 < 0 else 0 # отрицательные номера отсчитываются с конца,
+            point2 += self.__vertexes if point2 < 0 else 0 # как при обращении к матрице смежности
+            if not (0 <= point1 < self.__vertexes and 0 <= point2 < self.__vertexes):
+                return -1
+            start, finish = int(self.__adjoffsets[point1]), int(self.__adjoffsets[point1+1])
+            pos = start + int(np.searchsorted(self.__adjpoints[start:finish], point2))
+            return int(self.__adjedges[pos]) if pos < finish and self.__adjpoints[pos] == point2 else -1
+        points1 = np.where(np.less(point1, 0), np.add(point1, self.__vertexes), point1)
+        points2 = np.where(np.less(point2, 0), np.add(point2, self.__vertexes), point2)
+        known = (points1 >= 0) & (points1 < self.__vertexes) & (points2 >= 0) & (points2 < self.__vertexes)
+        if not len(self.__adjkeys):
+            return np.full(known.shape, -1, dtype=np.int32)
+        keys = points1.astype(np.int64)*self.__vertexes + points2
+        positions = np.minimum(np.searchsorted(self.__adjkeys, keys), len(self.__adjkeys)-1)
+        return np.where(known & (self.__adjkeys[positions] == keys), self.__adjedges[positions], -1)
+
+    ## Функция, возвращающая соседей вершины
+    # @param point - номер вершины (начиная с 0)
+    # @return массив номеров соседних вершин (по возрастанию, начиная с 0) и массив номеров ведущих к ним дорог
+    def GetNeighbors(self, point):
+        start, finish = self.__adjoffsets[point], self.__adjoffsets[point+1]
+        return self.__adjpoints[start:finish], self.__adjedges[start:finish]
+
+    ## Функция, определяющая дороги, по которым можно проехать хотя бы в какой-то момент времени
+    # @return булев массив: дорога имеет положительную длину и хотя бы одно положительное ограничение по скорости
+    def GetPassableEdges(self):
+        windowedges = np.repeat(np.arange(len(self.__edgelengths)), np.diff(self.__windowoffsets))
+        positive = np.bincount(windowedges[self.__windowspeeds > 0], minlength=len(self.__edgelengths)) > 0
+        return positive & (self.__edgelengths > 0)
+
+    ## Функция, возвращающая наименьшее время проезда по каждой дороге среди всех ограничений по скорости
+    # @return массив наименьших времен проезда в секундах (inf для дорог, по которым проехать нельзя)
+    def GetEdgesMinTravelTimes(self):
+        result = np.full(len(self.__edgelengths), np.inf)
+        windowedges = np.repeat(np.arange(len(self.__edgelengths)), np.diff(self.__windowoffsets))
+        times = self.__windowtimes[:len(windowedges)]
+        np.minimum.at(result, windowedges[times >= 0], times[times >= 0])
+        return result
+
+    ## Функция, возвращающая расстояния от всех вершин до заданной вершины в количестве дорог
+    # Учитываются только дороги, по которым можно проехать (GetPassableEdges).
+    # Расстояния считаются поиском в ширину по спискам смежности
+    # @param point - номер вершины (начиная с 0)
+    # @return массив расстояний (-1 для вершин, из которых нельзя добраться до заданной вершины)
+    def GetHopDistances(self, point):
+        passable = self.GetPassableEdges()
+        hops = np.full(self.__vertexes, -1, dtype=np.int64)
+        hops[point] = 0
+        frontier = np.array([point], dtype=np.int64)
+        distance = 0
+        while len(frontier):
+            starts = self.__adjoffsets[frontier]
+            counts = self.__adjoffsets[frontier+1] - starts
+            # номера элементов списков смежности всех вершин фронта
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbors = self.__adjpoints[positions][passable[self.__adjedges[positions]]]
+            frontier = np.unique(neighbors[hops[neighbors] < 0]).astype(np.int64)
+            distance += 1
+            hops[frontier] = distance
+        return hops
+
+    ## Функция, возвращающая длины дорог графа по их номерам
+    # @return массив длин дорог
+    def EdgeLengths(self):
+        return self.__edgelengths
+
+    ## Функция, возвращающая время проезда по дороге в заданный момент времени
+    # @param edge - номер дороги (-1, если дороги нет)
+    # @param seconds - момент въезда на дорогу в секундах от начала суток
+    # @return время проезда в секундах или -1, если проехать по дороге невозможно
+    def GetEdgeTravelTime(self, edge, seconds):
+        if edge < 0:
+            return -1
+        window = self.__scheduleslots[self.__edgeschedules[edge], self.GetTimeSlot(seconds)]
+        if window < 0:
+            return -1
+        return int(self.__windowtimes[self.__windowoffsets[edge] + window])
+
+    ## Функция, возвращающая время проезда по дорогам в заданные моменты времени
+    # @param edges - массив номеров дорог (-1, если дороги нет)
+    # @param seconds - массив моментов въезда на дороги в секундах от начала суток
+    # @return массив времен проезда в секундах (-1, если проехать по дороге невозможно)
+    def GetEdgesTravelTimes(self, edges, seconds):
+        knownedges = np.maximum(edges, 0)
+        windows = self.__scheduleslots[self.__edgeschedules[knownedges], self.GetTimeSlots(seconds)]
+        result = self.__windowtimes[np.maximum(self.__windowoffsets[knownedges] + windows, 0)]
+        return np.where((edges < 0) | (windows < 0), -1, result)
+
+    ## Функция, возвращающая номер последнего изменения дорожной сети графа
+    # Номер увеличивается при каждом изменении длины дороги или ограничений по скорости на ней
+    # @return номер изменения (0 - граф не изменялся)
+    def Revision(self):
+        return self.__revision
+
+    ## Функция, возвращающая дороги, изменившиеся после заданного изменения дорожной сети
+    # @param revision - номер изменения (см. Revision)
+    # @return массив номеров дорог
+    def GetChangedEdges(self, revision):
+        if self.__edgerevisions is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.nonzero(self.__edgerevisions > revision)[0]
+
+    ## Изменение длины дороги
+    # Если дороги между вершинами нет, она добавляется (без ограничений по скорости, как в файле с описанием графа)
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @param length - новая длина дороги
+    def SetEdgeLength(self, point1, point2, length):
+        edge = self.GetUpdatedEdge(point1, point2, True)
+        self.__edgelengths[edge] = length
+        self.CompileEdgeTravelTimes(edge)
+
+    ## Добавление ограничения по скорости на дороге
+    # Как и при считывании файла с описанием графа, для уже заданной скорости заменяется только промежуток времени,
+    # а новая скорость добавляется последней (и действует, если не подошла ни одна другая скорость).
+    # Если дороги между вершинами нет, она добавляется с нулевой длиной
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @param speed - ограничение по скорости
+    # @param start - начало промежутка времени в секундах от начала суток
+    # @param finish - окончание промежутка времени в секундах от начала суток
+    def AddSpeedWindow(self, point1, point2, speed, start, finish):
+        if not (0 <= start < DAY_SECONDS and 0 <= finish < DAY_SECONDS):
+            raise ValueError('Промежуток времени ограничения по скорости вне суток')
+        edge = self.GetUpdatedEdge(point1, point2, True)
+        first, last = int(self.__windowoffsets[edge]), int(self.__windowoffsets[edge+1])
+        speeds = self.__windowspeeds[first:last].tolist()
+        starts, finishes = self.__windowstarts[first:last].tolist(), self.__windowfinishes[first:last].tolist()
+        if speed in speeds:
+            idx = speeds.index(speed)
+            starts[idx], finishes[idx] = start, finish
+        else:
+            speeds.append(speed)
+            starts.append(start)
+            finishes.append(finish)
+        self.SetEdgeWindows(edge, speeds, starts, finishes)
+
+    ## Удаление ограничения по скорости на дороге
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @param speed - удаляемое ограничение по скорости
+    def RemoveSpeedWindow(self, point1, point2, speed):
+        edge = self.GetUpdatedEdge(point1, point2, False)
+        first, last = int(self.__windowoffsets[edge]), int(self.__windowoffsets[edge+1])
+        speeds = self.__windowspeeds[first:last].tolist()
+        if speed not in speeds:
+            raise ValueError('На дороге нет ограничения по скорости %d' % speed)
+        idx = speeds.index(speed)
+        starts, finishes = self.__windowstarts[first:last].tolist(), self.__windowfinishes[first:last].tolist()
+        del speeds[idx], starts[idx], finishes[idx]
+        self.SetEdgeWindows(edge, speeds, starts, finishes)
+
+    ## Закрытие дороги: удаление всех ограничений по скорости на ней
+    # Дорога остается в списках смежности, но проехать по ней невозможно (пока не добавлено ограничение по скорости)
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    def CloseRoad(self, point1, point2):
+        self.SetEdgeWindows(self.GetUpdatedEdge(point1, point2, False), [], [], [])
+
+    ## Функция, возвращающая номер изменяемой дороги
+    # Перед первым изменением массивы графа копируются, изменение дороги запоминается
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @param create - добавлять ли дорогу, если ее нет
+    # @return номер дороги
+    def GetUpdatedEdge(self, point1, point2, create):
+        if not (0 <= point1 < self.__vertexes and 0 <= point2 < self.__vertexes):
+            raise ValueError('Номер вершины вне графа')
+        self.MakeArraysWritable()
+        edge = self.GetEdgeIndex(point1, point2)
+        if edge < 0:
+            if not create:
+                raise ValueError('Нет дороги между вершинами %d и %d' % (point1+1, point2+1))
+            edge = self.AddEdge(point1, point2)
+        self.__revision += 1
+        self.__edgerevisions[edge] = self.__revision
+        return edge
+
+    ## Копирование массивов графа, если они отображены в память или разделяются с другими графами
+    def MakeArraysWritable(self):
+        if not self.__ownsarrays:
+            revision, edgerevisions = self.__revision, self.__edgerevisions
+            self.SetArrays({name: np.array(array) for name, array in self.GetArrays().items()})
+            self.__revision = revision
+            self.__edgerevisions = None if edgerevisions is None else np.array(edgerevisions)
+            self.__ownsarrays = True
+        if self.__edgerevisions is None:
+            self.__edgerevisions = np.zeros(len(self.__edgelengths), dtype=np.int64)
+
+    ## Добавление дороги нулевой длины без ограничений по скорости
+    # @param point1 - номер первой вершины (начиная с 0)
+    # @param point2 - номер второй вершины (начиная с 0)
+    # @return номер добавленной дороги
+    def AddEdge(self, point1, point2):
+        edge = len(self.__edgelengths)
+        points = np.array([[min(point1, point2), max(point1, point2)]], dtype=self.__edgepoints.dtype)
+        self.__edgepoints = np.concatenate((self.__edgepoints, points))
+        self.__edgelengths = np.append(self.__edgelengths, 0.0)
+        self.__windowoffsets = np.append(self.__windowoffsets, self.__windowoffsets[-1])
+        self.__edgeschedules = np.append(self.__edgeschedules, np.int32(0))
+        self.__edgerevisions = np.append(self.__edgerevisions, 0)
+        self.CompileAdjacency()
+        self.CompileEdgeTravelTimes(edge)
+        return edge
+
+    ## Замена всех ограничений по скорости на дороге
+    # @param edge - номер дороги
+    # @param speeds - список скоростей
+    # @param starts - список начал промежутков времени в секундах от начала суток
+    # @param finishes - список окончаний промежутков времени в секундах от начала суток
+    def SetEdgeWindows(self, edge, speeds, starts, finishes):
+        first, last = int(self.__windowoffsets[edge]), int(self.__windowoffsets[edge+1])
+        def Splice(array, values):
+            return np.concatenate((array[:first], np.array(values, dtype=array.dtype), array[last:]))
+        self.__windowspeeds = Splice(self.__windowspeeds, speeds)
+        self.__windowstarts = Splice(self.__windowstarts, starts)
+        self.__windowfinishes = Splice(self.__windowfinishes, finishes)
+        self.__windowtimes = Splice(self.__windowtimes, np.full(len(speeds), -1))
+        self.__windowoffsets[edge+1:] += len(speeds) - (last - first)
+        self.CompileEdgeTravelTimes(edge)
+
+    ## Расчет времени проезда и расписания одной дороги (как CompileTravelTimes для всех дорог)
+    # Одинаковые таблицы расписания не повторяются, а таблицы, которые больше не используются, не удаляются
+    # @param edge - номер дороги
+    def CompileEdgeTravelTimes(self, edge):
+        first, last = int(self.__windowoffsets[edge]), int(self.__windowoffsets[edge+1])
+        speeds = self.__windowspeeds[first:last].astype(np.float64)
+        positive = speeds > 0.0
+        windowtimes = np.full(len(speeds), -1, dtype=np.int64)
+        windowtimes[positive] = (3600*self.__edgelengths[edge]/speeds[positive]).astype(np.int64)
+        self.__windowtimes[first:last] = windowtimes
+        windows = list(zip(self.__windowstarts[first:last].tolist(), self.__windowfinishes[first:last].tolist(),
+                           (~positive).tolist()))
+        slots = self.GetScheduleSlots(windows, self.GetTimeSlotSeconds())
+        if self.__schedulerows is None:
+            self.__schedulerows = {row.tobytes(): idx for idx, row in enumerate(self.__scheduleslots)}
+        key = slots.tobytes()
+        if key not in self.__schedulerows:
+            self.__schedulerows[key] = len(self.__scheduleslots)
+            self.__scheduleslots = np.concatenate((self.__scheduleslots, slots[np.newaxis, :]))
+        self.__edgeschedules[edge] = self.__schedulerows[key]
 
     ## Функция, возвращающая число всех возможных различных путей графа
-    # @return число всевозможных различных путей графа
-    def GetAllDifferentWaysCount(self):
+    # @param limit - число, при достижении которого подсчет прекращается (None - без ограничения)
+    # @return число всевозможных различных путей графа (не больше limit, если он задан)
+    def GetAllDifferentWaysCount(self, limit=None):
         if self.__vertexes < 2:
             return 0
         elif self.__vertexes == 2:
@@ -79,7 +640,34 @@ class Graph:
         else:
             sum = 0
             n = self.__vertexes-2
+            ways = 1 # число путей с k промежуточными вершинами: n!/(n-k)!
             for k in range(n+1):
-                sum += int(math.factorial(n)/math.factorial(n-k))
+                sum += ways
+                if limit is not None and sum >= limit:
+                    return limit
+                ways *= n-k
             return sum
-        return 0
\ No newline at end of file
+        return 0
+
+## Загрузка графа с кэшированием в двоичном формате
+# При первой загрузке текстового файла рядом с ним сохраняется файл .npz, который используется при следующих
+# загрузках, пока он не старше текстового файла
+# @param filepath - путь до файла с описанием графа (текстового или .npz)
+# @param cachepath - путь до файла кэша (по умолчанию - путь до файла графа с добавлением .npz)
+# @return граф
+def LoadGraph(filepath, cachepath=None):
+    if filepath.endswith('.npz'):
+        return Graph(filepath)
+    if cachepath is None:
+        cachepath = filepath + '.npz'
+    if os.path.exists(cachepath) and os.path.getmtime(cachepath) >= os.path.getmtime(filepath):
+        try:
+            return Graph(cachepath)
+        except (ValueError, KeyError, OSError, zipfile.BadZipFile):
+            pass # кэш поврежден или устарел - граф считывается заново
+    graph = Graph(filepath)
+    try:
+        graph.SaveBinary(cachepath)
+    except OSError:
+        pass # кэш не удалось записать - граф все равно считан
+    return graph
\ No newline at end of file
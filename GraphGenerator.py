@@ -0,0 +1,94 @@
+## @package GraphGenerator
+# Модуль для генерации синтетических графов городской дорожной сети в текстовом формате, который считывает Graph.
+# Вершины располагаются в узлах квадратной решетки, дороги соединяют соседние узлы. Случайное остовное дерево решетки
+# делает граф связным, остальные дороги решетки добавляются с заданной вероятностью (плотностью).
+# Одинаковые параметры и начальное значение генератора случайных чисел дают одинаковые графы
+
+import argparse
+import math
+
+import numpy as np
+
+# Константы модуля
+SPEEDS = (10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110) # возможные ограничения по скорости
+MAX_LENGTH = 10 # наибольшая длина дороги
+
+## @class GraphGenerator
+class GraphGenerator:
+
+    ## Конструктор
+    # @param vertexes - количество вершин
+    # @param density - вероятность наличия дороги решетки, не входящей в остовное дерево (от 0 до 1)
+    # @param windows - количество ограничений по скорости на каждой дороге (последнее действует весь день)
+    # @param seed - начальное значение генератора случайных чисел
+    # @param starttime - время начала пути в формате "ЧЧ:ММ"
+    def __init__(self, vertexes, density=0.5, windows=3, seed=0, starttime='8:00'):
+        if vertexes < 2:
+            raise ValueError('граф должен содержать хотя бы 2 вершины')
+        if not (1 <= windows <= len(SPEEDS)):
+            raise ValueError('количество ограничений по скорости должно быть от 1 до %d' % len(SPEEDS))
+        self.__vertexes = vertexes
+        self.__density = density
+        self.__windows = windows
+        self.__seed = seed
+        self.__starttime = starttime
+
+    ## Генерация дорог графа
+    # @param rng - генератор случайных чисел
+    # @return массивы номеров первых и вторых вершин дорог (начиная с 0)
+    def GenerateRoads(self, rng):
+        side = int(math.ceil(math.sqrt(self.__vertexes))) # количество узлов в строке решетки
+        points = np.arange(self.__vertexes)
+        left = np.where(points % side > 0, points - 1, -1) # соседи слева и сверху (-1, если соседа нет)
+        up = np.where(points >= side, points - side, -1)
+        # остовное дерево: каждая вершина, кроме первой, соединяется со случайным из соседей слева и сверху
+        useleft = (left >= 0) & ((up < 0) | (rng.random(self.__vertexes) < 0.5))
+        parents = np.where(useleft, left, up)
+        tree = points > 0
+        # остальные дороги решетки добавляются с вероятностью, равной плотности
+        extraleft = (left >= 0) & ~(tree & useleft) & (rng.random(self.__vertexes) < self.__density)
+        extraup = (up >= 0) & ~(tree & ~useleft) & (rng.random(self.__vertexes) < self.__density)
+        points1 = np.concatenate((parents[tree], left[extraleft], up[extraup]))
+        points2 = np.concatenate((points[tree], points[extraleft], points[extraup]))
+        return points1, points2
+
+    ## Генерация строк текстового описания графа
+    # @return список строк
+    def GetLines(self):
+        rng = np.random.default_rng(self.__seed)
+        points1, points2 = self.GenerateRoads(rng)
+        roads = len(points1)
+        lengths = rng.integers(1, MAX_LENGTH + 1, roads)
+        lines = [str(self.__vertexes), '1 %d' % self.__vertexes, self.__starttime, '']
+        lines.extend('%d %d %d' % road for road in zip((points1+1).tolist(), (points2+1).tolist(), lengths.tolist()))
+        lines.append('')
+        # различные ограничения по скорости каждой дороги и промежутки времени их действия (в минутах от начала суток)
+        speeds = rng.permuted(np.tile(SPEEDS, (roads, 1)), axis=1)[:, :self.__windows]
+        starts = rng.integers(0, 24*60, (roads, self.__windows))
+        finishes = np.minimum(starts + rng.integers(30, 4*60, (roads, self.__windows)), 24*60 - 1)
+        starts[:, -1], finishes[:, -1] = 0, 24*60 - 1
+        for window in range(self.__windows):
+            lines.extend('%d %d %d %d:%02d %d:%02d' % (point1, point2, speed, start // 60, start % 60,
+                                                       finish // 60, finish % 60)
+                         for point1, point2, speed, start, finish in
+                         zip((points1+1).tolist(), (points2+1).tolist(), speeds[:, window].tolist(),
+                             starts[:, window].tolist(), finishes[:, window].tolist()))
+        return lines
+
+    ## Запись графа в файл
+    # @param filepath - путь до файла
+    def Write(self, filepath):
+        f = open(filepath, 'w')
+        f.write('\n'.join(self.GetLines()))
+        f.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Генерация синтетического графа городской дорожной сети')
+    parser.add_argument('output', help='путь до файла графа')
+    parser.add_argument('--vertexes', type=int, default=1000, help='количество вершин')
+    parser.add_argument('--density', type=float, default=0.5, help='плотность дорог (от 0 до 1)')
+    parser.add_argument('--windows', type=int, default=3, help='количество ограничений по скорости на дороге')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--starttime', default='8:00', help='время начала пути')
+    args = parser.parse_args()
+    GraphGenerator(args.vertexes, args.density, args.windows, args.seed, args.starttime).Write(args.output)
@@ -0,0 +1,167 @@
+## @package IslandGeneticAlgo
+# Модуль, моделирующий островную модель генетического алгоритма:
+# несколько независимых популяций (островов) развиваются в отдельных процессах и периодически обмениваются
+# наиболее приспособленными особями
+
+import multiprocessing
+import numpy as np
+
+import GeneticAlgo
+
+from Enums import MigrationTopology, FirstPopulation, JunctionType, RepairType, EvolutionEngine, RateControl
+
+# Граф, с которым работает процесс-исполнитель (передается в процесс один раз при его создании)
+_workergraph = None
+# Генетические алгоритмы островов, закрепленных за процессом-исполнителем: номер острова -> GeneticAlgo
+# (кэши, дерево префиксов и адаптивные вероятности острова сохраняются между эпохами)
+_workerislands = dict()
+
+## Инициализация процесса-исполнителя островной модели
+# @param graph - граф с описанием городской дорожной сети
+def InitIslandWorker(graph):
+    global _workergraph, _workerislands
+    _workergraph = graph
+    _workerislands = dict()
+
+## Развитие одного острова в течение одной эпохи (между двумя миграциями)
+# Генетический алгоритм острова создается в первую эпоху и дальше используется процессом-исполнителем повторно
+# @param params - параметры генетического алгоритма (tourchance, muttype, mutchance, popsize, startpoptype, newpoptype,
+#                 firstpoptype, junctiontype, repairtype, engine, cachesize, memetic, trienodes, ratecontrol)
+# @param island - номер острова
+# @param migrants - хромосомы, мигрирующие на остров с других островов
+# @param iterations - число итераций генетического алгоритма в эпохе
+# @param migrationsize - количество лучших особей, которые остров отдает для миграции
+# @param seed - начальное значение генератора случайных чисел острова (используется при создании острова)
+# @return список лучших хромосом острова для миграции и наилучший путь, найденный островом
+# (пустой список, если валидный путь не найден)
+def EvolveIsland(params, island, migrants, iterations, migrationsize, seed):
+    genalgo = _workerislands.get(island)
+    if genalgo is None:
+        tourchance, muttype, mutchance, popsize, startpoptype, newpoptype, firstpoptype, junctiontype, repairtype, \
+            engine, cachesize, memetic, trienodes, ratecontrol = params
+        genalgo = GeneticAlgo.GeneticAlgo(_workergraph, tourchance, muttype, mutchance, iterations, popsize,
+                                          startpoptype, newpoptype, cachesize=cachesize, firstpoptype=firstpoptype,
+                                          junctiontype=junctiontype, repairtype=repairtype, engine=engine,
+                                          memetic=memetic, trienodes=trienodes, ratecontrol=ratecontrol,
+                                          rng=np.random.default_rng(seed))
+        genalgo.GenerateFirstStartPopulation()
+        _workerislands[island] = genalgo
+    else:
+        genalgo.SetIterations(iterations)
+    genalgo.AddMigrants(migrants)
+    genalgo.Evolution()
+    return genalgo.GetBestHromosomes(migrationsize), genalgo.GetCurrentBest()[0]
+
+## @class IslandGeneticAlgo
+class IslandGeneticAlgo:
+
+    ## Конструктор
+    # @param graph - граф с описанием городской дорожной сети
+    # @param tourchance - вероятность выбора лучшей хромосомы при турнирной селекции
+    # @param muttype - вид мутации, применяемой к каждой особи новой популяции
+    # @param mutchance - вероятность мутации в хромосомы
+    # @param iters - общее число итераций генетического алгоритма на каждом острове
+    # @param popsize - количество особей в начальной популяции каждого острова
+    # @param startpoptype - способ формирования начальной популяции для генетического алгоритма
+    # @param newpoptype - способ формирования новой популяции для генетического алгоритма
+    # @param islands - количество островов
+    # @param migrationinterval - число итераций между двумя миграциями
+    # @param migrationsize - количество лучших особей, которые каждый остров отдает при миграции
+    # @param topology - схема обмена особями между островами
+    # @param processes - количество процессов-исполнителей (None - по числу ядер процессора); каждый остров
+    # закреплен за одним процессом, поэтому процессов не бывает больше, чем островов
+    # @param seed - начальное значение генератора случайных чисел (None - случайное)
+    # @param firstpoptype - способ генерации хромосом первой популяции каждого острова
+    # @param junctiontype - вид скрещивания хромосом
+    # @param repairtype - способ исправления хромосом-потомков после скрещивания и мутации
+    # @param engine - способ формирования потомков на каждой итерации
+    # @param cachesize - максимальное количество хромосом в кэше приспособленности каждого острова
+    # (0 - кэш не используется)
+    # @param memetic - количество наилучших хромосом острова, улучшаемых локальным поиском на каждой итерации
+    # (0 - без локального поиска)
+    # @param trienodes - максимальное количество узлов дерева префиксов путей каждого острова
+    # (0 - хромосомы оцениваются без дерева префиксов)
+    # @param ratecontrol - способ управления вероятностями мутации и турнирной селекции и видом мутации
+    def __init__(self, graph, tourchance, muttype, mutchance, iters, popsize, startpoptype, newpoptype,
+                 islands, migrationinterval, migrationsize=1, topology=MigrationTopology.RING, processes=None,
+                 seed=None, firstpoptype=FirstPopulation.RANDOM, junctiontype=JunctionType.TWOPOINT,
+                 repairtype=RepairType.NONE, engine=EvolutionEngine.SEQUENTIAL,
+                 cachesize=GeneticAlgo.DEFAULT_CACHE_SIZE, memetic=0, trienodes=0, ratecontrol=RateControl.FIXED):
+        self.__graph = graph
+        self.__params = (tourchance, muttype, mutchance, popsize, startpoptype, newpoptype, firstpoptype, junctiontype,
+                         repairtype, engine, cachesize, memetic, trienodes, ratecontrol)
+        self.__iterations = iters
+        self.__islands = islands
+        self.__migrationinterval = max(1, migrationinterval)
+        self.__migrationsize = migrationsize
+        self.__topology = topology
+        self.__processes = processes
+        self.__seedsequence = np.random.SeedSequence(seed)
+        # генетический алгоритм для сравнения лучших хромосом островов и подсчета времени и длины пути
+        self.__genalgo = GeneticAlgo.GeneticAlgo(graph, tourchance, muttype, mutchance, iters, popsize,
+                                                 startpoptype, newpoptype, rng=np.random.default_rng(0))
+        self.__bestway = []
+
+    ## Распределение мигрантов между островами в соответствии со схемой обмена
+    # @param bests - списки лучших хромосом каждого острова
+    # @param rng - генератор случайных чисел
+    # @return списки мигрантов, прибывающих на каждый остров
+    def GetIslandMigrants(self, bests, rng):
+        islands = len(bests)
+        migrants = [[] for island in range(islands)]
+        if islands < 2:
+            return migrants
+        for island in range(islands):
+            if self.__topology == MigrationTopology.RING:
+                targets = [(island + 1) % islands]
+            elif self.__topology == MigrationTopology.FULL:
+                targets = [target for target in range(islands) if target != island]
+            else:
+                target = int(rng.integers(0, islands-1))
+                targets = [target if target < island else target + 1]
+            for target in targets:
+                migrants[target].extend(bests[island])
+        return migrants
+
+    ## Поиск кратчайшего пути с учетом времени и длины пути островной моделью генетического алгоритма
+    # @return кратчайший путь среди всех островов
+    def FindQuickestWay(self):
+        rng = np.random.default_rng(self.__seedsequence.spawn(1)[0])
+        seeds = [int(seq.generate_state(1)[0]) for seq in self.__seedsequence.spawn(self.__islands)]
+        migrants = [[] for island in range(self.__islands)]
+        best_hromosome = [] # наилучший путь среди всех островов за все эпохи
+        done = 0 # количество проделанных итераций
+        workers = min(self.__processes or multiprocessing.cpu_count(), self.__islands)
+        # у каждого процесса-исполнителя свой пул, чтобы остров во всех эпохах развивался в одном и том же процессе
+        pools = [multiprocessing.Pool(1, InitIslandWorker, (self.__graph,)) for worker in range(workers)]
+        try:
+            while done < self.__iterations:
+                iterations = min(self.__migrationinterval, self.__iterations - done)
+                tasks = [pools[island % workers].apply_async(EvolveIsland, (self.__params, island, migrants[island],
+                                                                            iterations, self.__migrationsize,
+                                                                            seeds[island]))
+                         for island in range(self.__islands)]
+                results = [task.get() for task in tasks]
+                migrants = self.GetIslandMigrants([result[0] for result in results], rng)
+                # выбор глобально лучшей хромосомы среди наилучших путей островов (а не только среди мигрантов)
+                for hromosome in [result[1] for result in results if result[1]]:
+                    best_hromosome = self.__genalgo.GetBetterHromosome(hromosome, best_hromosome) \
+                        if best_hromosome else hromosome
+                done += iterations
+        finally:
+            for pool in pools:
+                pool.terminate()
+        self.__bestway = self.__genalgo.RemoveHromosomeZeros(best_hromosome)
+        return self.__bestway
+
+    ## Подсчет длины пути
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return длина пути
+    def GetHromosomeWayLength(self, hromosome):
+        return self.__genalgo.GetHromosomeWayLength(hromosome)
+
+    ## Подсчет затраченного в пути времени
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return время в пути
+    def GetHromosomeWayTime(self, hromosome):
+        return self.__genalgo.GetHromosomeWayTime(hromosome)
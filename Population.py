@@ -0,0 +1,228 @@
+## @package Population
+# Модуль для хранения популяции хромосом генетического алгоритма
+
+import heapq
+import numpy as np
+
+# Константы модуля
+START_CAPACITY = 16 # начальное количество строк матрицы популяции
+
+## @class Population
+# Популяция хромосом, хранящаяся в непрерывной целочисленной матрице.
+# Каждая строка матрицы - хромосома, дополненная нулями до длины хромосомы.
+# Повторяющиеся хромосомы в популяцию не добавляются: строки матрицы индексируются по их байтовому представлению.
+# Популяция может поддерживать кучу, упорядочивающую хромосомы от наихудшей к наилучшей (для способа Генитор)
+class Population:
+
+    ## Конструктор
+    # @param size - длина хромосомы (количество вершин графа)
+    # @param hromosomes - хромосомы, которые изначально добавляются в популяцию
+    def __init__(self, size, hromosomes=()):
+        self.__size = size
+        self.__matrix = np.zeros((START_CAPACITY, size), dtype=np.int32)
+        self.__count = 0
+        self.__rows = dict() # байтовое представление хромосомы -> номер строки матрицы
+        self.__worstkey = None # функция, возвращающая ключ хромосомы (чем больше ключ, тем хуже хромосома)
+        self.__worstheap = [] # куча (обратный ключ, порядковый номер, байтовое представление хромосомы)
+        self.__heapentries = dict() # байтовое представление хромосомы -> порядковый номер ее актуальной записи в куче
+        self.__heapcounter = 0
+        for hromosome in hromosomes:
+            self.Append(hromosome)
+
+    ## Функция, возвращающая количество хромосом в популяции
+    def __len__(self):
+        return self.__count
+
+    ## Функция, возвращающая хромосому популяции в виде списка генов
+    # @param idx - номер хромосомы в популяции (допускаются отрицательные номера)
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.__count
+        if idx < 0 or idx >= self.__count:
+            raise IndexError('population index out of range')
+        return self.__matrix[idx].tolist()
+
+    ## Перебор хромосом популяции
+    def __iter__(self):
+        return iter(self.__matrix[:self.__count].tolist())
+
+    ## Булева функция, которая проверяет, содержится ли хромосома в популяции
+    # @param hromosome - хромосома для проверки
+    def __contains__(self, hromosome):
+        return self.GetRowKey(hromosome) in self.__rows
+
+    ## Сравнение популяций (с учетом порядка хромосом)
+    # @param other - популяция для сравнения
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Population):
+            return NotImplemented
+        return np.array_equal(self.Matrix(), other.Matrix())
+
+    ## Функция, возвращающая длину хромосомы
+    # @return длина хромосомы
+    def Size(self):
+        return self.__size
+
+    ## Функция, возвращающая матрицу хромосом популяции
+    # @return матрица размера (количество хромосом, длина хромосомы) - представление данных популяции без копирования
+    def Matrix(self):
+        return self.__matrix[:self.__count]
+
+    ## Перевод хромосомы в строку матрицы популяции
+    # @param hromosome - хромосома (список генов или массив)
+    # @return строка матрицы, дополненная нулями до длины хромосомы
+    def GetRow(self, hromosome):
+        row = np.zeros(self.__size, dtype=np.int32)
+        row[:len(hromosome)] = hromosome
+        return row
+
+    ## Функция, возвращающая ключ хромосомы в индексе популяции
+    # @param hromosome - хромосома (список генов или массив)
+    # @return байтовое представление строки матрицы хромосомы
+    def GetRowKey(self, hromosome):
+        return self.GetRow(hromosome).tobytes()
+
+    ## Функция, возвращающая номер хромосомы в популяции
+    # @param hromosome - хромосома для поиска
+    # @return номер хромосомы или -1, если хромосомы нет в популяции
+    def Index(self, hromosome):
+        return self.__rows.get(self.GetRowKey(hromosome), -1)
+
+    ## Добавление хромосомы в конец популяции
+    # @param hromosome - хромосома для добавления
+    # @return True, если хромосома добавлена, False - если такая хромосома уже есть в популяции
+    def Append(self, hromosome):
+        row = self.GetRow(hromosome)
+        key = row.tobytes()
+        if key in self.__rows:
+            return False
+        if self.__count == len(self.__matrix): # увеличение матрицы вдвое при ее заполнении
+            matrix = np.zeros((2*len(self.__matrix), self.__size), dtype=np.int32)
+            matrix[:self.__count] = self.__matrix[:self.__count]
+            self.__matrix = matrix
+        self.__matrix[self.__count] = row
+        self.__rows[key] = self.__count
+        self.__count += 1
+        self.PushWorstHeap(key, row)
+        return True
+
+    ## Замена хромосомы популяции на новую хромосому
+    # Если новая хромосома уже есть в популяции, из двух одинаковых хромосом остается стоящая раньше
+    # @param idx - номер заменяемой хромосомы
+    # @param hromosome - новая хромосома
+    def Replace(self, idx, hromosome):
+        row = self.GetRow(hromosome)
+        key = row.tobytes()
+        other = self.__rows.get(key, -1)
+        if other == idx:
+            return
+        if other >= 0 and other < idx:
+            self.RemoveAt(idx)
+            return
+        if other > idx:
+            self.RemoveAt(other)
+        del self.__rows[self.__matrix[idx].tobytes()]
+        self.__matrix[idx] = row
+        self.__rows[key] = idx
+        self.PushWorstHeap(key, row)
+
+    ## Удаление хромосомы из популяции по ее номеру с сохранением порядка остальных хромосом
+    # @param idx - номер удаляемой хромосомы
+    def RemoveAt(self, idx):
+        if idx < 0:
+            idx += self.__count
+        del self.__rows[self.__matrix[idx].tobytes()]
+        self.__matrix[idx:self.__count-1] = self.__matrix[idx+1:self.__count]
+        self.__count -= 1
+        for pos in range(idx, self.__count): # обновление номеров сдвинутых строк
+            self.__rows[self.__matrix[pos].tobytes()] = pos
+
+    ## Удаление хромосомы из популяции
+    # @param hromosome - удаляемая хромосома
+    def Remove(self, hromosome):
+        idx = self.Index(hromosome)
+        if idx < 0:
+            raise ValueError('hromosome is not in population')
+        self.RemoveAt(idx)
+
+    ## Оставление в популяции только отмеченных хромосом с сохранением их порядка
+    # @param mask - булев массив по числу хромосом популяции
+    def Filter(self, mask):
+        kept = self.__matrix[:self.__count][np.asarray(mask, dtype=bool)]
+        self.__count = len(kept)
+        self.__matrix[:self.__count] = kept
+        self.__rows = {self.__matrix[pos].tobytes(): pos for pos in range(self.__count)}
+
+    ## Копирование популяции
+    # @return новая популяция с теми же хромосомами
+    def Copy(self):
+        population = Population(self.__size)
+        population.Extend(self.Matrix())
+        return population
+
+    ## Добавление в конец популяции всех строк матрицы хромосом
+    # @param matrix - матрица хромосом
+    def Extend(self, matrix):
+        for row in np.asarray(matrix):
+            self.Append(row)
+
+    ## Включение кучи, упорядочивающей хромосомы популяции от наихудшей к наилучшей
+    # Удаленные и замененные хромосомы удаляются из кучи лениво - при обращении к ее вершине
+    # @param worstkey - функция, возвращающая для хромосомы (списка генов) ключ: чем он больше, тем хуже хромосома
+    def EnableWorstHeap(self, worstkey):
+        self.__worstkey = worstkey
+        self.RebuildWorstHeap()
+
+    ## Булева функция, которая проверяет, поддерживает ли популяция кучу наихудших хромосом
+    # @return True or False
+    def HasWorstHeap(self):
+        return self.__worstkey is not None
+
+    ## Перестроение кучи наихудших хромосом по текущим хромосомам популяции
+    def RebuildWorstHeap(self):
+        self.__worstheap = []
+        self.__heapentries = dict()
+        for pos in range(self.__count):
+            self.PushWorstHeap(self.__matrix[pos].tobytes(), self.__matrix[pos], rebuild=False)
+        heapq.heapify(self.__worstheap)
+
+    ## Добавление хромосомы в кучу наихудших хромосом
+    # @param key - байтовое представление хромосомы
+    # @param row - строка матрицы хромосомы
+    # @param rebuild - разрешение на перестроение кучи при накоплении в ней неактуальных записей
+    def PushWorstHeap(self, key, row, rebuild=True):
+        if self.__worstkey is None:
+            return
+        self.__heapcounter += 1
+        self.__heapentries[key] = self.__heapcounter
+        entry = (tuple(-value for value in self.__worstkey(row.tolist())), self.__heapcounter, key)
+        if not rebuild:
+            self.__worstheap.append(entry)
+            return
+        heapq.heappush(self.__worstheap, entry)
+        if len(self.__worstheap) > 2*self.__count + START_CAPACITY: # слишком много неактуальных записей
+            self.RebuildWorstHeap()
+
+    ## Удаление наихудших хромосом по куче наихудших хромосом с сохранением порядка остальных хромосом
+    # Хромосомы удаляются в том же порядке, что и при повторных вызовах RemoveAt(GetWorstIndex()), но за один проход
+    # @param count - количество удаляемых хромосом
+    def RemoveWorst(self, count):
+        mask = np.ones(self.__count, dtype=bool)
+        while count > 0 and self.__worstheap:
+            negkey, counter, key = heapq.heappop(self.__worstheap)
+            if key in self.__rows and self.__heapentries.get(key) == counter:
+                mask[self.__rows[key]] = False
+                count -= 1
+        self.Filter(mask)
+
+    ## Функция, возвращающая номер наихудшей хромосомы популяции по куче наихудших хромосом
+    # @return номер наихудшей хромосомы или -1, если популяция пуста
+    def GetWorstIndex(self):
+        while self.__worstheap:
+            negkey, counter, key = self.__worstheap[0]
+            if key in self.__rows and self.__heapentries.get(key) == counter:
+                return self.__rows[key]
+            heapq.heappop(self.__worstheap) # удаление неактуальной записи
+        return -1
@@ -0,0 +1,128 @@
+## @package PrefixTrie
+# Модуль для оценки путей по дереву префиксов (префиксному дереву) путей.
+# Все пути начинаются в начальной точке в одно и то же время, поэтому пути популяции имеют общие начальные участки.
+# Узел дерева - начальный участок пути, для которого хранятся момент прибытия в его последнюю вершину и его длина.
+# Время проезда по каждой дороге рассчитывается один раз для каждого различного начального участка, поэтому
+# оценка популяции требует количества расчетов, пропорционального количеству различных начальных участков пути,
+# а не суммарному количеству генов
+
+import numpy as np
+
+# Константы модуля
+DEFAULT_MAX_NODES = 1000000 # максимальное количество узлов дерева
+PRUNE_LOW_WATERMARK = 0.5 # доля максимального количества узлов, которую может занимать дерево после удаления узлов
+
+## @class PrefixTrie
+# Узлы хранятся в списках, номер корня (начальной точки пути) - 0. Момент прибытия и длина -1, если по начальному
+# участку пути проехать невозможно (время и длина пути считаются независимо, как в GeneticAlgo)
+class PrefixTrie:
+
+    ## Конструктор
+    # @param graph - граф с описанием городской дорожной сети
+    # @param maxnodes - максимальное количество узлов дерева, при превышении которого удаляются узлы, не входящие
+    # в пути текущей популяции
+    def __init__(self, graph, maxnodes=DEFAULT_MAX_NODES):
+        self.__graph = graph
+        self.__maxnodes = maxnodes
+        self.__livehromosomes = np.zeros((0, graph.Vertexes()), dtype=np.int64) # хромосомы текущей популяции
+        self.__evaluations = 0 # количество расчетов времени проезда по дорогам
+        self.Clear()
+
+    ## Функция, возвращающая количество узлов дерева
+    def __len__(self):
+        return len(self.__arrivals)
+
+    ## Удаление всех узлов дерева, кроме корня (например, после изменения дорожной сети графа)
+    def Clear(self):
+        self.__children = [dict()] # узел -> словарь: следующая вершина пути -> узел
+        self.__arrivals = [self.__graph.StartSeconds()] # узел -> момент прибытия в секундах от начала суток
+        self.__lengths = [0.0] # узел -> длина начального участка пути
+
+    ## Функция, возвращающая количество расчетов времени проезда по дорогам
+    # @return количество расчетов
+    def Evaluations(self):
+        return self.__evaluations
+
+    ## Установка хромосом текущей популяции, узлы путей которых сохраняются при удалении узлов
+    # @param matrix - матрица хромосом популяции
+    def SetLiveHromosomes(self, matrix):
+        self.__livehromosomes = np.array(matrix, dtype=np.int64)
+
+    ## Подсчет времени и длины пути
+    # @param genes - валидный путь (хромосома без нулей), начинающийся в начальной точке
+    # @return кортеж (время в пути, длина пути); -1.0, если проехать по пути невозможно
+    def Evaluate(self, genes):
+        if len(self.__arrivals) >= self.__maxnodes:
+            self.Prune()
+        node = self.GetNode(genes)
+        arrival = self.__arrivals[node]
+        waytime = float(arrival - self.__arrivals[0]) if arrival >= 0 else -1.0
+        return waytime, self.__lengths[node]
+
+    ## Подсчет времени и длины пути для всех хромосом матрицы
+    # @param matrix - матрица валидных хромосом
+    # @param counts - массив количества ненулевых генов в каждой хромосоме
+    # @return массив времен в пути и массив длин путей
+    def EvaluateMatrix(self, matrix, counts):
+        times, lengths = np.full(len(matrix), -1.0), np.full(len(matrix), -1.0)
+        for row, (hromosome, count) in enumerate(zip(matrix.tolist(), counts.tolist())):
+            times[row], lengths[row] = self.Evaluate(hromosome[:count])
+        return times, lengths
+
+    ## Функция, возвращающая узел дерева, соответствующий пути (недостающие узлы добавляются)
+    # @param genes - путь (хромосома без нулей)
+    # @return номер узла
+    def GetNode(self, genes):
+        node = 0
+        for point1, point2 in zip(genes[:-1], genes[1:]):
+            child = self.__children[node].get(point2)
+            if child is None:
+                child = self.AddNode(node, point1, point2)
+            node = child
+        return node
+
+    ## Добавление узла - продолжения начального участка пути еще одной дорогой
+    # Длина участка суммируется последовательно, как в GeneticAlgo.CalculateHromosomeWayLength
+    # @param parent - узел начального участка пути
+    # @param point1 - номер последней вершины начального участка (начиная с 1, как в хромосоме)
+    # @param point2 - номер следующей вершины (начиная с 1, как в хромосоме)
+    # @return номер добавленного узла
+    def AddNode(self, parent, point1, point2):
+        edge = self.__graph.GetEdgeIndex(point1-1, point2-1)
+        arrival, length = self.__arrivals[parent], self.__lengths[parent]
+        if arrival >= 0:
+            value = self.__graph.GetEdgeTravelTime(edge, arrival)
+            self.__evaluations += 1
+            arrival = arrival + value if value >= 0 else -1
+        dist = self.__graph.EdgeLengths()[edge] if edge >= 0 else 0.0
+        if length >= 0:
+            length = length + dist if dist > 0 else -1.0
+        node = len(self.__arrivals)
+        self.__children[parent][point2] = node
+        self.__children.append(dict())
+        self.__arrivals.append(arrival)
+        self.__lengths.append(length)
+        return node
+
+    ## Удаление узлов, не входящих в пути хромосом текущей популяции
+    # Если и после этого дерево занимает больше PRUNE_LOW_WATERMARK от максимального количества узлов, удаляются
+    # все узлы: иначе следующее удаление понадобилось бы уже через несколько добавленных узлов
+    def Prune(self):
+        children, arrivals, lengths = self.__children, self.__arrivals, self.__lengths
+        self.Clear()
+        for hromosome in self.__livehromosomes.tolist():
+            node, newnode = 0, 0
+            for gen in hromosome[1:]:
+                child = children[node].get(gen) if gen != 0 else None
+                if child is None:
+                    break
+                newchild = self.__children[newnode].get(gen)
+                if newchild is None:
+                    newchild = len(self.__arrivals)
+                    self.__children[newnode][gen] = newchild
+                    self.__children.append(dict())
+                    self.__arrivals.append(arrivals[child])
+                    self.__lengths.append(lengths[child])
+                node, newnode = child, newchild
+        if len(self.__arrivals) > self.__maxnodes * PRUNE_LOW_WATERMARK:
+            self.Clear()
@@ -0,0 +1,326 @@
+## @package RoutingService
+# Модуль долгоживущей локальной службы поиска кратчайших путей.
+# Графы считываются один раз при запуске службы и размещаются в разделяемой памяти, откуда их используют
+# процессы-исполнители, выполняющие поиск генетическим алгоритмом. Служба принимает соединения по TCP или через
+# сокет Unix; запросы и ответы передаются строками JSON (по одному объекту в строке), как в BatchQuery.
+# Одинаковые запросы, поиск по которым еще выполняется, объединяются в один поиск, а результаты хранятся в кэше
+# с ограниченным временем жизни. Ключ кэша - (хэш дорожной сети графа, начальная точка, конечная точка,
+# интервал времени начала пути, параметры генетического алгоритма)
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import Graph
+import GeneticAlgo
+import SweepRunner
+
+from BatchQuery import ParseQuery
+from Enums import StartPopulation, NewPopulation, MutationType
+
+# Константы модуля
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_BUCKET = 5*60 # продолжительность интервала времени начала пути (в секундах)
+DEFAULT_TTL = 600.0 # время жизни результата в кэше (в секундах)
+DEFAULT_CACHE_ENTRIES = 10000 # максимальное количество результатов в кэше
+DEFAULT_CONFIG = {'tourchance': 1.0, 'muttype': MutationType.ONEPOINT, 'mutchance': 0.01, 'iters': 20, 'popsize': 20,
+                  'startpoptype': StartPopulation.ELITE,
+                  'newpoptype': NewPopulation.CLASSIC} # параметры генетического алгоритма по умолчанию
+
+# Графы и блоки разделяемой памяти процесса-исполнителя
+_workergraphs = dict()
+_workermemory = []
+
+## Инициализация процесса-исполнителя
+# @param descriptions - словарь: имя графа -> описание массивов графа в разделяемой памяти
+def InitServiceWorker(descriptions):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # служба останавливает процессы-исполнители сама
+    for name, graphdescriptions in descriptions.items():
+        graph, blocks = SweepRunner.AttachSharedGraph(graphdescriptions)
+        _workergraphs[name] = graph
+        _workermemory.extend(blocks)
+
+## Поиск кратчайшего пути генетическим алгоритмом (выполняется в процессе-исполнителе)
+# @param graphname - имя графа
+# @param startpoint - номер вершины - начальной точки пути
+# @param finishpoint - номер вершины - конечной точки пути
+# @param startseconds - время начала пути в секундах от начала суток
+# @param config - параметры генетического алгоритма (словарь с ключами SweepRunner.CONFIG_KEYS)
+# @param seed - начальное значение генератора случайных чисел
+# @return словарь с кратчайшим путем, временем и длиной пути
+def RunSearch(graphname, startpoint, finishpoint, startseconds, config, seed):
+    graph = _workergraphs[graphname]
+    graph = graph.GetRouteGraph(startpoint, finishpoint, graph.GetDayMoment(startseconds))
+    config = dict(config)
+    config['popsize'] = min(config['popsize'], graph.GetAllDifferentWaysCount(config['popsize']))
+    genalgo = GeneticAlgo.GeneticAlgo(graph, rng=np.random.default_rng(seed), **config)
+    bestway = genalgo.FindQuickestWay()
+    waytime = genalgo.GetHromosomeWayTime(bestway)
+    return {'way': bestway, 'time': waytime,
+            'strtime': time.strftime('%H:%M', time.gmtime(waytime)) if waytime > 0 else '',
+            'length': float(genalgo.GetHromosomeWayLength(bestway)), 'generations': genalgo.GetGenerationsCount(),
+            'stopreason': genalgo.GetStopReason()}
+
+## @class ResultCache
+# Кэш результатов поиска с ограниченным временем жизни записей и вытеснением давно не использовавшихся записей
+class ResultCache:
+
+    ## Конструктор
+    # @param maxentries - максимальное количество записей
+    # @param ttl - время жизни записи (в секундах)
+    def __init__(self, maxentries=DEFAULT_CACHE_ENTRIES, ttl=DEFAULT_TTL):
+        self.__maxentries = maxentries
+        self.__ttl = ttl
+        self.__entries = OrderedDict() # ключ -> (момент записи, результат)
+
+    ## Функция, возвращающая количество записей в кэше
+    def __len__(self):
+        return len(self.__entries)
+
+    ## Получение результата из кэша
+    # @param key - ключ
+    # @return результат или None, если записи нет или время ее жизни истекло
+    def Get(self, key):
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.__ttl:
+            del self.__entries[key]
+            return None
+        self.__entries.move_to_end(key)
+        return entry[1]
+
+    ## Сохранение результата в кэше
+    # @param key - ключ
+    # @param result - результат
+    def Put(self, key, result):
+        if self.__maxentries <= 0:
+            return
+        self.__entries[key] = (time.monotonic(), result)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__maxentries:
+            self.__entries.popitem(last=False)
+
+## @class RoutingService
+class RoutingService:
+
+    ## Конструктор
+    # @param graphs - словарь: имя графа -> граф (первый граф используется в запросах без имени графа). Графы не должны
+    # изменяться после создания службы: процессы-исполнители используют копии их массивов в разделяемой памяти,
+    # а хэши дорожных сетей для ключей кэша считаются один раз
+    # @param config - параметры генетического алгоритма по умолчанию (словарь с ключами SweepRunner.CONFIG_KEYS)
+    # @param seed - начальное значение генератора случайных чисел каждого поиска
+    # @param bucket - продолжительность интервала времени начала пути (в секундах). Поиск выполняется для начала
+    # интервала, в который попадает время начала пути из запроса
+    # @param ttl - время жизни результата в кэше (в секундах)
+    # @param cacheentries - максимальное количество результатов в кэше
+    # @param processes - количество процессов-исполнителей (None - по числу ядер процессора)
+    def __init__(self, graphs, config=None, seed=0, bucket=DEFAULT_BUCKET, ttl=DEFAULT_TTL,
+                 cacheentries=DEFAULT_CACHE_ENTRIES, processes=None):
+        self.__graphs = graphs
+        self.__defaultgraph = next(iter(graphs))
+        self.__hashes = {name: graph.GetContentHash() for name, graph in graphs.items()}
+        self.__config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.__seed = seed
+        self.__bucket = max(1, int(bucket))
+        self.__cache = ResultCache(cacheentries, ttl)
+        self.__processes = processes
+        self.__inflight = dict() # ключ -> незавершенный поиск (asyncio.Future)
+        self.__executor = None
+        self.__blocks = [] # блоки разделяемой памяти с массивами графов
+        self.__stats = {'queries': 0, 'searches': 0, 'hits': 0, 'coalesced': 0, 'errors': 0}
+
+    ## Запуск процессов-исполнителей и размещение графов в разделяемой памяти
+    def Start(self):
+        descriptions = dict()
+        for name, graph in self.__graphs.items():
+            blocks, descriptions[name] = SweepRunner.ShareGraphArrays(graph)
+            self.__blocks.extend(blocks)
+        # процессы запускаются по мере необходимости, поэтому они не порождаются копированием процесса службы,
+        # иначе они унаследуют открытые соединения и те не будут закрыты
+        self.__executor = concurrent.futures.ProcessPoolExecutor(self.__processes,
+                                                                 multiprocessing.get_context('spawn'),
+                                                                 InitServiceWorker, (descriptions,))
+
+    ## Остановка процессов-исполнителей и освобождение разделяемой памяти
+    def Close(self):
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        for block in self.__blocks:
+            block.close()
+            block.unlink()
+        self.__blocks = []
+
+    ## Функция, возвращающая счетчики запросов службы
+    # @return словарь: количество запросов, поисков, попаданий в кэш, объединенных запросов и ошибок,
+    # а также количество результатов в кэше и количество выполняющихся поисков
+    def Stats(self):
+        return dict(self.__stats, cached=len(self.__cache), inflight=len(self.__inflight))
+
+    ## Функция, возвращающая ключ запроса в кэше
+    # @param graphname - имя графа
+    # @param startpoint - номер вершины - начальной точки пути
+    # @param finishpoint - номер вершины - конечной точки пути
+    # @param startseconds - время начала пути в секундах от начала суток (начало интервала)
+    # @param config - параметры генетического алгоритма
+    # @return кортеж - ключ
+    def GetQueryKey(self, graphname, startpoint, finishpoint, startseconds, config):
+        return (self.__hashes[graphname], startpoint, finishpoint, startseconds // self.__bucket,
+                tuple(sorted(config.items())))
+
+    ## Ответ на один запрос
+    # @param line - строка запроса: "начальная точка, конечная точка, время" или объект JSON с полями start, finish,
+    # time и необязательными полями graph (имя графа), config (параметры генетического алгоритма) и id (возвращается
+    # в ответе). Объект {"command": "stats"} возвращает счетчики службы
+    # @return словарь - ответ
+    async def Query(self, line):
+        request = json.loads(line) if line.lstrip().startswith('{') else dict()
+        if request.get('command') == 'stats':
+            return self.Stats()
+        self.__stats['queries'] += 1
+        result = {'id': request['id']} if 'id' in request else dict()
+        try:
+            graphname = request.get('graph', self.__defaultgraph)
+            if graphname not in self.__graphs:
+                raise ValueError('неизвестный граф: ' + str(graphname))
+            graph = self.__graphs[graphname]
+            startpoint, finishpoint, starttime = ParseQuery(line, graph)
+            config = dict(self.__config, **request.get('config', dict()))
+            unknown = set(config) - set(SweepRunner.CONFIG_KEYS)
+            if unknown:
+                raise ValueError('неизвестные параметры генетического алгоритма: ' + ', '.join(sorted(unknown)))
+            startseconds = graph.GetDaySeconds(starttime) // self.__bucket * self.__bucket
+            result.update({'graph': graphname, 'start': startpoint, 'finish': finishpoint,
+                           'departure': graph.GetDayMoment(startseconds).strftime('%H:%M')})
+            result.update(await self.Search(self.GetQueryKey(graphname, startpoint, finishpoint, startseconds, config),
+                                            (graphname, startpoint, finishpoint, startseconds, config, self.__seed)))
+        except Exception as error: # в том числе исключения, возникшие при поиске в процессе-исполнителе
+            self.__stats['errors'] += 1
+            result['error'] = str(error) or type(error).__name__
+        return result
+
+    ## Поиск кратчайшего пути с использованием кэша и объединением одинаковых выполняющихся поисков
+    # @param key - ключ запроса (см. GetQueryKey)
+    # @param searchargs - параметры RunSearch
+    # @return словарь с кратчайшим путем и источником результата (cache, search или coalesced)
+    async def Search(self, key, searchargs):
+        result = self.__cache.Get(key)
+        if result is not None:
+            self.__stats['hits'] += 1
+            return dict(result, source='cache')
+        future = self.__inflight.get(key)
+        source = 'coalesced'
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.__executor, RunSearch, *searchargs)
+            future.add_done_callback(lambda done: self.OnSearchDone(key, done))
+            self.__inflight[key] = future
+            self.__stats['searches'] += 1
+            source = 'search'
+        else:
+            self.__stats['coalesced'] += 1
+        # отмена ожидания (например, при разрыве соединения) не отменяет поиск для остальных запросов
+        return dict(await asyncio.shield(future), source=source)
+
+    ## Обработка завершения поиска: результат сохраняется в кэше
+    # @param key - ключ запроса
+    # @param future - завершенный поиск
+    def OnSearchDone(self, key, future):
+        self.__inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.__cache.Put(key, future.result())
+
+    ## Обслуживание одного соединения
+    # Запросы соединения обрабатываются одновременно, ответы отправляются по мере готовности
+    # (номер запроса в соединении возвращается в поле query)
+    # @param reader - поток чтения соединения
+    # @param writer - поток записи соединения
+    async def HandleConnection(self, reader, writer):
+        tasks = []
+        number = 0
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                tasks.append(asyncio.ensure_future(self.Answer(number, line, writer)))
+                number += 1
+            # ошибка записи одного ответа (например, при разрыве соединения) не прерывает ожидание остальных
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    ## Ответ на запрос с записью ответа в соединение
+    # @param number - номер запроса в соединении
+    # @param line - строка запроса
+    # @param writer - поток записи соединения
+    async def Answer(self, number, line, writer):
+        try:
+            result = dict(query=number, **await self.Query(line))
+        except Exception as error: # ошибка одного запроса не должна оставить без ответа остальные запросы соединения
+            self.__stats['errors'] += 1
+            result = {'query': number, 'error': str(error) or type(error).__name__}
+        writer.write((json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8'))
+        await writer.drain()
+
+    ## Прием соединений, пока служба не будет остановлена
+    # @param host - адрес TCP
+    # @param port - порт TCP
+    # @param socketpath - путь до сокета Unix (если задан, то вместо TCP используется сокет Unix)
+    async def Serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socketpath=''):
+        if socketpath:
+            server = await asyncio.start_unix_server(self.HandleConnection, path=socketpath)
+        else:
+            server = await asyncio.start_server(self.HandleConnection, host, port)
+        async with server:
+            await server.serve_forever()
+
+## Разбор описания графа из командной строки
+# @param text - путь до файла графа или строка "имя=путь"
+# @return кортеж (имя графа, путь до файла)
+def ParseGraphArgument(text):
+    if '=' in text:
+        name, filepath = text.split('=', 1)
+        return name, filepath
+    return os.path.splitext(os.path.basename(text))[0], text
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Локальная служба поиска кратчайших путей генетическим алгоритмом')
+    parser.add_argument('graphs', nargs='+', help='файлы графов (путь или "имя=путь")')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='адрес TCP')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='порт TCP')
+    parser.add_argument('--socket', default='', help='путь до сокета Unix (вместо TCP)')
+    parser.add_argument('--config', default='{}', help='параметры генетического алгоритма в формате JSON')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--bucket', type=int, default=DEFAULT_BUCKET // 60,
+                        help='продолжительность интервала времени начала пути в минутах')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help='время жизни результата в кэше в секундах')
+    parser.add_argument('--cacheentries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help='максимальное количество результатов в кэше')
+    parser.add_argument('--processes', type=int, default=None, help='количество процессов-исполнителей')
+    parser.add_argument('--cache', action='store_true', help='кэшировать графы в двоичном формате рядом с файлами')
+    args = parser.parse_args()
+    graphs = dict()
+    for name, filepath in map(ParseGraphArgument, args.graphs):
+        graphs[name] = Graph.LoadGraph(filepath) if args.cache else Graph.Graph(filepath)
+    service = RoutingService(graphs, json.loads(args.config), args.seed, args.bucket*60, args.ttl, args.cacheentries,
+                             args.processes)
+    service.Start()
+    try:
+        asyncio.run(service.Serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.Close()
@@ -0,0 +1,147 @@
+## @package ShortestPath
+# Модуль точного поиска кратчайшего по времени пути алгоритмом Дейкстры (или A*) с зависящим от времени
+# временем проезда по дорогам. Время проезда по дороге определяется по моменту въезда на нее так же,
+# как при подсчете времени пути хромосомы в генетическом алгоритме
+
+import heapq
+import numpy as np
+
+import GeneticAlgo
+
+from Enums import StartPopulation, NewPopulation, MutationType
+
+## @class ShortestPath
+# Путь находится точно, если время прибытия по каждой дороге не уменьшается при более позднем въезде на нее
+# (при смене ограничения по скорости более поздний въезд не приводит к более раннему прибытию). Из путей с одинаковым
+# временем выбирается путь наименьшей длины
+class ShortestPath:
+
+    ## Конструктор
+    # @param graph - граф с описанием городской дорожной сети
+    # @param astar - использование алгоритма A* с нижней оценкой оставшегося времени пути
+    def __init__(self, graph, astar=False):
+        self.__graph = graph
+        self.__astar = astar
+        self.__neighbors = dict() # вершина -> (список соседей, список номеров ведущих к ним дорог)
+        self.__lowerbounds = None # нижние оценки времени пути от каждой вершины до конечной точки пути
+        self.__settled = 0 # количество вершин, обработанных при последнем поиске
+        # генетический алгоритм для подсчета времени и длины пути так же, как при поиске генетическим алгоритмом
+        self.__genalgo = GeneticAlgo.GeneticAlgo(graph, 1.0, MutationType.ONEPOINT, 0.0, 0, 0, StartPopulation.ELITE,
+                                                 NewPopulation.CLASSIC, rng=np.random.default_rng(0))
+        self.__bestway = []
+
+    ## Функция, возвращающая соседей вершины, в которые ведут дороги положительной длины
+    # @param point - номер вершины (начиная с 0)
+    # @return список номеров соседей (начиная с 0) и список номеров ведущих к ним дорог
+    def GetNeighbors(self, point):
+        if point not in self.__neighbors:
+            neighbors, edges = self.__graph.GetNeighbors(point)
+            mask = (self.__graph.EdgeLengths()[edges] > 0) & (neighbors != point)
+            self.__neighbors[point] = (neighbors[mask].tolist(), edges[mask].tolist())
+        return self.__neighbors[point]
+
+    ## Функция, возвращающая нижние оценки времени пути от каждой вершины до конечной точки пути
+    # Оценка - время пути до конечной точки, если по каждой дороге ехать с наибольшей разрешенной на ней скоростью.
+    # Оценки рассчитываются алгоритмом Дейкстры от конечной точки один раз при первом обращении
+    # @return список оценок (inf для вершин, из которых нельзя добраться до конечной точки пути)
+    def GetLowerBounds(self):
+        if self.__lowerbounds is None:
+            mintimes = self.__graph.GetEdgesMinTravelTimes().tolist()
+            bounds = [np.inf]*self.__graph.Vertexes()
+            heap = [(0.0, self.__graph.FinishPoint()-1)]
+            bounds[self.__graph.FinishPoint()-1] = 0.0
+            while heap:
+                bound, point = heapq.heappop(heap)
+                if bound > bounds[point]:
+                    continue
+                for neighbor, edge in zip(*self.GetNeighbors(point)):
+                    if bound + mintimes[edge] < bounds[neighbor]:
+                        bounds[neighbor] = bound + mintimes[edge]
+                        heapq.heappush(heap, (bounds[neighbor], neighbor))
+            self.__lowerbounds = bounds
+        return self.__lowerbounds
+
+    ## Поиск кратчайшего по времени пути от начальной до конечной точки
+    # @param blocked - номера дорог, по которым проезжать нельзя
+    # @return путь (список вершин, начиная с 1) или пустой список, если пути нет
+    def FindWay(self, blocked=()):
+        startpoint, finishpoint = self.__graph.StartPoint()-1, self.__graph.FinishPoint()-1
+        startseconds = self.__graph.StartSeconds()
+        lengths = self.__graph.EdgeLengths()
+        bounds = self.GetLowerBounds() if self.__astar else None
+        labels = {startpoint: (0, 0.0)} # вершина -> (время пути, длина пути) до нее
+        parents = {startpoint: -1}
+        settled = set()
+        heap = [(bounds[startpoint] if bounds is not None else 0, 0, 0.0, startpoint)]
+        while heap:
+            estimate, time, length, point = heapq.heappop(heap)
+            if point in settled:
+                continue
+            settled.add(point)
+            if point == finishpoint:
+                break
+            for neighbor, edge in zip(*self.GetNeighbors(point)):
+                if neighbor in settled or edge in blocked:
+                    continue
+                value = self.__graph.GetEdgeTravelTime(edge, startseconds + time) # время проезда по дороге
+                if value < 0 or (bounds is not None and bounds[neighbor] == np.inf):
+                    continue
+                label = (time + value, length + float(lengths[edge]))
+                if neighbor not in labels or label < labels[neighbor]:
+                    labels[neighbor] = label
+                    parents[neighbor] = point
+                    estimate = label[0] + (bounds[neighbor] if bounds is not None else 0) # оценка времени всего пути
+                    heapq.heappush(heap, (estimate, label[0], label[1], neighbor))
+        self.__settled = len(settled)
+        if finishpoint not in settled:
+            return []
+        way = [finishpoint]
+        while parents[way[-1]] >= 0:
+            way.append(parents[way[-1]])
+        return [point+1 for point in reversed(way)]
+
+    ## Поиск кратчайшего пути с учетом времени и длины пути
+    # @return кратчайший путь
+    def FindQuickestWay(self):
+        self.__bestway = self.FindWay()
+        return self.__bestway
+
+    ## Поиск нескольких кратчайших путей: точного и близких к нему по времени
+    # Близкие пути находятся повторным поиском с запретом проезда по одной из дорог уже найденных путей
+    # @param count - количество путей
+    # @return список различных путей, упорядоченный по времени и длине пути
+    def FindQuickestWays(self, count):
+        ways = []
+        candidates = [] # куча (время пути, длина пути, путь)
+        seen = set()
+        way = self.FindWay()
+        if way:
+            heapq.heappush(candidates, (self.GetHromosomeWayTime(way), self.GetHromosomeWayLength(way), way))
+            seen.add(tuple(way))
+        while candidates and len(ways) < count:
+            time, length, way = heapq.heappop(candidates)
+            ways.append(way)
+            for point1, point2 in zip(way[:-1], way[1:]):
+                variant = self.FindWay({self.__graph.GetEdgeIndex(point1-1, point2-1)})
+                if variant and tuple(variant) not in seen:
+                    seen.add(tuple(variant))
+                    heapq.heappush(candidates, (self.GetHromosomeWayTime(variant), self.GetHromosomeWayLength(variant),
+                                                variant))
+        return ways
+
+    ## Функция, возвращающая количество вершин, обработанных при последнем поиске
+    # @return количество вершин
+    def SettledVertexes(self):
+        return self.__settled
+
+    ## Подсчет длины пути
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return длина пути
+    def GetHromosomeWayLength(self, hromosome):
+        return self.__genalgo.GetHromosomeWayLength(hromosome)
+
+    ## Подсчет затраченного в пути времени
+    # @param hromosome - хромосома-путь, по которой происходит движение
+    # @return время в пути
+    def GetHromosomeWayTime(self, hromosome):
+        return self.__genalgo.GetHromosomeWayTime(hromosome)
@@ -0,0 +1,75 @@
+## @package SparseMatrix
+# Модуль для доступа к данным разреженного графа как к матрице смежности
+
+## @class SparseMatrix
+# Матрица смежности, значения которой не хранятся, а вычисляются по номеру дороги графа при обращении к ним.
+# Поддерживает обращение вида matrix[i][j], как у матрицы, построенной из вложенных списков
+class SparseMatrix:
+
+    ## Конструктор
+    # @param graph - граф
+    # @param getvalue - функция, возвращающая значение элемента матрицы по номеру дороги
+    # @param getdefault - функция, возвращающая значение элемента матрицы для пары вершин без дороги
+    def __init__(self, graph, getvalue, getdefault):
+        self.__graph = graph
+        self.__getvalue = getvalue
+        self.__getdefault = getdefault
+
+    ## Функция, возвращающая количество строк матрицы
+    def __len__(self):
+        return self.__graph.Vertexes()
+
+    ## Функция, возвращающая строку матрицы
+    # @param idx - номер строки (допускаются отрицательные номера)
+    def __getitem__(self, idx):
+        return SparseMatrixRow(self, self.GetIndex(idx))
+
+    ## Перебор строк матрицы
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield SparseMatrixRow(self, idx)
+
+    ## Проверка номера строки или столбца матрицы
+    # @param idx - номер (допускаются отрицательные номера)
+    # @return неотрицательный номер
+    def GetIndex(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError('matrix index out of range')
+        return int(idx)
+
+    ## Функция, возвращающая элемент матрицы
+    # @param row - номер строки
+    # @param column - номер столбца
+    # @return значение элемента матрицы
+    def GetValue(self, row, column):
+        edge = self.__graph.GetEdgeIndex(row, self.GetIndex(column))
+        if edge < 0:
+            return self.__getdefault()
+        return self.__getvalue(edge)
+
+## @class SparseMatrixRow
+# Строка матрицы смежности SparseMatrix
+class SparseMatrixRow:
+
+    ## Конструктор
+    # @param matrix - матрица смежности
+    # @param row - номер строки
+    def __init__(self, matrix, row):
+        self.__matrix = matrix
+        self.__row = row
+
+    ## Функция, возвращающая количество элементов строки
+    def __len__(self):
+        return len(self.__matrix)
+
+    ## Функция, возвращающая элемент строки
+    # @param idx - номер столбца (допускаются отрицательные номера)
+    def __getitem__(self, idx):
+        return self.__matrix.GetValue(self.__row, idx)
+
+    ## Перебор элементов строки
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.__matrix.GetValue(self.__row, idx)
@@ -0,0 +1,185 @@
+## @package SweepRunner
+# Модуль для запуска генетического алгоритма без графического окна на наборе конфигураций и начальных значений
+# генератора случайных чисел. Запуски выполняются параллельно в пуле процессов, а массивы графа размещаются
+# в разделяемой памяти один раз и не копируются в каждый процесс
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import Graph
+import GeneticAlgo
+
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, JunctionType, RepairType, \
+    EvolutionEngine, RateControl
+
+# Константы модуля
+CONFIG_KEYS = ('tourchance', 'muttype', 'mutchance', 'iters', 'popsize', 'startpoptype', 'newpoptype', 'firstpoptype',
+               'junctiontype', 'repairtype', 'deadline', 'stagnation', 'engine', 'memetic', 'trienodes',
+               'ratecontrol')
+RESULT_KEYS = ('run', 'seed') + CONFIG_KEYS + ('way', 'time', 'length', 'walltime', 'generations', 'stopreason')
+
+# Граф и блоки разделяемой памяти процесса-исполнителя
+_workergraph = None
+_workermemory = []
+
+## Размещение массивов графа в разделяемой памяти
+# @param graph - граф
+# @return список созданных блоков разделяемой памяти и описание массивов (имя, имя блока, размерность, тип)
+def ShareGraphArrays(graph):
+    blocks, descriptions = [], []
+    for name, array in graph.GetArrays().items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        descriptions.append((name, block.name, array.shape, array.dtype.str))
+    return blocks, descriptions
+
+## Восстановление графа по массивам в разделяемой памяти (без копирования массивов)
+# @param descriptions - описание массивов графа (см. ShareGraphArrays)
+# @return граф и список подключенных блоков разделяемой памяти (их нужно хранить, пока используется граф)
+def AttachSharedGraph(descriptions):
+    blocks, arrays = [], dict()
+    for name, blockname, shape, dtype in descriptions:
+        block = shared_memory.SharedMemory(name=blockname)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return Graph.Graph(arrays=arrays), blocks
+
+## Инициализация процесса-исполнителя
+# @param descriptions - описание массивов графа в разделяемой памяти
+def InitSweepWorker(descriptions):
+    global _workergraph, _workermemory
+    _workergraph, _workermemory = AttachSharedGraph(descriptions)
+
+## Один запуск генетического алгоритма
+# @param run - номер запуска
+# @param config - конфигурация генетического алгоритма (словарь с ключами CONFIG_KEYS)
+# @param seed - начальное значение генератора случайных чисел
+# @return словарь с результатами запуска
+def RunConfiguration(run, config, seed):
+    starttime = time.perf_counter()
+    genalgo = GeneticAlgo.GeneticAlgo(_workergraph, rng=np.random.default_rng(seed), **config)
+    bestway = genalgo.FindQuickestWay()
+    result = {'run': run, 'seed': seed}
+    result.update(config)
+    result.update({'way': bestway, 'time': genalgo.GetHromosomeWayTime(bestway),
+                   'length': float(genalgo.GetHromosomeWayLength(bestway)),
+                   'walltime': time.perf_counter() - starttime, 'generations': genalgo.GetGenerationsCount(),
+                   'stopreason': genalgo.GetStopReason()})
+    return result
+
+## Выполнение одного задания пула процессов
+# @param task - кортеж (номер запуска, конфигурация, начальное значение генератора случайных чисел)
+# @return словарь с результатами запуска
+def RunTask(task):
+    return RunConfiguration(*task)
+
+## Формирование всех сочетаний значений параметров генетического алгоритма
+# @param values - словарь: параметр -> список его значений
+# @return список конфигураций
+def GetConfigurationGrid(values):
+    keys = [key for key in CONFIG_KEYS if key in values]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*[values[key] for key in keys])]
+
+## @class SweepRunner
+class SweepRunner:
+
+    ## Конструктор
+    # @param graph - граф с описанием городской дорожной сети
+    # @param configurations - список конфигураций генетического алгоритма (словарей с ключами CONFIG_KEYS)
+    # @param seeds - список начальных значений генератора случайных чисел (каждая конфигурация запускается с каждым)
+    # @param outputpath - путь до файла результатов (.csv или .jsonl), пустая строка - без записи в файл
+    # @param processes - количество процессов-исполнителей (None - по числу ядер процессора)
+    def __init__(self, graph, configurations, seeds, outputpath='', processes=None):
+        self.__graph = graph
+        self.__configurations = configurations
+        self.__seeds = seeds
+        self.__outputpath = outputpath
+        self.__processes = processes
+
+    ## Запуск всех конфигураций
+    # Результаты записываются в файл по мере завершения запусков
+    # @return список результатов всех запусков
+    def Run(self):
+        tasks = [(run, config, seed) for run, (config, seed) in
+                 enumerate(itertools.product(self.__configurations, self.__seeds))]
+        results = []
+        blocks, descriptions = ShareGraphArrays(self.__graph)
+        f = open(self.__outputpath, 'w', newline='') if self.__outputpath else None
+        try:
+            writer = None
+            if f and not self.__outputpath.endswith('.jsonl'):
+                writer = csv.DictWriter(f, fieldnames=RESULT_KEYS)
+                writer.writeheader()
+            with multiprocessing.Pool(self.__processes, InitSweepWorker, (descriptions,)) as pool:
+                for result in pool.imap_unordered(RunTask, tasks):
+                    results.append(result)
+                    if writer:
+                        writer.writerow(result)
+                    elif f:
+                        f.write(json.dumps(result) + '\n')
+                    if f:
+                        f.flush()
+        finally:
+            if f:
+                f.close()
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return sorted(results, key=lambda result: result['run'])
+
+## Разбор списка значений параметра из командной строки
+# @param text - значения через запятую
+# @param cast - функция преобразования значения
+# @return список значений
+def ParseValues(text, cast):
+    return [cast(value) for value in text.split(',') if value]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Запуск генетического алгоритма на наборе конфигураций')
+    parser.add_argument('graph', help='путь до файла с описанием графа')
+    parser.add_argument('--output', default='sweep.csv', help='файл результатов (.csv или .jsonl)')
+    parser.add_argument('--tourchance', default='1.0', help='вероятности турнирной селекции через запятую')
+    parser.add_argument('--muttype', default=str(MutationType.ONEPOINT), help='виды мутации через запятую')
+    parser.add_argument('--mutchance', default='0.01', help='вероятности мутации через запятую')
+    parser.add_argument('--iters', default='20', help='числа итераций через запятую')
+    parser.add_argument('--popsize', default='20', help='размеры популяции через запятую')
+    parser.add_argument('--startpoptype', default=str(StartPopulation.ELITE),
+                        help='способы формирования начальной популяции через запятую')
+    parser.add_argument('--newpoptype', default=str(NewPopulation.CLASSIC),
+                        help='способы формирования новой популяции через запятую')
+    parser.add_argument('--firstpoptype', default=str(FirstPopulation.RANDOM),
+                        help='способы генерации хромосом первой популяции через запятую')
+    parser.add_argument('--junctiontype', default=str(JunctionType.TWOPOINT), help='виды скрещивания через запятую')
+    parser.add_argument('--repairtype', default=str(RepairType.NONE),
+                        help='способы исправления потомков через запятую')
+    parser.add_argument('--deadline', default='', help='ограничения времени поиска в секундах через запятую')
+    parser.add_argument('--stagnation', default='0',
+                        help='количества итераций без улучшения до остановки через запятую')
+    parser.add_argument('--engine', default=str(EvolutionEngine.SEQUENTIAL),
+                        help='способы формирования потомков через запятую')
+    parser.add_argument('--memetic', default='0',
+                        help='количества хромосом, улучшаемых локальным поиском на каждой итерации, через запятую')
+    parser.add_argument('--trienodes', default='0',
+                        help='максимальные количества узлов дерева префиксов путей через запятую (0 - без дерева)')
+    parser.add_argument('--ratecontrol', default=str(RateControl.FIXED),
+                        help='способы управления вероятностями селекции и мутации через запятую')
+    parser.add_argument('--seeds', default='0', help='начальные значения генератора случайных чисел через запятую')
+    parser.add_argument('--processes', type=int, default=None, help='количество процессов')
+    parser.add_argument('--cache', action='store_true', help='кэшировать граф в двоичном формате рядом с файлом')
+    args = parser.parse_args()
+    casts = {'tourchance': float, 'mutchance': float, 'deadline': float}
+    values = {key: ParseValues(getattr(args, key), casts.get(key, int)) for key in CONFIG_KEYS}
+    values['deadline'] = values['deadline'] or [None] # без ограничения времени поиска
+    grid = GetConfigurationGrid(values)
+    graph = Graph.LoadGraph(args.graph) if args.cache else Graph.Graph(args.graph)
+    runner = SweepRunner(graph, grid, ParseValues(args.seeds, int), args.output, args.processes)
+    for result in runner.Run():
+        print(result['run'], result['seed'], result['way'], result['time'], round(result['walltime'], 3))
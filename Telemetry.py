@@ -0,0 +1,103 @@
+## @package Telemetry
+# Модуль для сбора сведений о работе генетического алгоритма: замер времени этапов итерации (селекции, скрещивания,
+# мутации, оценки приспособленности и т.д.) и запись событий, которые генетический алгоритм формирует после каждой
+# итерации, в файлы JSONL и CSV
+
+import csv
+import json
+import time
+
+# Константы модуля
+STAGES = ('selection', 'junction', 'mutation', 'repair', 'evaluation', 'insertion', 'clean',
+          'localsearch') # этапы итерации
+
+## @class StageProfiler
+# Время этапа считается без времени вложенных в него этапов (например, время селекции не включает время оценки
+# приспособленности хромосом, выполненной во время селекции)
+class StageProfiler:
+
+    ## Конструктор
+    def __init__(self):
+        self.__times = dict.fromkeys(STAGES, 0.0) # этап -> суммарное время (в секундах)
+        self.__calls = dict.fromkeys(STAGES, 0) # этап -> количество вызовов
+        self.__stack = [] # выполняющиеся этапы, последний - текущий
+        self.__starttime = 0.0 # момент начала или возобновления текущего этапа
+
+    ## Начало этапа (приостанавливает текущий этап, если он есть)
+    # @param stage - название этапа
+    def Start(self, stage):
+        now = time.perf_counter()
+        if self.__stack:
+            self.__times[self.__stack[-1]] += now - self.__starttime
+        self.__stack.append(stage)
+        self.__calls[stage] = self.__calls.get(stage, 0) + 1
+        self.__starttime = now
+
+    ## Окончание текущего этапа (возобновляет приостановленный этап, если он есть)
+    def Stop(self):
+        now = time.perf_counter()
+        stage = self.__stack.pop()
+        self.__times[stage] = self.__times.get(stage, 0.0) + now - self.__starttime
+        self.__starttime = now
+
+    ## Функция, возвращающая суммарное время этапов
+    # @return словарь: этап -> время (в секундах)
+    def Times(self):
+        return dict(self.__times)
+
+    ## Функция, возвращающая количество вызовов этапов
+    # @return словарь: этап -> количество вызовов
+    def Calls(self):
+        return dict(self.__calls)
+
+    ## Сброс накопленных значений
+    def Reset(self):
+        self.__times = dict.fromkeys(STAGES, 0.0)
+        self.__calls = dict.fromkeys(STAGES, 0)
+        self.__stack = []
+
+## @class TelemetryRecorder
+# Обработчик событий генетического алгоритма (см. GeneticAlgo.AddGenerationCallback), сохраняющий все события
+class TelemetryRecorder:
+
+    ## Конструктор
+    def __init__(self):
+        self.__events = []
+
+    ## Сохранение события
+    # @param event - словарь с показателями итерации генетического алгоритма
+    def __call__(self, event):
+        self.__events.append(dict(event))
+
+    ## Функция, возвращающая сохраненные события
+    # @return список событий
+    def Events(self):
+        return list(self.__events)
+
+    ## Запись событий в файл JSONL (одно событие в строке)
+    # @param filepath - путь до файла
+    def WriteJsonl(self, filepath):
+        f = open(filepath, 'w')
+        for event in self.__events:
+            f.write(json.dumps(event) + '\n')
+        f.close()
+
+    ## Запись событий в файл CSV
+    # @param filepath - путь до файла
+    def WriteCsv(self, filepath):
+        fieldnames = []
+        for event in self.__events:
+            fieldnames.extend(key for key in event if key not in fieldnames)
+        f = open(filepath, 'w', newline='')
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(self.__events)
+        f.close()
+
+    ## Запись событий в файл, формат которого определяется расширением (.jsonl или .csv)
+    # @param filepath - путь до файла
+    def Write(self, filepath):
+        if filepath.endswith('.jsonl'):
+            self.WriteJsonl(filepath)
+        else:
+            self.WriteCsv(filepath)
@@ -0,0 +1,107 @@
+## @package test_GeneticAlgo
+# Регрессионные тесты генетического алгоритма
+
+import os
+import numpy as np
+import pytest
+
+import Graph
+import GeneticAlgo
+
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, EvolutionEngine, RateControl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+## Проверка, что путь ведет от начальной до конечной точки графа без циклов и по нему можно проехать
+# @param genalgo - генетический алгоритм
+# @param graph - граф
+# @param way - путь (хромосома без нулей)
+def AssertValidWay(genalgo, graph, way):
+    assert way[0] == graph.StartPoint() and way[-1] == graph.FinishPoint()
+    assert len(set(way)) == len(way)
+    assert genalgo.GetHromosomeWayTime(way) > 0.0
+
+## Проверка, что все валидные хромосомы кэша приспособленности имеют время и длину пути, подсчитанные заново
+# @param genalgo - генетический алгоритм
+def AssertFreshFitnessCache(genalgo):
+    for key, (valid, waytime, waylength) in genalgo._GeneticAlgo__fitnesscache.items():
+        if valid:
+            assert waytime == pytest.approx(genalgo.CalculateHromosomeWayTime(list(key)))
+            assert waylength == pytest.approx(genalgo.CalculateHromosomeWayLength(list(key)))
+
+## Поиск пути с локальным поиском: удаление вершин может сократить путь до одной дороги
+def test_memetic_search_on_short_ways():
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'in.txt'))
+    for seed in range(10):
+        genalgo = GeneticAlgo.GeneticAlgo(graph, 0.8, MutationType.ONEPOINT, 0.3, 20, 20, StartPopulation.ELITE,
+                                          NewPopulation.GENITOR, memetic=5, rng=np.random.default_rng(seed))
+        AssertValidWay(genalgo, graph, genalgo.FindQuickestWay())
+        AssertFreshFitnessCache(genalgo)
+
+## Локальный поиск не ухудшает хромосому и сохраняет в кэше точные время и длину улучшенного пути
+def test_local_search_never_worse():
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'big.txt'))
+    for seed in range(5):
+        genalgo = GeneticAlgo.GeneticAlgo(graph, 0.8, MutationType.ONEPOINT, 0.05, 10, 30, StartPopulation.ELITE,
+                                          NewPopulation.GENITOR, firstpoptype=FirstPopulation.WALK, memetic=5,
+                                          rng=np.random.default_rng(seed))
+        genalgo.GenerateFirstStartPopulation()
+        for hromosome in genalgo.GetPopulationHromosomes():
+            before = (genalgo.CalculateHromosomeWayTime(hromosome), genalgo.CalculateHromosomeWayLength(hromosome))
+            improved = genalgo.LocalSearch(hromosome)
+            genes = genalgo.RemoveHromosomeZeros(improved)
+            AssertValidWay(genalgo, graph, genes)
+            after = (genalgo.CalculateHromosomeWayTime(genes), genalgo.CalculateHromosomeWayLength(genes))
+            assert after <= before
+        AssertFreshFitnessCache(genalgo)
+        AssertValidWay(genalgo, graph, genalgo.FindQuickestWay())
+        AssertFreshFitnessCache(genalgo)
+
+## Продолжение поиска из контрольной точки повторяет непрерванный поиск с тем же начальным значением генератора
+@pytest.mark.parametrize('newpoptype', [NewPopulation.CLASSIC, NewPopulation.GENITOR])
+@pytest.mark.parametrize('engine', [EvolutionEngine.SEQUENTIAL, EvolutionEngine.BATCH])
+@pytest.mark.parametrize('ratecontrol', [RateControl.FIXED, RateControl.ADAPTIVE])
+@pytest.mark.parametrize('memetic', [0, 3])
+def test_checkpoint_resume_continues_exactly(tmp_path, newpoptype, engine, ratecontrol, memetic):
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'big.txt'))
+    filepath = str(tmp_path / 'checkpoint.npz')
+    genalgo = GeneticAlgo.GeneticAlgo(graph, 0.8, MutationType.ONEPOINT, 0.05, 12, 20, StartPopulation.ELITE,
+                                      newpoptype, firstpoptype=FirstPopulation.WALK, engine=engine, memetic=memetic,
+                                      ratecontrol=ratecontrol, rng=np.random.default_rng(3))
+    genalgo.SetCheckpoint(filepath, interval=5) # последняя контрольная точка - после 5-й или 10-й итерации
+    way = genalgo.FindQuickestWay()
+    resumed = GeneticAlgo.LoadGeneticAlgo(graph, filepath)
+    assert 0 < resumed.GetGenerationsCount() < genalgo.GetGenerationsCount()
+    assert resumed.ResumeQuickestWay() == way
+    assert resumed.GetGenerationsCount() == genalgo.GetGenerationsCount()
+    assert resumed.GetPopulationHromosomes() == genalgo.GetPopulationHromosomes()
+    assert resumed.GetOperatorRates() == genalgo.GetOperatorRates()
+
+## После изменения дорожной сети из кэша приспособленности удаляются только хромосомы, проходящие по изменившимся
+# дорогам, а оставшиеся хромосомы имеют время и длину пути, подсчитанные заново
+def test_graph_changes_invalidate_only_touched_hromosomes():
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'big.txt'))
+    genalgo = GeneticAlgo.GeneticAlgo(graph, 0.8, MutationType.ONEPOINT, 0.05, 10, 30, StartPopulation.ELITE,
+                                      NewPopulation.GENITOR, firstpoptype=FirstPopulation.WALK,
+                                      rng=np.random.default_rng(0))
+    way = genalgo.FindQuickestWay()
+    cache = dict(genalgo._GeneticAlgo__fitnesscache)
+    others = [key for key, fitness in cache.items() if fitness[0] and len(key) > 2 and key != tuple(way)]
+    revision = graph.Revision()
+    graph.CloseRoad(way[0]-1, way[1]-1)
+    graph.SetEdgeLength(others[0][1]-1, others[0][2]-1, 1000)
+    graph.AddSpeedWindow(others[-1][0]-1, others[-1][1]-1, 5, graph.StartSeconds(), graph.StartSeconds()+3600)
+    changed = set(graph.GetChangedEdges(revision).tolist())
+    assert len(changed) == 3
+    removed = genalgo.ApplyGraphChanges()
+    survivors = genalgo._GeneticAlgo__fitnesscache
+    for key, fitness in cache.items():
+        touched = fitness[0] and any(graph.GetEdgeIndex(point1-1, point2-1) in changed
+                                     for point1, point2 in zip(key[:-1], key[1:]))
+        assert (key in survivors) != touched
+        if not touched:
+            assert survivors[key] == fitness
+    assert removed == len(cache) - len(survivors) > 0
+    AssertFreshFitnessCache(genalgo)
+    AssertValidWay(genalgo, graph, genalgo.WarmStartQuickestWay())
+    AssertFreshFitnessCache(genalgo)
@@ -0,0 +1,43 @@
+## @package test_IslandGeneticAlgo
+# Регрессионные тесты островной модели генетического алгоритма
+
+import os
+
+import Graph
+import GeneticAlgo
+import IslandGeneticAlgo
+
+from Enums import StartPopulation, NewPopulation, MutationType, FirstPopulation, JunctionType, RepairType, \
+    EvolutionEngine, RateControl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+## Генетический алгоритм острова сохраняется между эпохами: счетчик итераций и адаптивные вероятности
+# не сбрасываются, даже если эпоха короче окна адаптации
+def test_island_keeps_state_between_epochs():
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'big.txt'))
+    IslandGeneticAlgo.InitIslandWorker(graph)
+    params = (0.8, MutationType.ONEPOINT, 0.05, 20, StartPopulation.ELITE, NewPopulation.GENITOR,
+              FirstPopulation.WALK, JunctionType.TWOPOINT, RepairType.NONE, EvolutionEngine.SEQUENTIAL, 1000, 0, 0,
+              RateControl.ADAPTIVE)
+    iterations = 2
+    assert iterations < GeneticAlgo.ADAPTIVE_WINDOW
+    genalgo = None
+    for epoch in range(4):
+        IslandGeneticAlgo.EvolveIsland(params, 0, [], iterations, 1, 7)
+        if genalgo is None:
+            genalgo = IslandGeneticAlgo._workerislands[0]
+        assert IslandGeneticAlgo._workerislands[0] is genalgo
+        assert genalgo.GetGenerationsCount() == (epoch+1)*iterations
+    assert genalgo.GetOperatorRates()[2] != 0.05
+
+## Поиск островной моделью в нескольких процессах возвращает путь от начальной до конечной точки
+def test_island_search_returns_way():
+    graph = Graph.Graph(os.path.join(DATA_DIR, 'big.txt'))
+    genalgo = IslandGeneticAlgo.IslandGeneticAlgo(graph, 0.8, MutationType.ONEPOINT, 0.05, 6, 20,
+                                                  StartPopulation.ELITE, NewPopulation.GENITOR, 3, 2, processes=2,
+                                                  seed=1, firstpoptype=FirstPopulation.WALK,
+                                                  ratecontrol=RateControl.ADAPTIVE, trienodes=1000)
+    way = genalgo.FindQuickestWay()
+    assert way[0] == graph.StartPoint() and way[-1] == graph.FinishPoint()
+    assert genalgo.GetHromosomeWayTime(way) > 0.0